@@ -0,0 +1,75 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack
+
+from app.core.config import (
+    AWS_ACCESS_KEY_ID,
+    AWS_SECRET_ACCESS_KEY,
+    METRICS_ENABLED,
+    get_s3_client_config,
+    get_s3_endpoint_url,
+)
+from app.core.metrics import S3_CLIENT_CREATE_DURATION, instrument_s3_client, record_span
+from app.utils.logging_config import get_logger
+
+
+# asyncio counterpart of S3ClientPool, backed by aiobotocore. Clients are
+# async context managers, so they are entered once and closed on shutdown.
+class AsyncS3ClientPool:
+    def __init__(self):
+        # Only needed when S3_ENGINE=async
+        from aiobotocore.session import get_session
+
+        self.logger = get_logger(__name__)
+        self._session = get_session()
+        self._config = get_s3_client_config()
+        self._clients = {}
+        self._exit_stack = AsyncExitStack()
+        self._lock = asyncio.Lock()
+
+    async def get_client(self, region_name: str | None = None):
+        client = self._clients.get(region_name)
+        if client is not None:
+            return client
+
+        async with self._lock:
+            client = self._clients.get(region_name)
+            if client is None:
+                self.logger.info("Creating async S3 client for region '%s'", region_name or "default")
+                started = time.perf_counter()
+                client = await self._exit_stack.enter_async_context(
+                    self._session.create_client(
+                        "s3",
+                        region_name=region_name,
+                        endpoint_url=get_s3_endpoint_url(region_name),
+                        aws_access_key_id=AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+                        config=self._config,
+                    )
+                )
+                if METRICS_ENABLED:
+                    instrument_s3_client(client)
+                elapsed = time.perf_counter() - started
+                S3_CLIENT_CREATE_DURATION.observe(elapsed)
+                record_span("s3.client_create", elapsed)
+                self._clients[region_name] = client
+        return client
+
+    async def warm_up(self, connections: int):
+        from botocore.exceptions import ClientError
+
+        client = await self.get_client()
+
+        async def open_connection():
+            try:
+                await client.list_buckets()
+            except ClientError:
+                # Any answer from S3 means the connection is open
+                pass
+
+        await asyncio.gather(*(open_connection() for _ in range(connections)))
+        self.logger.info("Async S3 client warmed up with %s connections", connections)
+
+    async def close(self):
+        await self._exit_stack.aclose()
+        self._clients.clear()
@@ -0,0 +1,174 @@
+import zlib
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Content-Encoding names of the codecs objects can be stored with
+CODECS = ("gzip", "zstd")
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+# User metadata key (x-amz-meta-uncompressed-size) written by compressed uploads
+UNCOMPRESSED_SIZE_METADATA_KEY = "uncompressed-size"
+# zlib window bits selecting the gzip container
+GZIP_WBITS = 31
+COMPRESSIBLE_RESPONSE_TYPES = ("application/json", "application/x-ndjson")
+
+
+def _zstandard():
+    # Only needed when a compression rule uses zstd
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd compression needs the zstandard package (pip install zstandard)") from e
+    return zstandard
+
+
+def require_codec(codec: str):
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression codec '{codec}', expected one of {', '.join(CODECS)}")
+    if codec == "zstd":
+        _zstandard()
+
+
+def compressor(codec: str, level: int | None = None) -> Any:
+    # Both expose compress(data) and flush(), which ends the stream
+    level = DEFAULT_LEVELS[codec] if level is None else level
+    if codec == "gzip":
+        return zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    return _zstandard().ZstdCompressor(level=level).compressobj()
+
+
+def decompressor(codec: str) -> Any:
+    if codec == "gzip":
+        return zlib.decompressobj(GZIP_WBITS)
+    return _zstandard().ZstdDecompressor().decompressobj()
+
+
+def iter_decompressed(chunks: Iterable[bytes], codec: str) -> Iterator[bytes]:
+    decoder = decompressor(codec)
+    for chunk in chunks:
+        if data := decoder.decompress(chunk):
+            yield data
+    if data := decoder.flush():
+        yield data
+
+
+async def aiter_decompressed(chunks: AsyncIterable[bytes], codec: str) -> AsyncIterator[bytes]:
+    decoder = decompressor(codec)
+    async for chunk in chunks:
+        if data := decoder.decompress(chunk):
+            yield data
+    if data := decoder.flush():
+        yield data
+
+
+def accepts_encoding(accept_encoding: str | None, codec: str) -> bool:
+    preferences = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        preferences[name.strip().lower()] = quality
+    return preferences.get(codec, preferences.get("*", 0.0)) > 0
+
+
+def negotiate_download(
+    headers: dict[str, str],
+    content_encoding: str | None,
+    accept_encoding: str | None,
+    uncompressed_size: str | None = None,
+) -> str | None:
+    # Objects stored compressed are sent as they are, with Content-Encoding, to
+    # clients accepting the codec and for ranges (which address the stored
+    # bytes); other clients get them decompressed while streaming. Returns the
+    # codec to decompress the body with, if any. The headers are updated.
+    if content_encoding not in CODECS:
+        return None
+    headers["Vary"] = "Accept-Encoding"
+    if accepts_encoding(accept_encoding, content_encoding) or "Content-Range" in headers:
+        headers["Content-Encoding"] = content_encoding
+        return None
+    # Ranges would still address the stored bytes
+    headers.pop("Accept-Ranges", None)
+    if uncompressed_size and uncompressed_size.isdigit():
+        headers["Content-Length"] = uncompressed_size
+    else:
+        headers.pop("Content-Length", None)
+    # Another representation of the same object
+    if not headers["ETag"].startswith("W/"):
+        headers["ETag"] = f"W/{headers['ETag']}"
+    return content_encoding
+
+
+class ResponseCompressionMiddleware:
+    # Gzips JSON and NDJSON responses for clients that accept it: complete
+    # bodies of at least minimum_size bytes, and every streamed body, flushed
+    # per chunk so NDJSON rows still reach the client as they are produced.
+    # Other media types, downloads among them, pass through untouched.
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 4096,
+        level: int = 6,
+        media_types: tuple[str, ...] = COMPRESSIBLE_RESPONSE_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.media_types = media_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not accepts_encoding(Headers(scope=scope).get("accept-encoding"), "gzip"):
+            await self.app(scope, receive, send)
+            return
+        await _GzipResponder(self)(scope, receive, send)
+
+
+class _GzipResponder:
+    def __init__(self, middleware: ResponseCompressionMiddleware):
+        self.middleware = middleware
+        self.send: Send | None = None
+        # Held back until the first body chunk shows whether to compress
+        self.start: Message | None = None
+        self.encoder: Any = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            if media_type in self.middleware.media_types and "content-encoding" not in headers:
+                self.start = message
+                return
+        elif message["type"] == "http.response.body" and self.start is not None:
+            start, self.start = self.start, None
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if more_body or len(body) >= self.middleware.minimum_size:
+                self.encoder = zlib.compressobj(self.middleware.level, zlib.DEFLATED, GZIP_WBITS)
+                headers["Content-Encoding"] = "gzip"
+                message["body"] = self._compress(body, more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(message["body"]))
+            await self.send(start)
+        elif message["type"] == "http.response.body" and self.encoder is not None:
+            message["body"] = self._compress(message.get("body", b""), message.get("more_body", False))
+        await self.send(message)
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        if more_body:
+            return self.encoder.compress(body) + self.encoder.flush(zlib.Z_SYNC_FLUSH)
+        return self.encoder.compress(body) + self.encoder.flush()
@@ -1,18 +1,175 @@
-import boto3
 import os
+from typing import TYPE_CHECKING
+
 from dotenv import load_dotenv
 
+# boto3 and botocore are imported where clients are built, not at startup
+if TYPE_CHECKING:
+    import boto3
+    from botocore.config import Config
+
+# Stays eager: every setting below is read once at import, and app.main picks
+# the engine and middleware from them while importing, so .env must be loaded
+# first. Reading it takes well under a millisecond (~3 ms to import dotenv).
 load_dotenv()
 
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION", "ap-south-2")
 
+# Optional override, e.g. a local S3 stand-in such as moto server
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+DEFAULT_S3_ENDPOINT_URL = "https://s3.amazonaws.com"
+
+# "sync" runs boto3 in the threadpool, "async" serves the request path with aiobotocore
+S3_ENGINE = os.getenv("S3_ENGINE", "sync").lower()
+
+# Connection pool
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50"))
+S3_TCP_KEEPALIVE = os.getenv("S3_TCP_KEEPALIVE", "true").lower() == "true"
+S3_CONNECT_TIMEOUT = float(os.getenv("S3_CONNECT_TIMEOUT", "5"))
+S3_READ_TIMEOUT = float(os.getenv("S3_READ_TIMEOUT", "60"))
+
+# Clients are created on first use; warm-up creates them in the background at
+# startup and opens connections, /ready answers 503 until it is done
+S3_WARMUP_ENABLED = os.getenv("S3_WARMUP_ENABLED", "true").lower() == "true"
+S3_WARMUP_CONNECTIONS = int(os.getenv("S3_WARMUP_CONNECTIONS", "2"))
+
+# Rate control for S3 calls of the sync engine: per-prefix token buckets at
+# S3's documented request rates, adaptive (AIMD) concurrency per bucket and
+# jittered exponential backoff on throttling and transient errors
+S3_RATE_CONTROL_ENABLED = os.getenv("S3_RATE_CONTROL_ENABLED", "true").lower() == "true"
+S3_RATE_READS_PER_PREFIX = float(os.getenv("S3_RATE_READS_PER_PREFIX", "5500"))
+S3_RATE_WRITES_PER_PREFIX = float(os.getenv("S3_RATE_WRITES_PER_PREFIX", "3500"))
+S3_RATE_PREFIX_DEPTH = int(os.getenv("S3_RATE_PREFIX_DEPTH", "1"))
+S3_RATE_INITIAL_CONCURRENCY = int(os.getenv("S3_RATE_INITIAL_CONCURRENCY", "32"))
+S3_RATE_MIN_CONCURRENCY = int(os.getenv("S3_RATE_MIN_CONCURRENCY", "1"))
+S3_RATE_MAX_CONCURRENCY = int(os.getenv("S3_RATE_MAX_CONCURRENCY", "256"))
+S3_RETRY_MAX_ATTEMPTS = int(os.getenv("S3_RETRY_MAX_ATTEMPTS", "8"))
+S3_RETRY_BASE_DELAY = float(os.getenv("S3_RETRY_BASE_DELAY", "0.1"))
+S3_RETRY_MAX_DELAY = float(os.getenv("S3_RETRY_MAX_DELAY", "20"))
+
+
+def get_s3_client_config() -> "Config":
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=S3_TCP_KEEPALIVE,
+        connect_timeout=S3_CONNECT_TIMEOUT,
+        read_timeout=S3_READ_TIMEOUT,
+    )
+
+
+def get_s3_endpoint_url(region_name: str | None = None) -> str | None:
+    # The default client keeps the global endpoint; regional clients let
+    # botocore resolve the regional endpoint unless an override is set.
+    if S3_ENDPOINT_URL:
+        return S3_ENDPOINT_URL
+    if region_name is None:
+        return DEFAULT_S3_ENDPOINT_URL
+    return None
+
+
+def get_s3_session() -> "boto3.session.Session":
+    import boto3
+
+    return boto3.session.Session(
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+    )
+
 
 def get_s3_client_credentials():
+    import boto3
+
     return boto3.client(
         service_name="s3",
         aws_access_key_id=AWS_ACCESS_KEY_ID,
         aws_secret_access_key= AWS_SECRET_ACCESS_KEY,
-        endpoint_url="https://s3.amazonaws.com"
+        endpoint_url=get_s3_endpoint_url(),
+        config=get_s3_client_config(),
     )
+
+
+# Transfers
+S3_TRANSFER_MAX_WORKERS = int(os.getenv("S3_TRANSFER_MAX_WORKERS", "32"))
+S3_MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD", str(16 * 1024 * 1024)))
+S3_MULTIPART_PART_SIZE = int(os.getenv("S3_MULTIPART_PART_SIZE", str(8 * 1024 * 1024)))
+S3_MULTIPART_CONCURRENCY = int(os.getenv("S3_MULTIPART_CONCURRENCY", "4"))
+S3_MULTIPART_COPY_THRESHOLD = int(os.getenv("S3_MULTIPART_COPY_THRESHOLD", str(256 * 1024 * 1024)))
+S3_MULTIPART_COPY_PART_SIZE = int(os.getenv("S3_MULTIPART_COPY_PART_SIZE", str(64 * 1024 * 1024)))
+S3_MULTIPART_COPY_CONCURRENCY = int(os.getenv("S3_MULTIPART_COPY_CONCURRENCY", "8"))
+S3_DOWNLOAD_CHUNK_SIZE = int(os.getenv("S3_DOWNLOAD_CHUNK_SIZE", str(64 * 1024)))
+S3_FOLDER_COPY_CONCURRENCY = int(os.getenv("S3_FOLDER_COPY_CONCURRENCY", "16"))
+S3_DELETE_CONCURRENCY = int(os.getenv("S3_DELETE_CONCURRENCY", "8"))
+S3_BATCH_UPLOAD_CONCURRENCY = int(os.getenv("S3_BATCH_UPLOAD_CONCURRENCY", "16"))
+
+# Presigned URLs
+PRESIGN_DEFAULT_EXPIRES = int(os.getenv("PRESIGN_DEFAULT_EXPIRES", "900"))
+PRESIGN_MAX_UPLOAD_SIZE = int(os.getenv("PRESIGN_MAX_UPLOAD_SIZE", str(5 * 1024 ** 3)))
+
+# Metadata cache for bucket and folder listings
+METADATA_CACHE_ENABLED = os.getenv("METADATA_CACHE_ENABLED", "true").lower() == "true"
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "1024"))
+METADATA_CACHE_BUCKETS_TTL = float(os.getenv("METADATA_CACHE_BUCKETS_TTL", "30"))
+METADATA_CACHE_LISTING_TTL = float(os.getenv("METADATA_CACHE_LISTING_TTL", "10"))
+
+# Local state (upload sessions, ...)
+DATA_DIR = os.getenv("DATA_DIR", ".data")
+UPLOAD_SESSION_DB_PATH = os.getenv("UPLOAD_SESSION_DB_PATH", os.path.join(DATA_DIR, "upload_sessions.sqlite3"))
+
+# Read-through cache of downloaded objects (sync engine, needs the metadata cache):
+# small objects in memory, larger ones in memory-mapped files
+OBJECT_CACHE_ENABLED = os.getenv("OBJECT_CACHE_ENABLED", "false").lower() == "true"
+OBJECT_CACHE_DIR = os.getenv("OBJECT_CACHE_DIR", os.path.join(DATA_DIR, "object_cache"))
+OBJECT_CACHE_TTL = float(os.getenv("OBJECT_CACHE_TTL", "30"))
+OBJECT_CACHE_MAX_IDLE = float(os.getenv("OBJECT_CACHE_MAX_IDLE", "3600"))
+OBJECT_CACHE_MEMORY_MAX_BYTES = int(os.getenv("OBJECT_CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+OBJECT_CACHE_MEMORY_MAX_OBJECT_SIZE = int(os.getenv("OBJECT_CACHE_MEMORY_MAX_OBJECT_SIZE", str(256 * 1024)))
+OBJECT_CACHE_DISK_MAX_BYTES = int(os.getenv("OBJECT_CACHE_DISK_MAX_BYTES", str(1024 ** 3)))
+OBJECT_CACHE_DISK_MAX_OBJECT_SIZE = int(os.getenv("OBJECT_CACHE_DISK_MAX_OBJECT_SIZE", str(64 * 1024 * 1024)))
+
+# Upload deduplication (dedup=true on upload-file)
+CONTENT_HASH_DB_PATH = os.getenv("CONTENT_HASH_DB_PATH", os.path.join(DATA_DIR, "content_hashes.sqlite3"))
+UPLOAD_DEDUP_CACHE_TTL = float(os.getenv("UPLOAD_DEDUP_CACHE_TTL", "60"))
+
+# Compression of uploads on the way to S3, per key prefix, e.g.
+# "logs/=gzip,exports/=zstd:10" (zstd needs the zstandard package); off when empty
+UPLOAD_COMPRESSION_RULES = os.getenv("UPLOAD_COMPRESSION_RULES", "")
+UPLOAD_COMPRESSION_MIN_SIZE = int(os.getenv("UPLOAD_COMPRESSION_MIN_SIZE", "1024"))
+
+# Gzip of JSON and NDJSON responses for clients sending Accept-Encoding: gzip
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "4096"))
+RESPONSE_COMPRESSION_LEVEL = int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "6"))
+
+# Frontend pages link their assets by content-hashed URL, cached as immutable
+STATIC_ASSETS_HASHED = os.getenv("STATIC_ASSETS_HASHED", "true").lower() == "true"
+
+# Background jobs
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "1000"))
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(DATA_DIR, "jobs.sqlite3"))
+JOB_PROGRESS_FLUSH_INTERVAL = float(os.getenv("JOB_PROGRESS_FLUSH_INTERVAL", "1.0"))
+
+# Metadata index of bucket contents
+METADATA_INDEX_ENABLED = os.getenv("METADATA_INDEX_ENABLED", "true").lower() == "true"
+METADATA_INDEX_DB_PATH = os.getenv("METADATA_INDEX_DB_PATH", os.path.join(DATA_DIR, "metadata_index.sqlite3"))
+METADATA_INDEX_CRAWL_CONCURRENCY = int(os.getenv("METADATA_INDEX_CRAWL_CONCURRENCY", "8"))
+METADATA_INDEX_MIN_SHARDS = int(os.getenv("METADATA_INDEX_MIN_SHARDS", "32"))
+METADATA_INDEX_MAX_SHARD_DEPTH = int(os.getenv("METADATA_INDEX_MAX_SHARD_DEPTH", "3"))
+
+# Prometheus metrics on /metrics and per-request Server-Timing headers
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+# Logging: records are written by a background thread from a bounded queue,
+# and repeated warnings/errors from one call site are rate limited
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_RATE_LIMIT_BURST = int(os.getenv("LOG_RATE_LIMIT_BURST", "20"))
+LOG_RATE_LIMIT_WINDOW = float(os.getenv("LOG_RATE_LIMIT_WINDOW", "60"))
+LOG_RATE_LIMIT_SAMPLE = int(os.getenv("LOG_RATE_LIMIT_SAMPLE", "100"))
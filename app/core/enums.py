@@ -5,3 +5,17 @@ class AWSRegion(str, Enum):
     us_east_1 = "us-east-1"
     us_west_2 = "us-west-2"
     eu_west_1 = "eu-west-1"
+
+
+class JobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class IndexStatus(str, Enum):
+    crawling = "crawling"
+    ready = "ready"
+    incomplete = "incomplete"
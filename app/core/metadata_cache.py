@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class MetadataCache:
+    # In-memory TTL cache with LRU eviction. Concurrent misses for the same key
+    # share a single load. Any object with the same get_or_load / invalidate /
+    # stats methods can be plugged into CachedS3Repository instead.
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._loading: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so loads that started earlier are not stored
+        self._version = 0
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "invalidations": 0}
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float):
+        owner = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry[1]
+
+            pending = self._loading.get(key)
+            if pending is not None:
+                self._counters["coalesced"] += 1
+            else:
+                self._counters["misses"] += 1
+                pending = Future()
+                self._loading[key] = pending
+                version = self._version
+                owner = True
+        if not owner:
+            return pending.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(key, None)
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            self._loading.pop(key, None)
+            if version == self._version:
+                self._entries[key] = (time.monotonic() + ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        pending.set_result(value)
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]):
+        with self._lock:
+            self._version += 1
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            self._counters["invalidations"] += len(stale)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"] + self._counters["coalesced"]
+            return {
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,310 @@
+import bisect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Any, Iterator
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.rate_control import THROTTLING_ERROR_CODES
+
+# Prometheus defaults plus two longer buckets for large transfers
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: list[tuple[str, str]]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+# SECTION: metric types, rendered in the Prometheus text exposition format
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[tuple[str, list[tuple[str, str]], float]]:
+        for key, value in self._values.items():
+            yield self.name, list(zip(self.labelnames, key)), value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            samples = list(self._samples())
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in samples)
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        for key, (counts, total, count) in self._values.items():
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", [*labels, ("le", _format_value(bound))], cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter("http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status"))
+)
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by method and route.", ("method", "route"))
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge("http_requests_in_flight", "HTTP requests being served."))
+S3_REQUESTS = REGISTRY.register(
+    Counter("s3_requests_total", "S3 API calls by operation and HTTP status.", ("operation", "status"))
+)
+S3_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "s3_request_duration_seconds",
+        "S3 API call latency by operation, including botocore retries.",
+        ("operation",),
+    )
+)
+S3_REQUESTS_IN_FLIGHT = REGISTRY.register(
+    Gauge("s3_requests_in_flight", "S3 API calls in flight by operation.", ("operation",))
+)
+S3_ERRORS = REGISTRY.register(
+    Counter("s3_errors_total", "Failed S3 API calls by operation and error code.", ("operation", "code"))
+)
+S3_THROTTLES = REGISTRY.register(
+    Counter("s3_throttles_total", "S3 API calls answered with SlowDown or another throttle.", ("operation",))
+)
+S3_RETRIES = REGISTRY.register(
+    Counter("s3_retries_total", "S3 API call retries by botocore or the rate controller.", ("operation",))
+)
+S3_UPLOADED_BYTES = REGISTRY.register(
+    Counter("s3_uploaded_bytes_total", "Request body bytes sent to S3 by operation.", ("operation",))
+)
+S3_DOWNLOADED_BYTES = REGISTRY.register(
+    Counter("s3_downloaded_bytes_total", "Response body bytes announced by S3 by operation.", ("operation",))
+)
+S3_CLIENT_CREATE_DURATION = REGISTRY.register(
+    Histogram("s3_client_create_seconds", "Time spent constructing S3 clients.")
+)
+# Set from the logging handler when /metrics is scraped
+LOG_QUEUE_SIZE = REGISTRY.register(Gauge("log_queue_size", "Log records waiting for the writer thread."))
+LOG_RECORDS_DROPPED = REGISTRY.register(
+    Gauge("log_records_dropped", "Log records dropped because the log queue was full.")
+)
+
+
+# SECTION: per-request traces, reported in the Server-Timing header
+class RequestTrace:
+    # Span durations summed per name, e.g. every s3.PutObject of one request.
+    # Parallel calls overlap, so a span can be longer than the request.
+    def __init__(self):
+        self.spans: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            span = self.spans.setdefault(name, [0, 0.0])
+            span[0] += 1
+            span[1] += seconds
+
+    def server_timing(self, total: float) -> str:
+        with self._lock:
+            spans = sorted(self.spans.items())
+        entries = [f"total;dur={total * 1000:.1f}"]
+        entries.extend(f'{name};dur={seconds * 1000:.1f};desc="{count:g} calls"' for name, (count, seconds) in spans)
+        return ", ".join(entries)
+
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("request_trace", default=None)
+
+
+def record_span(name: str, seconds: float):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+class TracingThreadPoolExecutor(ThreadPoolExecutor):
+    # Runs each task in a copy of the submitter's context, so S3 calls made on
+    # the transfer pool are counted in the request trace that started them
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(copy_context().run, fn, *args, **kwargs)
+
+
+# SECTION: botocore event hooks, every call of an instrumented client is measured
+def _before_call(model, context: dict, **kwargs):
+    context["metrics_operation"] = model.name
+    context["metrics_started"] = time.perf_counter()
+    S3_REQUESTS_IN_FLIGHT.inc(operation=model.name)
+
+
+def _finish_call(context: dict) -> tuple[str, float] | None:
+    started = context.pop("metrics_started", None)
+    if started is None:
+        return None
+    operation = context["metrics_operation"]
+    elapsed = time.perf_counter() - started
+    S3_REQUESTS_IN_FLIGHT.dec(operation=operation)
+    S3_REQUEST_DURATION.observe(elapsed, operation=operation)
+    record_span(f"s3.{operation}", elapsed)
+    return operation, elapsed
+
+
+def _after_call(http_response, parsed: dict, context: dict, **kwargs):
+    finished = _finish_call(context)
+    if finished is None:
+        return
+    operation, _ = finished
+    status = http_response.status_code
+    S3_REQUESTS.inc(operation=operation, status=str(status))
+    retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+    if retries:
+        S3_RETRIES.inc(retries, operation=operation)
+    if status >= 300:
+        code = parsed.get("Error", {}).get("Code") or str(status)
+        S3_ERRORS.inc(operation=operation, code=code)
+        if code in THROTTLING_ERROR_CODES:
+            S3_THROTTLES.inc(operation=operation)
+    elif operation == "GetObject":
+        S3_DOWNLOADED_BYTES.inc(int(http_response.headers.get("Content-Length") or 0), operation=operation)
+
+
+def _after_call_error(exception: Exception, context: dict, **kwargs):
+    finished = _finish_call(context)
+    if finished is None:
+        return
+    operation, _ = finished
+    S3_REQUESTS.inc(operation=operation, status="error")
+    S3_ERRORS.inc(operation=operation, code=type(exception).__name__)
+
+
+def _before_send(request, event_name: str, **kwargs):
+    # Once per attempt, so retried uploads count every body sent
+    size = int(request.headers.get("Content-Length") or 0)
+    if size:
+        S3_UPLOADED_BYTES.inc(size, operation=event_name.rsplit(".", 1)[-1])
+
+
+def instrument_s3_client(client):
+    events = client.meta.events
+    events.register("before-call.s3", _before_call)
+    events.register("after-call.s3", _after_call)
+    events.register("after-call-error.s3", _after_call_error)
+    events.register("before-send.s3", _before_send)
+
+
+# SECTION: ASGI middleware
+class MetricsMiddleware:
+    # Pure ASGI, so streamed responses are timed to their last byte
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        trace = RequestTrace() if self.server_timing else None
+        token = _current_trace.set(trace)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", trace.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Route templates keep the label set small; static files and 404s share one label
+            route = getattr(scope.get("route"), "path", "other")
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status))
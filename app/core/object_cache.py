@@ -0,0 +1,286 @@
+import glob
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+from app.core.compression import UNCOMPRESSED_SIZE_METADATA_KEY
+from app.core.metrics import REGISTRY, Counter
+
+OBJECT_CACHE_LOOKUPS = REGISTRY.register(
+    Counter("object_cache_lookups_total", "Object cache lookups by result.", ("result",))
+)
+OBJECT_CACHE_SERVED_BYTES = REGISTRY.register(
+    Counter("object_cache_served_bytes_total", "Download bytes served by source.", ("source",))
+)
+
+
+@dataclass
+class CachedObject:
+    etag: str
+    size: int
+    content_type: str
+    last_modified: datetime | None
+    # Validated against S3 until then, afterwards the next read revalidates
+    fresh_until: float
+    last_used: float
+    # Memory tier holds the bytes, disk tier a file that is mapped on read
+    data: bytes | None = None
+    path: str | None = None
+    # Objects stored compressed are cached as stored
+    content_encoding: str | None = None
+    uncompressed_size: str | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return self.fresh_until > time.monotonic()
+
+
+class _Tier:
+    # LRU of cached objects bounded by their total size
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: OrderedDict[tuple[str, str], CachedObject] = OrderedDict()
+
+
+class ObjectCache:
+    # Read-through cache of object bodies for downloads. Small objects are kept
+    # in memory, larger ones in files that are memory-mapped when served; both
+    # tiers evict least recently used objects past their byte budget, and
+    # objects not read for max_idle seconds. Within ttl an object is served
+    # without asking S3, after that it is revalidated with a conditional GET
+    # on its ETag. Writes made through CachedS3Repository invalidate it.
+    def __init__(
+        self,
+        directory: str,
+        ttl: float,
+        max_idle: float,
+        memory_max_bytes: int,
+        memory_max_object_size: int,
+        disk_max_bytes: int,
+        disk_max_object_size: int,
+        chunk_size: int,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_idle = max_idle
+        self.memory_max_object_size = memory_max_object_size
+        self.disk_max_object_size = disk_max_object_size if disk_max_bytes > 0 else 0
+        self.chunk_size = chunk_size
+        self._memory = _Tier(memory_max_bytes)
+        self._disk = _Tier(disk_max_bytes)
+        self._lock = threading.Lock()
+        # Bumped per bucket on invalidation, so fills that started earlier are not stored
+        self._generations: dict[str, int] = {}
+        self._counters = {
+            "hits": 0,
+            "revalidated": 0,
+            "misses": 0,
+            "fills": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "bytes_from_cache": 0,
+            "bytes_from_s3": 0,
+        }
+        os.makedirs(directory, exist_ok=True)
+        # The index lives in memory, files left by an earlier process are orphans
+        for path in glob.glob(os.path.join(directory, "*.object")) + glob.glob(os.path.join(directory, "*.partial")):
+            os.remove(path)
+
+    @property
+    def max_object_size(self) -> int:
+        return max(self.memory_max_object_size, self.disk_max_object_size)
+
+    def _tier_for(self, entry: CachedObject) -> _Tier:
+        return self._memory if entry.data is not None else self._disk
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    # Lookups
+    def get(self, bucket_name: str, file_key: str) -> CachedObject | None:
+        key = (bucket_name, file_key)
+        now = time.monotonic()
+        with self._lock:
+            for tier in (self._memory, self._disk):
+                entry = tier.entries.get(key)
+                if entry is None:
+                    continue
+                if now - entry.last_used > self.max_idle:
+                    self._remove(tier, key)
+                    return None
+                entry.last_used = now
+                tier.entries.move_to_end(key)
+                return entry
+        return None
+
+    def generation(self, bucket_name: str) -> int:
+        with self._lock:
+            return self._generations.get(bucket_name, 0)
+
+    def record_hit(self, revalidated: bool):
+        self._count("revalidated" if revalidated else "hits")
+        OBJECT_CACHE_LOOKUPS.inc(result="revalidated" if revalidated else "hit")
+
+    def record_miss(self):
+        self._count("misses")
+        OBJECT_CACHE_LOOKUPS.inc(result="miss")
+
+    def refresh(self, entry: CachedObject):
+        # S3 answered 304 for the cached ETag
+        with self._lock:
+            entry.fresh_until = time.monotonic() + self.ttl
+
+    def open(self, entry: CachedObject) -> Iterator[bytes] | None:
+        # None when the file was evicted since the lookup; the caller reads from S3 instead
+        if entry.data is not None:
+            return self._iter_data(entry.data)
+        try:
+            with open(entry.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        # The mapping stays valid if the file is evicted and removed meanwhile
+        return self._iter_data(mapped)
+
+    def _iter_data(self, data: Any) -> Iterator[bytes]:
+        served = 0
+        try:
+            for offset in range(0, len(data), self.chunk_size):
+                chunk = data[offset:offset + self.chunk_size]
+                served += len(chunk)
+                yield chunk
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            self._count("bytes_from_cache", served)
+            OBJECT_CACHE_SERVED_BYTES.inc(served, source="cache")
+
+    # Fills
+    def fill(
+        self,
+        bucket_name: str,
+        file_key: str,
+        response: dict[str, Any],
+        chunks: Iterable[bytes],
+        generation: int,
+    ) -> Iterator[bytes]:
+        # Passes a GetObject body through and stores it once fully read
+        size = response["ContentLength"]
+        cacheable = size <= self.max_object_size and "ContentRange" not in response
+        in_memory = size <= self.memory_max_object_size
+        buffer: list[bytes] = []
+        partial = None
+        if cacheable and not in_memory:
+            partial = tempfile.NamedTemporaryFile(dir=self.directory, suffix=".partial", delete=False)
+        received = 0
+        try:
+            for chunk in chunks:
+                received += len(chunk)
+                if partial is not None:
+                    partial.write(chunk)
+                elif cacheable:
+                    buffer.append(chunk)
+                yield chunk
+            if cacheable and received == size:
+                entry = CachedObject(
+                    etag=response["ETag"],
+                    size=size,
+                    content_type=response.get("ContentType", "application/octet-stream"),
+                    last_modified=response.get("LastModified"),
+                    fresh_until=time.monotonic() + self.ttl,
+                    last_used=time.monotonic(),
+                    content_encoding=response.get("ContentEncoding"),
+                    uncompressed_size=response.get("Metadata", {}).get(UNCOMPRESSED_SIZE_METADATA_KEY),
+                )
+                if partial is not None:
+                    partial.close()
+                    entry.path = partial.name[: -len(".partial")] + ".object"
+                    os.replace(partial.name, entry.path)
+                    partial = None
+                else:
+                    entry.data = b"".join(buffer)
+                self._store(bucket_name, file_key, entry, generation)
+        finally:
+            if partial is not None:
+                partial.close()
+                os.remove(partial.name)
+            self._count("bytes_from_s3", received)
+            OBJECT_CACHE_SERVED_BYTES.inc(received, source="s3")
+
+    def _store(self, bucket_name: str, file_key: str, entry: CachedObject, generation: int):
+        key = (bucket_name, file_key)
+        tier = self._tier_for(entry)
+        with self._lock:
+            if generation != self._generations.get(bucket_name, 0):
+                if entry.path:
+                    os.remove(entry.path)
+                return
+            for existing in (self._memory, self._disk):
+                if key in existing.entries:
+                    self._remove(existing, key)
+            tier.entries[key] = entry
+            tier.size += entry.size
+            self._counters["fills"] += 1
+            self._evict(tier)
+
+    # Eviction and invalidation, callers hold the lock
+    def _remove(self, tier: _Tier, key: tuple[str, str]):
+        entry = tier.entries.pop(key)
+        tier.size -= entry.size
+        if entry.path:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, tier: _Tier):
+        # Entries are kept in order of use, idle ones are at the front
+        now = time.monotonic()
+        while tier.entries and now - next(iter(tier.entries.values())).last_used > self.max_idle:
+            self._remove(tier, next(iter(tier.entries)))
+            self._counters["evictions"] += 1
+        while tier.size > tier.max_bytes and tier.entries:
+            self._remove(tier, next(iter(tier.entries)))
+            self._counters["evictions"] += 1
+
+    def invalidate(self, bucket_name: str, file_keys: Iterable[str]):
+        with self._lock:
+            self._generations[bucket_name] = self._generations.get(bucket_name, 0) + 1
+            for file_key in file_keys:
+                for tier in (self._memory, self._disk):
+                    if (bucket_name, file_key) in tier.entries:
+                        self._remove(tier, (bucket_name, file_key))
+                        self._counters["invalidations"] += 1
+
+    def invalidate_bucket(self, bucket_name: str):
+        with self._lock:
+            self._generations[bucket_name] = self._generations.get(bucket_name, 0) + 1
+            for tier in (self._memory, self._disk):
+                for key in [key for key in tier.entries if key[0] == bucket_name]:
+                    self._remove(tier, key)
+                    self._counters["invalidations"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["revalidated"] + self._counters["misses"]
+            served = self._counters["bytes_from_cache"] + self._counters["bytes_from_s3"]
+            return {
+                **self._counters,
+                "hit_ratio": round((self._counters["hits"] + self._counters["revalidated"]) / lookups, 4)
+                if lookups else 0.0,
+                "byte_hit_ratio": round(self._counters["bytes_from_cache"] / served, 4) if served else 0.0,
+                "memory_entries": len(self._memory.entries),
+                "memory_bytes": self._memory.size,
+                "memory_max_bytes": self._memory.max_bytes,
+                "disk_entries": len(self._disk.entries),
+                "disk_bytes": self._disk.size,
+                "disk_max_bytes": self._disk.max_bytes,
+            }
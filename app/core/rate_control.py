@@ -0,0 +1,278 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+from app.utils.logging_config import get_logger
+
+T = TypeVar("T")
+
+# S3 answers 503 SlowDown (a bare "503" for HEAD) when a prefix is pushed too hard
+THROTTLING_ERROR_CODES = {
+    "SlowDown",
+    "503",
+    "ServiceUnavailable",
+    "Throttling",
+    "ThrottlingException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "BandwidthLimitExceeded",
+}
+TRANSIENT_ERROR_CODES = {
+    "InternalError",
+    "RequestTimeout",
+    "RequestTimeoutException",
+    "PriorRequestNotComplete",
+    "500",
+    "502",
+    "504",
+}
+# S3 request rate classes; LIST counts as a GET
+READ_OPERATIONS = {
+    "get_object",
+    "head_object",
+    "head_bucket",
+    "list_buckets",
+    "list_objects_v2",
+    "list_object_versions",
+    "list_multipart_uploads",
+    "list_parts",
+}
+# Sent to clients together with a 503 once retries are exhausted
+RETRY_AFTER_SECONDS = 1
+
+
+def error_code(error: BaseException | None) -> str | None:
+    return error.response.get("Error", {}).get("Code") if isinstance(error, ClientError) else None
+
+
+def is_throttling_error(error: BaseException | None) -> bool:
+    return error_code(error) in THROTTLING_ERROR_CODES
+
+
+class TokenBucket:
+    # Callers reserve a token and sleep until it is due, so waiting callers
+    # are served in arrival order without polling
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class AdaptiveConcurrencyLimit:
+    # AIMD limit on requests in flight. The limit doubles every window of
+    # successful requests until the first throttle (slow start), then grows
+    # by `increase` per window and is multiplied by `decrease_factor` on a
+    # throttle. Only requests started after the last decrease can lower it
+    # again, so one burst of SlowDowns counts as a single congestion signal.
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        decrease_factor: float = 0.5,
+        increase: float = 1.0,
+    ):
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease_factor = decrease_factor
+        self.increase = increase
+        self.slow_start_threshold = float(self.maximum)
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started: float, throttled: bool = False, succeeded: bool = True):
+        with self._condition:
+            self.in_flight -= 1
+            self.requests += 1
+            if throttled:
+                self._decrease(started)
+            elif succeeded:
+                if self.limit < self.slow_start_threshold:
+                    self.limit = min(self.slow_start_threshold, self.limit + self.increase)
+                else:
+                    self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+    def record_throttle(self):
+        # For throttles reported inside a successful response (DeleteObjects errors)
+        with self._condition:
+            self._decrease(time.monotonic())
+
+    def record_retry(self):
+        with self._condition:
+            self.retries += 1
+
+    def _decrease(self, started: float):
+        self.throttled += 1
+        if started >= self._last_decrease:
+            self.limit = max(self.minimum, self.limit * self.decrease_factor)
+            self.slow_start_threshold = self.limit
+            self._last_decrease = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "concurrency_limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "retries": self.retries,
+            }
+
+
+class S3RateController:
+    # Every S3 call made through s3Repository passes through `call`: it takes
+    # a token from the (bucket, prefix, read/write) bucket sized to S3's
+    # documented per-prefix request rates, waits for a slot under the bucket's
+    # adaptive concurrency limit, and retries throttled and transient failures
+    # with full-jitter exponential backoff. botocore's own retries are turned
+    # off for these clients so throttles reach this layer.
+    def __init__(
+        self,
+        reads_per_prefix: float,
+        writes_per_prefix: float,
+        prefix_depth: int,
+        initial_concurrency: int,
+        min_concurrency: int,
+        max_concurrency: int,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        max_tracked_prefixes: int = 10000,
+    ):
+        self.reads_per_prefix = reads_per_prefix
+        self.writes_per_prefix = writes_per_prefix
+        self.prefix_depth = prefix_depth
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_tracked_prefixes = max_tracked_prefixes
+        self._limits: dict[str, AdaptiveConcurrencyLimit] = {}
+        self._token_buckets: OrderedDict[tuple[str, str, bool], TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+        self.logger = get_logger(__name__)
+
+    def _partition(self, key: str) -> str:
+        # S3 scales request rates per key prefix; the first path segments stand in for it
+        return "/".join(key.split("/")[: self.prefix_depth]) if "/" in key else ""
+
+    def concurrency_limit(self, bucket_name: str) -> AdaptiveConcurrencyLimit:
+        limit = self._limits.get(bucket_name)
+        if limit is None:
+            with self._lock:
+                limit = self._limits.setdefault(
+                    bucket_name,
+                    AdaptiveConcurrencyLimit(self.initial_concurrency, self.min_concurrency, self.max_concurrency),
+                )
+        return limit
+
+    def _token_bucket(self, bucket_name: str, key: str, write: bool) -> TokenBucket:
+        token_key = (bucket_name, self._partition(key), write)
+        with self._lock:
+            token_bucket = self._token_buckets.get(token_key)
+            if token_bucket is None:
+                rate = self.writes_per_prefix if write else self.reads_per_prefix
+                token_bucket = self._token_buckets[token_key] = TokenBucket(rate, burst=rate)
+                if len(self._token_buckets) > self.max_tracked_prefixes:
+                    self._token_buckets.popitem(last=False)
+            else:
+                self._token_buckets.move_to_end(token_key)
+        return token_bucket
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: anywhere between 0 and the exponential cap
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(
+        self,
+        bucket_name: str,
+        key: str,
+        operation: str,
+        send: Callable[[], T],
+        on_retry: Callable[[], Any] | None = None,
+    ) -> T:
+        limit = self.concurrency_limit(bucket_name)
+        token_bucket = self._token_bucket(bucket_name, key, operation not in READ_OPERATIONS)
+        for attempt in range(self.max_attempts):
+            if attempt:
+                limit.record_retry()
+                if on_retry:
+                    on_retry()
+            token_bucket.acquire()
+            started = limit.acquire()
+            try:
+                result = send()
+            except ClientError as e:
+                code = error_code(e)
+                throttled = code in THROTTLING_ERROR_CODES
+                limit.release(started, throttled=throttled, succeeded=False)
+                if not (throttled or code in TRANSIENT_ERROR_CODES) or attempt == self.max_attempts - 1:
+                    raise
+                self.logger.warning(
+                    "%s on bucket '%s' failed with %s, retrying", operation, bucket_name, code
+                )
+            except (ConnectionError, HTTPClientError):
+                limit.release(started, succeeded=False)
+                if attempt == self.max_attempts - 1:
+                    raise
+                self.logger.warning("%s on bucket '%s' lost its connection, retrying", operation, bucket_name)
+            except BaseException:
+                # Credentials, parameter validation, reading the body: not retried,
+                # but the slot must still be given back
+                limit.release(started, succeeded=False)
+                raise
+            else:
+                limit.release(started)
+                return result
+            time.sleep(self.backoff(attempt))
+
+    def record_throttle(self, bucket_name: str):
+        # A DeleteObjects response that throttled some keys, which the caller retries
+        limit = self.concurrency_limit(bucket_name)
+        limit.record_throttle()
+        limit.record_retry()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            limits = dict(self._limits)
+            tracked_prefixes = len(self._token_buckets)
+        return {
+            "reads_per_prefix": self.reads_per_prefix,
+            "writes_per_prefix": self.writes_per_prefix,
+            "tracked_prefixes": tracked_prefixes,
+            "buckets": {bucket_name: limit.stats() for bucket_name, limit in sorted(limits.items())},
+        }
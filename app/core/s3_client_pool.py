@@ -0,0 +1,134 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.config import (
+    AWS_REGION,
+    METRICS_ENABLED,
+    S3_ENDPOINT_URL,
+    S3_RATE_CONTROL_ENABLED,
+    get_s3_client_config,
+    get_s3_endpoint_url,
+    get_s3_session,
+)
+from app.core.metrics import S3_CLIENT_CREATE_DURATION, instrument_s3_client, record_span
+from app.utils.logging_config import get_logger
+
+
+# Process-wide S3 clients, one per region, built from a single boto3 session.
+# boto3 clients are thread-safe and keep their own connection pool, so each
+# client is created once and shared by every request. boto3 itself is only
+# imported, and the session built, when the first client is needed.
+class S3ClientPool:
+    def __init__(self):
+        self.logger = get_logger(__name__)
+        self._session = None
+        self._config = None
+        self._clients = {}
+        self._presign_client = None
+        # boto3 sessions are not thread-safe, guard client creation
+        self._lock = threading.Lock()
+
+    def _create_session(self):
+        from botocore.config import Config
+
+        self._session = get_s3_session()
+        self._config = get_s3_client_config()
+        if S3_RATE_CONTROL_ENABLED:
+            # S3RateController retries instead, botocore retrying underneath would hide throttles from it
+            self._config = self._config.merge(Config(retries={"total_max_attempts": 1}))
+
+    def lazy_client(self, region_name: str | None = None) -> "LazyS3Client":
+        return LazyS3Client(lambda: self.get_client(region_name))
+
+    def lazy_presign_client(self) -> "LazyS3Client":
+        return LazyS3Client(self.get_presign_client)
+
+    def get_presign_client(self):
+        # Presigned URLs are SigV4 on the regional endpoint: SigV2 does not sign
+        # Content-Length and is refused in SigV4-only regions, and a SigV4 URL
+        # on the global endpoint gets a redirect that browsers do not follow
+        if self._presign_client is not None:
+            return self._presign_client
+        from botocore.config import Config
+
+        with self._lock:
+            if self._presign_client is None:
+                if self._session is None:
+                    self._create_session()
+                config = Config(signature_version="s3v4")
+                if not S3_ENDPOINT_URL:
+                    # bucket.s3.<region>.amazonaws.com instead of the global host
+                    config = config.merge(Config(s3={"addressing_style": "virtual"}))
+                self._presign_client = self._session.client(
+                    service_name="s3",
+                    region_name=AWS_REGION,
+                    endpoint_url=S3_ENDPOINT_URL,
+                    config=self._config.merge(config),
+                )
+        return self._presign_client
+
+    def get_client(self, region_name: str | None = None):
+        client = self._clients.get(region_name)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(region_name)
+            if client is None:
+                self.logger.info("Creating S3 client for region '%s'", region_name or "default")
+                started = time.perf_counter()
+                if self._session is None:
+                    self._create_session()
+                client = self._session.client(
+                    service_name="s3",
+                    region_name=region_name,
+                    endpoint_url=get_s3_endpoint_url(region_name),
+                    config=self._config,
+                )
+                if METRICS_ENABLED:
+                    instrument_s3_client(client)
+                elapsed = time.perf_counter() - started
+                S3_CLIENT_CREATE_DURATION.observe(elapsed)
+                record_span("s3.client_create", elapsed)
+                self._clients[region_name] = client
+        return client
+
+    def warm_up(self, connections: int):
+        # Creating the client loads the service model and endpoint rules; the
+        # calls resolve credentials and leave `connections` open connections
+        # in the client's pool
+        from botocore.exceptions import ClientError
+
+        client = self.get_client()
+
+        def open_connection(_):
+            try:
+                client.list_buckets()
+            except ClientError:
+                # Any answer from S3 means the connection is open
+                pass
+
+        with ThreadPoolExecutor(max_workers=max(connections, 1)) as executor:
+            list(executor.map(open_connection, range(connections)))
+        self.logger.info("S3 client warmed up with %s connections", connections)
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            if self._presign_client is not None:
+                self._presign_client.close()
+                self._presign_client = None
+
+
+class LazyS3Client:
+    # Stands in for a pooled client that is created on first use, so startup
+    # does not import boto3 or load the S3 service model
+    def __init__(self, get_client: Callable[[], Any]):
+        self._get_client = get_client
+
+    def __getattr__(self, name: str):
+        return getattr(self._get_client(), name)
@@ -1,13 +1,235 @@
-from fastapi import Depends
-from app.core.config import get_s3_client_credentials
+import asyncio
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import (
+    CONTENT_HASH_DB_PATH,
+    JOB_DB_PATH,
+    JOB_HISTORY_SIZE,
+    JOB_MAX_WORKERS,
+    JOB_PROGRESS_FLUSH_INTERVAL,
+    METADATA_CACHE_BUCKETS_TTL,
+    METADATA_CACHE_ENABLED,
+    METADATA_CACHE_LISTING_TTL,
+    METADATA_CACHE_MAX_ENTRIES,
+    METADATA_INDEX_CRAWL_CONCURRENCY,
+    METADATA_INDEX_DB_PATH,
+    METADATA_INDEX_ENABLED,
+    METADATA_INDEX_MAX_SHARD_DEPTH,
+    METADATA_INDEX_MIN_SHARDS,
+    OBJECT_CACHE_DIR,
+    OBJECT_CACHE_DISK_MAX_BYTES,
+    OBJECT_CACHE_DISK_MAX_OBJECT_SIZE,
+    OBJECT_CACHE_ENABLED,
+    OBJECT_CACHE_MAX_IDLE,
+    OBJECT_CACHE_MEMORY_MAX_BYTES,
+    OBJECT_CACHE_MEMORY_MAX_OBJECT_SIZE,
+    OBJECT_CACHE_TTL,
+    S3_ENGINE,
+    S3_RATE_CONTROL_ENABLED,
+    S3_RATE_INITIAL_CONCURRENCY,
+    S3_RATE_MAX_CONCURRENCY,
+    S3_RATE_MIN_CONCURRENCY,
+    S3_RATE_PREFIX_DEPTH,
+    S3_RATE_READS_PER_PREFIX,
+    S3_RATE_WRITES_PER_PREFIX,
+    S3_RETRY_BASE_DELAY,
+    S3_RETRY_MAX_ATTEMPTS,
+    S3_RETRY_MAX_DELAY,
+    S3_DOWNLOAD_CHUNK_SIZE,
+    S3_TRANSFER_MAX_WORKERS,
+    S3_WARMUP_CONNECTIONS,
+    S3_WARMUP_ENABLED,
+    UPLOAD_SESSION_DB_PATH,
+)
+from app.core.metadata_cache import MetadataCache
+from app.core.metrics import TracingThreadPoolExecutor
+from app.core.object_cache import ObjectCache
+from app.core.rate_control import S3RateController
+from app.core.s3_client_pool import S3ClientPool
+from app.jobs.repositories.job_repository import JobRepository
+from app.jobs.services.job_manager import JobManager
+from app.s3_bucket.repositories.cached_s3_repository import CachedS3Repository
+from app.s3_bucket.repositories.content_hash_repository import ContentHashRepository
+from app.s3_bucket.repositories.indexed_s3_repository import IndexedS3Repository
 from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.repositories.upload_session_repository import UploadSessionRepository
 from app.s3_bucket.services.s3_service import s3Service
+from app.s3_bucket.services.upload_session_service import UploadSessionService
+from app.s3_index.repositories.index_repository import MetadataIndexRepository
+from app.s3_index.services.index_service import MetadataIndexService
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Called once from the app lifespan
+async def init_s3_dependencies(app: FastAPI):
+    s3_client_pool = S3ClientPool()
+    transfer_executor = TracingThreadPoolExecutor(
+        max_workers=S3_TRANSFER_MAX_WORKERS, thread_name_prefix="s3-transfer"
+    )
+    job_manager = JobManager(
+        JobRepository(JOB_DB_PATH),
+        max_workers=JOB_MAX_WORKERS,
+        history_size=JOB_HISTORY_SIZE,
+        flush_interval=JOB_PROGRESS_FLUSH_INTERVAL,
+    )
+    # Created on first use, or by the warm-up below
+    s3_client = s3_client_pool.lazy_client()
+    presign_client = s3_client_pool.lazy_presign_client()
+    rate_controller = None
+    if S3_RATE_CONTROL_ENABLED:
+        # Shared by every sync repository, so limits are per bucket across the whole process
+        rate_controller = S3RateController(
+            reads_per_prefix=S3_RATE_READS_PER_PREFIX,
+            writes_per_prefix=S3_RATE_WRITES_PER_PREFIX,
+            prefix_depth=S3_RATE_PREFIX_DEPTH,
+            initial_concurrency=S3_RATE_INITIAL_CONCURRENCY,
+            min_concurrency=S3_RATE_MIN_CONCURRENCY,
+            max_concurrency=S3_RATE_MAX_CONCURRENCY,
+            max_attempts=S3_RETRY_MAX_ATTEMPTS,
+            base_delay=S3_RETRY_BASE_DELAY,
+            max_delay=S3_RETRY_MAX_DELAY,
+        )
+    metadata_cache = None
+    object_cache = None
+    if METADATA_CACHE_ENABLED:
+        metadata_cache = MetadataCache(max_entries=METADATA_CACHE_MAX_ENTRIES)
+        # Only the sync engine's writes invalidate it, see hash_cache below
+        if OBJECT_CACHE_ENABLED and S3_ENGINE == "sync":
+            object_cache = ObjectCache(
+                OBJECT_CACHE_DIR,
+                ttl=OBJECT_CACHE_TTL,
+                max_idle=OBJECT_CACHE_MAX_IDLE,
+                memory_max_bytes=OBJECT_CACHE_MEMORY_MAX_BYTES,
+                memory_max_object_size=OBJECT_CACHE_MEMORY_MAX_OBJECT_SIZE,
+                disk_max_bytes=OBJECT_CACHE_DISK_MAX_BYTES,
+                disk_max_object_size=OBJECT_CACHE_DISK_MAX_OBJECT_SIZE,
+                chunk_size=S3_DOWNLOAD_CHUNK_SIZE,
+            )
+        repo = CachedS3Repository(
+            s3_client,
+            metadata_cache,
+            buckets_ttl=METADATA_CACHE_BUCKETS_TTL,
+            listing_ttl=METADATA_CACHE_LISTING_TTL,
+            rate_controller=rate_controller,
+            object_cache=object_cache,
+            presign_client=presign_client,
+        )
+    else:
+        repo = s3Repository(s3_client=s3_client, rate_controller=rate_controller, presign_client=presign_client)
+    metadata_index = None
+    if METADATA_INDEX_ENABLED:
+        # Crawls list through an uncached repository, so they do not flood the metadata cache
+        metadata_index = MetadataIndexService(
+            MetadataIndexRepository(METADATA_INDEX_DB_PATH),
+            s3Repository(s3_client=s3_client, rate_controller=rate_controller),
+            transfer_executor,
+            job_manager,
+            concurrency=METADATA_INDEX_CRAWL_CONCURRENCY,
+            min_shards=METADATA_INDEX_MIN_SHARDS,
+            max_shard_depth=METADATA_INDEX_MAX_SHARD_DEPTH,
+        )
+        repo = IndexedS3Repository(repo, metadata_index)
+    app.state.s3_client_pool = s3_client_pool
+    app.state.metadata_cache = metadata_cache
+    app.state.object_cache = object_cache
+    app.state.rate_controller = rate_controller
+    app.state.metadata_index = metadata_index
+    app.state.transfer_executor = transfer_executor
+    app.state.job_manager = job_manager
+    app.state.s3_service = s3Service(
+        repo,
+        transfer_executor,
+        job_manager,
+        ContentHashRepository(CONTENT_HASH_DB_PATH),
+        # Async engine writes skip CachedS3Repository's invalidation, so a
+        # cached content hash could wrongly skip an upload there
+        hash_cache=metadata_cache if S3_ENGINE == "sync" else None,
+        object_cache=object_cache,
+    )
+    app.state.upload_session_service = UploadSessionService(
+        repo, UploadSessionRepository(UPLOAD_SESSION_DB_PATH), app.state.s3_service
+    )
+    # Handlers are registered by s3Service and MetadataIndexService, so unfinished jobs can be picked up now
+    job_manager.resume_unfinished()
+
+    if S3_ENGINE == "async":
+        from app.core.async_s3_client_pool import AsyncS3ClientPool
+        from app.s3_bucket.repositories.async_s3_repository import AsyncS3Repository
+        from app.s3_bucket.services.async_s3_service import asyncS3Service
+
+        async_s3_client_pool = AsyncS3ClientPool()
+        async_repo = AsyncS3Repository(s3_client=await async_s3_client_pool.get_client())
+        app.state.async_s3_client_pool = async_s3_client_pool
+        app.state.async_s3_service = asyncS3Service(
+            async_repo, app.state.s3_service, metadata_index
+        )
+
+    app.state.ready = not S3_WARMUP_ENABLED
+    app.state.warm_up_task = asyncio.create_task(warm_up_s3_dependencies(app)) if S3_WARMUP_ENABLED else None
+
+
+async def warm_up_s3_dependencies(app: FastAPI):
+    # Runs in the background, so /ping answers at once and /ready once S3 calls are warm
+    started = asyncio.get_running_loop().time()
+    try:
+        await run_in_threadpool(app.state.s3_client_pool.warm_up, S3_WARMUP_CONNECTIONS)
+        if S3_ENGINE == "async":
+            await app.state.async_s3_client_pool.warm_up(S3_WARMUP_CONNECTIONS)
+        logger.info("S3 warm-up finished in %.2fs", asyncio.get_running_loop().time() - started)
+    except Exception:
+        # S3 being unreachable at startup is not a reason to stay unready
+        logger.warning("S3 warm-up failed, clients will connect on first use", exc_info=True)
+    finally:
+        app.state.ready = True
+
+
+async def close_s3_dependencies(app: FastAPI):
+    if app.state.warm_up_task is not None:
+        app.state.warm_up_task.cancel()
+    app.state.job_manager.shutdown()
+    app.state.transfer_executor.shutdown(wait=True, cancel_futures=True)
+    app.state.s3_client_pool.close()
+    if S3_ENGINE == "async":
+        await app.state.async_s3_client_pool.close()
+
+
+def get_s3_client_pool(request: Request) -> S3ClientPool:
+    return request.app.state.s3_client_pool
+
+
+def get_job_manager(request: Request) -> JobManager:
+    return request.app.state.job_manager
 
-def get_s3_service() -> s3Service:
-    s3_client = get_s3_client_credentials()
-    repo = s3Repository(s3_client=s3_client)
-    return s3Service(repo)
+
+def get_metadata_cache(request: Request) -> MetadataCache | None:
+    return request.app.state.metadata_cache
+
+
+def get_object_cache(request: Request) -> ObjectCache | None:
+    return request.app.state.object_cache
+
+
+def get_rate_controller(request: Request) -> S3RateController | None:
+    return request.app.state.rate_controller
+
+
+def get_metadata_index(request: Request) -> MetadataIndexService | None:
+    return request.app.state.metadata_index
+
+
+def get_s3_service(request: Request) -> s3Service:
+    return request.app.state.s3_service
+
+
+def get_upload_session_service(request: Request) -> UploadSessionService:
+    return request.app.state.upload_session_service
+
+
+def get_async_s3_service(request: Request):
+    return request.app.state.async_s3_service
 
 class SessionDependency:
     pass
-
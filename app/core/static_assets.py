@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.core.compression import accepts_encoding
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Unhashed URLs and the page itself are revalidated on every use
+REVALIDATE_CACHE_CONTROL = "no-cache"
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".txt", ".map")
+HASH_LENGTH = 12
+# src="app.js", href="./style.css", href="/static/style.css"
+ASSET_REFERENCE = re.compile(r'\b(src|href)="(?:\./|/static/)?([^"/:?#]+)"')
+
+
+def _brotli():
+    # Optional, files are only precompressed with gzip when brotli is not installed
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+@dataclass
+class StaticAsset:
+    content_type: str
+    body: bytes
+    digest: str
+    hashed_name: str
+    # Precompressed bodies by Content-Encoding, only where smaller
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    def etag(self, encoding: str | None) -> str:
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+
+def make_asset(body: bytes, name: str) -> StaticAsset:
+    digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+    stem, extension = os.path.splitext(name)
+    asset = StaticAsset(
+        content_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+        body=body,
+        digest=digest,
+        hashed_name=f"{stem}.{digest}{extension}",
+    )
+    if extension in COMPRESSIBLE_EXTENSIONS:
+        candidates = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli := _brotli():
+            candidates["br"] = brotli.compress(body, quality=11)
+        asset.encoded = {encoding: data for encoding, data in candidates.items() if len(data) < len(body)}
+    return asset
+
+
+def asset_response(asset: StaticAsset, scope: Scope, cache_control: str) -> Response:
+    headers = Headers(scope=scope)
+    accept_encoding = headers.get("accept-encoding")
+    encoding = next(
+        (encoding for encoding in ("br", "gzip") if encoding in asset.encoded and accepts_encoding(accept_encoding, encoding)),
+        None,
+    )
+    response_headers = {"ETag": asset.etag(encoding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or response_headers["ETag"] in [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    ):
+        return Response(status_code=304, headers=response_headers)
+    if encoding:
+        response_headers["Content-Encoding"] = encoding
+    return Response(asset.encoded.get(encoding, asset.body), media_type=asset.content_type, headers=response_headers)
+
+
+class HashedStaticFiles(StaticFiles):
+    # Serves the top-level files of a directory from memory, loaded once at
+    # startup with precompressed gzip (and brotli) variants. Each file is also
+    # reachable under a content-hashed name (app.<hash>.js) that is cached by
+    # browsers for a year; plain names and index.html are revalidated with
+    # their ETag. Anything else falls back to StaticFiles.
+    def __init__(self, directory: str, url_prefix: str = "/static", hashed_urls: bool = True):
+        super().__init__(directory=directory)
+        self.url_prefix = url_prefix
+        self.hashed_urls = hashed_urls
+        self.assets: dict[str, StaticAsset] = {}
+        self._by_hashed_name: dict[str, StaticAsset] = {}
+        for entry in os.scandir(directory):
+            if entry.is_file():
+                with open(entry.path, "rb") as f:
+                    asset = make_asset(f.read(), entry.name)
+                self.assets[entry.name] = asset
+                self._by_hashed_name[asset.hashed_name] = asset
+        self._pages: dict[str, StaticAsset] = {}
+
+    def url_for(self, name: str) -> str:
+        asset = self.assets.get(name)
+        return f"{self.url_prefix}/{asset.hashed_name if asset and self.hashed_urls else name}"
+
+    def page(self, name: str) -> StaticAsset:
+        # An HTML file with its asset references pointed at the served URLs
+        page = self._pages.get(name)
+        if page is None:
+            html = self.assets[name].body.decode()
+            html = ASSET_REFERENCE.sub(
+                lambda match: f'{match[1]}="{self.url_for(match[2])}"' if match[2] in self.assets else match[0],
+                html,
+            )
+            page = self._pages[name] = make_asset(html.encode(), name)
+        return page
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if asset := self._by_hashed_name.get(path):
+            return asset_response(asset, scope, IMMUTABLE_CACHE_CONTROL)
+        if asset := self.assets.get(path):
+            return asset_response(asset, scope, REVALIDATE_CACHE_CONTROL)
+        return await super().get_response(path, scope)
+
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, LOG_QUEUE_SIZE, LOG_RECORDS_DROPPED, REGISTRY
+from app.utils.logging_config import logging_stats
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    stats = logging_stats()
+    LOG_QUEUE_SIZE.set(stats["queued"])
+    LOG_RECORDS_DROPPED.set(stats["dropped"])
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,7 +1,15 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
 @router.get("/ping")
 def ping():
     return {"status": "alive"}
+
+@router.get("/ready")
+def ready(request: Request):
+    # 503 until the S3 warm-up started in the lifespan is done
+    if not request.app.state.ready:
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+from typing import Any
+
+COLUMNS = (
+    "job_id",
+    "operation",
+    "params",
+    "status",
+    "processed",
+    "failed",
+    "bytes_processed",
+    "total",
+    "result",
+    "error",
+    "checkpoint",
+    "created_at",
+    "started_at",
+    "finished_at",
+)
+JSON_COLUMNS = ("params", "result", "checkpoint")
+
+
+# Jobs are kept in SQLite so unfinished ones can be resumed after a restart.
+# JSON columns hold the operation parameters, the final result and the last
+# checkpoint written by the running operation.
+class JobRepository:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    operation TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    processed INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    bytes_processed INTEGER NOT NULL DEFAULT 0,
+                    total INTEGER,
+                    result TEXT,
+                    error TEXT,
+                    checkpoint TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _to_row(self, job: dict[str, Any]) -> dict[str, Any]:
+        return {
+            column: json.dumps(job[column]) if column in JSON_COLUMNS and job[column] is not None else job[column]
+            for column in job
+        }
+
+    def _from_row(self, row: tuple) -> dict[str, Any]:
+        job = dict(zip(COLUMNS, row))
+        for column in JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def create_job(self, job: dict[str, Any]):
+        row = self._to_row(job)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"INSERT INTO jobs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                tuple(row[column] for column in COLUMNS),
+            )
+
+    def update_job(self, job_id: str, **fields: Any):
+        row = self._to_row(fields)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in row)} WHERE job_id = ?",
+                (*row.values(), job_id),
+            )
+
+    def get_job(self, job_id: str) -> dict[str, Any] | None:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def list_jobs(self, statuses: list[str] | None = None, limit: int | None = None) -> list[dict[str, Any]]:
+        query = f"SELECT {', '.join(COLUMNS)} FROM jobs"
+        args: list[Any] = []
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+            args.extend(statuses)
+        query += " ORDER BY created_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(limit)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(query, args).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def prune_finished(self, finished_statuses: list[str], keep: int):
+        # Keeps the newest `keep` finished jobs
+        placeholders = ", ".join("?" for _ in finished_statuses)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"""
+                DELETE FROM jobs WHERE status IN ({placeholders}) AND job_id NOT IN (
+                    SELECT job_id FROM jobs WHERE status IN ({placeholders})
+                    ORDER BY created_at DESC LIMIT ?
+                )
+                """,
+                (*finished_statuses, *finished_statuses, keep),
+            )
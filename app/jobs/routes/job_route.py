@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.enums import JobStatus
+from app.core.session_dependencies import get_job_manager
+from app.jobs.schemas.job_response_schema import JobResponse
+from app.jobs.services.job_manager import FINISHED_STATUSES, JobManager
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"]
+)
+
+@router.get("", response_model=list[JobResponse])
+def list_jobs(
+    status: JobStatus | None = Query(None, description="Only return jobs with this status"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of jobs, newest first"),
+    job_manager: JobManager = Depends(get_job_manager),
+):
+    return [job.to_response() for job in job_manager.list_jobs(status, limit)]
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)):
+    job = job_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job does not exist.")
+    return job.to_response()
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job does not exist.")
+    if job.status in FINISHED_STATUSES and job.status != JobStatus.cancelled:
+        raise HTTPException(status_code=409, detail=f"Job has already {job.status.value}.")
+    return job.to_response()
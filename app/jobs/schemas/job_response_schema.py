@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from app.core.enums import JobStatus
+
+
+class JobResponse(BaseModel):
+    job_id: str = Field(..., description="Identifier returned when the job was submitted")
+    operation: str = Field(..., description="Operation run by the job (e.g. delete_folder)")
+    params: dict[str, Any] = Field(default_factory=dict, description="Parameters the job was submitted with")
+    status: JobStatus
+    processed: int = Field(default=0, description="Objects processed so far")
+    failed: int = Field(default=0, description="Objects that could not be processed")
+    bytes_processed: int = Field(default=0, description="Bytes transferred so far")
+    total: int | None = Field(default=None, description="Total objects, once known")
+    objects_per_second: float | None = Field(default=None, description="Processing rate while running")
+    bytes_per_second: float | None = Field(default=None, description="Transfer rate while running")
+    eta_seconds: float | None = Field(default=None, description="Estimated time left, when the total is known")
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
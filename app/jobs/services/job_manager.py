@@ -0,0 +1,316 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from app.core.enums import JobStatus
+from app.jobs.repositories.job_repository import JobRepository
+from app.jobs.schemas.job_response_schema import JobResponse
+from app.utils.logging_config import get_logger
+
+FINISHED_STATUSES = (JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _format_time(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+class JobStopped(Exception):
+    # Raised from progress and checkpoint calls once a job has been asked to
+    # stop, either by a cancel request or by the process shutting down.
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Job:
+    def __init__(
+        self,
+        operation: str,
+        params: dict[str, Any],
+        job_id: str | None = None,
+        status: JobStatus = JobStatus.pending,
+        processed: int = 0,
+        failed: int = 0,
+        bytes_processed: int = 0,
+        total: int | None = None,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+        checkpoint: dict[str, Any] | None = None,
+        created_at: datetime | None = None,
+        started_at: datetime | None = None,
+        finished_at: datetime | None = None,
+    ):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.operation = operation
+        self.params = params
+        self.status = JobStatus(status)
+        self.processed = processed
+        self.failed = failed
+        self.bytes_processed = bytes_processed
+        self.total = total
+        self.result = result
+        self.error = error
+        self.checkpoint = checkpoint
+        self.created_at = created_at or _now()
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.stop_reason: str | None = None
+        self._on_flush: Callable[["Job"], None] | None = None
+        self._flush_interval = 0.0
+        self._last_flush = 0.0
+        # Rates are measured over the current run so a resumed job is not skewed
+        self._run_started = time.monotonic()
+        self._run_processed = processed
+        self._run_bytes = bytes_processed
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> "Job":
+        return cls(
+            record["operation"],
+            record["params"],
+            job_id=record["job_id"],
+            status=record["status"],
+            processed=record["processed"],
+            failed=record["failed"],
+            bytes_processed=record["bytes_processed"],
+            total=record["total"],
+            result=record["result"],
+            error=record["error"],
+            checkpoint=record["checkpoint"],
+            created_at=_parse_time(record["created_at"]),
+            started_at=_parse_time(record["started_at"]),
+            finished_at=_parse_time(record["finished_at"]),
+        )
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "operation": self.operation,
+            "params": self.params,
+            "status": self.status.value,
+            "processed": self.processed,
+            "failed": self.failed,
+            "bytes_processed": self.bytes_processed,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+            "checkpoint": self.checkpoint,
+            "created_at": _format_time(self.created_at),
+            "started_at": _format_time(self.started_at),
+            "finished_at": _format_time(self.finished_at),
+        }
+
+    @property
+    def stopped(self) -> bool:
+        return self.stop_reason is not None
+
+    def raise_if_stopped(self):
+        if self.stop_reason is not None:
+            raise JobStopped(self.stop_reason)
+
+    def report_progress(self, processed: int, failed: int = 0, bytes_processed: int | None = None):
+        self.processed = processed
+        self.failed = failed
+        if bytes_processed is not None:
+            self.bytes_processed = bytes_processed
+        self._flush()
+        self.raise_if_stopped()
+
+    def set_total(self, total: int):
+        self.total = total
+
+    def save_checkpoint(self, checkpoint: dict[str, Any]):
+        # Written straight away: a restarted job continues from the last checkpoint
+        self.checkpoint = checkpoint
+        self._flush(force=True)
+        self.raise_if_stopped()
+
+    def _flush(self, force: bool = False):
+        now = time.monotonic()
+        if self._on_flush and (force or now - self._last_flush >= self._flush_interval):
+            self._last_flush = now
+            self._on_flush(self)
+
+    def _start_run(self):
+        self._run_started = time.monotonic()
+        self._run_processed = self.processed
+        self._run_bytes = self.bytes_processed
+
+    def to_response(self) -> JobResponse:
+        objects_per_second = bytes_per_second = eta_seconds = None
+        if self.status == JobStatus.running:
+            elapsed = time.monotonic() - self._run_started
+            if elapsed > 0:
+                objects_per_second = round((self.processed - self._run_processed) / elapsed, 2)
+                bytes_per_second = round((self.bytes_processed - self._run_bytes) / elapsed, 2)
+            if self.total is not None and objects_per_second:
+                remaining = max(self.total - self.processed - self.failed, 0)
+                eta_seconds = round(remaining / objects_per_second, 1)
+        return JobResponse(
+            job_id=self.job_id,
+            operation=self.operation,
+            params=self.params,
+            status=self.status,
+            processed=self.processed,
+            failed=self.failed,
+            bytes_processed=self.bytes_processed,
+            total=self.total,
+            objects_per_second=objects_per_second,
+            bytes_per_second=bytes_per_second,
+            eta_seconds=eta_seconds,
+            result=self.result,
+            error=self.error,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+        )
+
+
+class JobManager:
+    # Runs long operations on a dedicated pool, separate from the transfer
+    # pool the operations themselves fan out to. Jobs are persisted through
+    # JobRepository; each operation name maps to a registered handler so jobs
+    # left unfinished by a restart can be rebuilt and resumed from their
+    # last checkpoint.
+    def __init__(
+        self,
+        job_repository: JobRepository,
+        max_workers: int,
+        history_size: int,
+        flush_interval: float = 1.0,
+    ):
+        self.job_repository = job_repository
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-job")
+        self.history_size = history_size
+        self.flush_interval = flush_interval
+        self.handlers: dict[str, Callable[[Job], dict[str, Any]]] = {}
+        self.jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self.logger = get_logger(__name__)
+
+    def register(self, operation: str, handler: Callable[[Job], dict[str, Any]]):
+        self.handlers[operation] = handler
+
+    def submit(self, operation: str, params: dict[str, Any]) -> Job:
+        if operation not in self.handlers:
+            raise ValueError(f"No handler registered for job operation '{operation}'")
+        job = Job(operation, params)
+        self.job_repository.create_job(job.to_record())
+        self.job_repository.prune_finished([status.value for status in FINISHED_STATUSES], self.history_size)
+        self._enqueue(job)
+        self.logger.info("Submitted job '%s' (%s)", job.job_id, operation)
+        return job
+
+    def resume_unfinished(self) -> int:
+        # Called once at startup, after every handler has been registered
+        records = self.job_repository.list_jobs([JobStatus.pending.value, JobStatus.running.value])
+        for record in reversed(records):
+            job = Job.from_record(record)
+            job.status = JobStatus.pending
+            self._enqueue(job)
+            self.logger.info("Resuming job '%s' (%s)", job.job_id, job.operation)
+        return len(records)
+
+    def get_job(self, job_id: str) -> Job | None:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+        record = self.job_repository.get_job(job_id)
+        return Job.from_record(record) if record else None
+
+    def list_jobs(self, status: JobStatus | None = None, limit: int = 100) -> list[Job]:
+        records = self.job_repository.list_jobs([status.value] if status else None, limit)
+        return [self.jobs.get(record["job_id"]) or Job.from_record(record) for record in records]
+
+    def cancel(self, job_id: str) -> Job | None:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return self.get_job(job_id)
+            if job.status == JobStatus.pending:
+                job.status = JobStatus.cancelled
+                job.finished_at = _now()
+                self._persist(job)
+            elif job.status == JobStatus.running:
+                # The handler stops at its next progress report or checkpoint
+                job.stop_reason = "cancel"
+        self.logger.info("Cancel requested for job '%s'", job_id)
+        return job
+
+    def shutdown(self):
+        # Running jobs stop at their next progress report and stay unfinished
+        # in the store, so they are resumed by the next process
+        with self._lock:
+            for job in self.jobs.values():
+                job.stop_reason = job.stop_reason or "shutdown"
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _enqueue(self, job: Job):
+        job._on_flush = self._persist_progress
+        job._flush_interval = self.flush_interval
+        with self._lock:
+            self.jobs[job.job_id] = job
+        self.executor.submit(self._run, job)
+
+    def _persist(self, job: Job):
+        record = job.to_record()
+        del record["job_id"]
+        self.job_repository.update_job(job.job_id, **record)
+
+    def _persist_progress(self, job: Job):
+        self.job_repository.update_job(
+            job.job_id,
+            processed=job.processed,
+            failed=job.failed,
+            bytes_processed=job.bytes_processed,
+            total=job.total,
+            checkpoint=job.checkpoint,
+        )
+
+    def _run(self, job: Job):
+        with self._lock:
+            if job.status != JobStatus.pending or job.stopped:
+                self.jobs.pop(job.job_id, None)
+                return
+            job.status = JobStatus.running
+            job.started_at = job.started_at or _now()
+            job._start_run()
+        self._persist(job)
+
+        handler = self.handlers.get(job.operation)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job operation '{job.operation}'")
+            job.result = handler(job)
+            job.status = JobStatus.succeeded
+            self.logger.info("Job '%s' (%s) succeeded", job.job_id, job.operation)
+        except JobStopped as e:
+            if e.reason == "cancel":
+                job.status = JobStatus.cancelled
+                self.logger.info("Job '%s' (%s) cancelled", job.job_id, job.operation)
+            else:
+                job.status = JobStatus.pending
+                self.logger.info(
+                    "Job '%s' (%s) interrupted, will resume on restart", job.job_id, job.operation
+                )
+        except Exception as e:
+            job.error = getattr(e, "detail", None) or str(e)
+            job.status = JobStatus.failed
+            self.logger.error("Job '%s' (%s) failed", job.job_id, job.operation, exc_info=True)
+        finally:
+            if job.status in FINISHED_STATUSES:
+                job.finished_at = _now()
+            self._persist(job)
+            with self._lock:
+                self.jobs.pop(job.job_id, None)
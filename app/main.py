@@ -1,15 +1,48 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app.core.compression import ResponseCompressionMiddleware
+from app.core.config import (
+    METRICS_ENABLED,
+    RESPONSE_COMPRESSION_ENABLED,
+    RESPONSE_COMPRESSION_LEVEL,
+    RESPONSE_COMPRESSION_MIN_SIZE,
+    S3_ENGINE,
+    SERVER_TIMING_ENABLED,
+    STATIC_ASSETS_HASHED,
+)
+from app.core.metrics import MetricsMiddleware
+from app.core.rate_control import RETRY_AFTER_SECONDS, is_throttling_error
+from app.core.session_dependencies import close_s3_dependencies, init_s3_dependencies
+from app.core.static_assets import REVALIDATE_CACHE_CONTROL, HashedStaticFiles, asset_response
+from app.health_check.metrics import router as metrics_router
 from app.health_check.ping import router as ping_router
-from app.s3_bucket.routes.s3_route import router as s3_bucket_router
+from app.jobs.routes.job_route import router as job_router
+from app.s3_bucket.routes.presign_route import router as presign_router
+from app.s3_bucket.routes.upload_session_route import router as upload_session_router
+from app.s3_index.routes.index_route import router as index_router
+if S3_ENGINE == "async":
+    from app.s3_bucket.routes.async_s3_route import router as s3_bucket_router
+else:
+    from app.s3_bucket.routes.s3_route import router as s3_bucket_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_s3_dependencies(app)
+    yield
+    await close_s3_dependencies(app)
+
 
 app = FastAPI(
     title="AWS S3 File Uploader",
-    description="FastAPI app to manage AWS S3"
+    description="FastAPI app to manage AWS S3",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -20,16 +53,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        ResponseCompressionMiddleware,
+        minimum_size=RESPONSE_COMPRESSION_MIN_SIZE,
+        level=RESPONSE_COMPRESSION_LEVEL,
+    )
+
+if METRICS_ENABLED:
+    # Outermost, so the timings include CORS handling and error responses
+    app.add_middleware(MetricsMiddleware, server_timing=SERVER_TIMING_ENABLED)
+
+@app.exception_handler(StarletteHTTPException)
+async def s3_throttling_exception_handler(request: Request, exc: StarletteHTTPException):
+    # Services turn unexpected ClientErrors into 500s; S3 still throttling
+    # after the retries is reported as 503 so clients back off and retry
+    if exc.status_code == 500 and is_throttling_error(exc.__cause__ or exc.__context__):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "S3 is throttling requests, please retry later."},
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+    return await http_exception_handler(request, exc)
+
 app.include_router(ping_router)
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
 app.include_router(s3_bucket_router)
+app.include_router(presign_router)
+app.include_router(upload_session_router)
+app.include_router(job_router)
+app.include_router(index_router)
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 FRONTEND_DIR = PROJECT_ROOT / "frontend"
 
-# Mount the entire frontend as static
-app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
+# Mount the entire frontend as static, loaded and precompressed once
+static_files = HashedStaticFiles(directory=FRONTEND_DIR, url_prefix="/static", hashed_urls=STATIC_ASSETS_HASHED)
+app.mount("/static", static_files, name="static")
 
 @app.get("/")
-def home():
-    # Serve index.html from /static so relative paths work
-    return FileResponse(FRONTEND_DIR / "index.html")
+def home(request: Request):
+    # index.html with its assets linked under /static
+    return asset_response(static_files.page("index.html"), request.scope, REVALIDATE_CACHE_CONTROL)
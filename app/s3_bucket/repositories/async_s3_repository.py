@@ -0,0 +1,179 @@
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+
+# Same surface as s3Repository for the request-path operations, on an
+# aiobotocore client. Every call is awaited instead of holding a worker thread.
+class AsyncS3Repository:
+    def __init__(self, s3_client):
+        self.s3_client = s3_client
+
+    # Bucket Operations
+    async def list_all_buckets(self):
+        return await self.s3_client.list_buckets()
+
+    async def create_bucket(self, bucket_name: str):
+        return await self.s3_client.create_bucket(Bucket=bucket_name)
+
+    async def delete_bucket(self, bucket_name: str):
+        return await self.s3_client.delete_bucket(Bucket=bucket_name)
+
+    # Folder Operations
+    async def create_object(self, bucket_name: str, folder_name: str):
+        if not folder_name.endswith("/"):
+            folder_name = f"{folder_name}/"
+        return await self.s3_client.put_object(Bucket=bucket_name, Key=folder_name)
+
+    async def list_objects_page(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        delimiter: str | None = None,
+        max_keys: int = 1000,
+        continuation_token: str | None = None,
+    ):
+        extra_args = {}
+        if delimiter:
+            extra_args["Delimiter"] = delimiter
+        if continuation_token:
+            extra_args["ContinuationToken"] = continuation_token
+        return await self.s3_client.list_objects_v2(
+            Bucket=bucket_name,
+            Prefix=prefix,
+            MaxKeys=max_keys,
+            **extra_args,
+        )
+
+    async def iter_object_keys(self, bucket_name: str, prefix: str) -> AsyncIterator[str]:
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+    async def delete_objects(self, bucket_name: str, keys: list[str]):
+        return await self.s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={
+                "Objects": [{"Key": key} for key in keys],
+                "Quiet": True,
+            },
+        )
+
+    # Upload File
+    async def upload_file(self, bucket_name: str, file_key: str, file_content: bytes, content_type: str | None = None):
+        extra_args = {"ContentType": content_type} if content_type else {}
+        return await self.s3_client.put_object(
+            Bucket=bucket_name,
+            Key=file_key,
+            Body=file_content,
+            **extra_args,
+        )
+
+    # Multipart Upload
+    async def create_multipart_upload(
+        self,
+        bucket_name: str,
+        file_key: str,
+        content_type: str | None = None,
+        **extra_args,
+    ):
+        if content_type:
+            extra_args["ContentType"] = content_type
+        return await self.s3_client.create_multipart_upload(
+            Bucket=bucket_name,
+            Key=file_key,
+            **extra_args,
+        )
+
+    async def upload_part(self, bucket_name: str, file_key: str, upload_id: str, part_number: int, body: bytes):
+        return await self.s3_client.upload_part(
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+
+    async def upload_part_copy(
+        self,
+        bucket_name: str,
+        file_key: str,
+        upload_id: str,
+        part_number: int,
+        source_key: str,
+        byte_range: str,
+        source_bucket: str | None = None,
+    ):
+        return await self.s3_client.upload_part_copy(
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource={
+                "Bucket": source_bucket or bucket_name,
+                "Key": source_key,
+            },
+            CopySourceRange=byte_range,
+        )
+
+    async def complete_multipart_upload(self, bucket_name: str, file_key: str, upload_id: str, parts: list[dict[str, Any]]):
+        return await self.s3_client.complete_multipart_upload(
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+
+    async def abort_multipart_upload(self, bucket_name: str, file_key: str, upload_id: str):
+        return await self.s3_client.abort_multipart_upload(
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
+        )
+
+    async def head_bucket(self, bucket_name: str):
+        return await self.s3_client.head_bucket(Bucket=bucket_name)
+
+    async def head_object(self, bucket_name: str, file_key: str):
+        return await self.s3_client.head_object(Bucket=bucket_name, Key=file_key)
+
+    # Download File
+    async def get_object(
+        self,
+        bucket_name: str,
+        file_key: str,
+        byte_range: str | None = None,
+        if_none_match: str | None = None,
+        if_modified_since: datetime | None = None,
+    ):
+        extra_args = {}
+        if byte_range:
+            extra_args["Range"] = byte_range
+        if if_none_match:
+            extra_args["IfNoneMatch"] = if_none_match
+        if if_modified_since:
+            extra_args["IfModifiedSince"] = if_modified_since
+        return await self.s3_client.get_object(Bucket=bucket_name, Key=file_key, **extra_args)
+
+    async def delete_file(self, bucket_name: str, file_key: str):
+        return await self.s3_client.delete_object(
+            Bucket=bucket_name,
+            Key=file_key
+        )
+
+    # Copy file
+    async def copy_file(
+        self,
+        bucket_name: str,
+        source_key: str,
+        destination_key: str,
+        source_bucket: str | None = None,
+    ):
+        return await self.s3_client.copy_object(
+            Bucket=bucket_name,
+            CopySource={
+                "Bucket": source_bucket or bucket_name,
+                "Key": source_key,
+            },
+            Key=destination_key,
+        )
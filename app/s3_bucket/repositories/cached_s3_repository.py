@@ -0,0 +1,161 @@
+from typing import Any
+
+from app.core.metadata_cache import MetadataCache
+from app.core.object_cache import ObjectCache
+from app.core.rate_control import S3RateController
+from app.s3_bucket.repositories.s3_repository import s3Repository
+
+
+class CachedS3Repository(s3Repository):
+    # Serves list_buckets and listing pages from a metadata cache and drops the
+    # affected entries, and cached object bodies, whenever this process writes
+    # to a bucket or key.
+    def __init__(
+        self,
+        s3_client,
+        cache: MetadataCache,
+        buckets_ttl: float,
+        listing_ttl: float,
+        rate_controller: S3RateController | None = None,
+        object_cache: ObjectCache | None = None,
+        presign_client=None,
+    ):
+        super().__init__(s3_client, rate_controller, presign_client)
+        self.cache = cache
+        self.object_cache = object_cache
+        self.buckets_ttl = buckets_ttl
+        self.listing_ttl = listing_ttl
+
+    # Invalidation
+    def _invalidate_bucket(self, bucket_name: str):
+        self.cache.invalidate(
+            lambda key: key[0] == "buckets" or (key[0] in ("objects", "content_hash") and key[1] == bucket_name)
+        )
+        if self.object_cache is not None:
+            self.object_cache.invalidate_bucket(bucket_name)
+
+    def _invalidate_keys(self, bucket_name: str, file_keys: list[str]):
+        # A listing is stale when any written key falls under its prefix,
+        # a content hash (see UploadDeduplicator) when its key was written.
+        # Listing prefixes normally end at a "/", so they are looked up among
+        # the parent prefixes of the written keys ("", "a/", "a/b/", ...)
+        written_keys = set(file_keys)
+        parent_prefixes = set()
+        for file_key in written_keys:
+            parent_prefixes.add("")
+            end = file_key.find("/")
+            while end != -1:
+                parent_prefixes.add(file_key[: end + 1])
+                end = file_key.find("/", end + 1)
+
+        def listing_is_stale(prefix: str) -> bool:
+            if prefix in parent_prefixes:
+                return True
+            if prefix.endswith("/"):
+                return False
+            return any(file_key.startswith(prefix) for file_key in written_keys)
+
+        self.cache.invalidate(
+            lambda key: key[0] in ("objects", "content_hash")
+            and key[1] == bucket_name
+            and (listing_is_stale(key[2]) if key[0] == "objects" else key[2] in written_keys)
+        )
+        if self.object_cache is not None:
+            self.object_cache.invalidate(bucket_name, file_keys)
+
+    # Cached reads
+    def list_all_buckets(self):
+        return self.cache.get_or_load(("buckets",), super().list_all_buckets, self.buckets_ttl)
+
+    def list_objects_page(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        delimiter: str | None = None,
+        max_keys: int = 1000,
+        continuation_token: str | None = None,
+    ):
+        return self.cache.get_or_load(
+            ("objects", bucket_name, prefix, delimiter, max_keys, continuation_token),
+            lambda: super(CachedS3Repository, self).list_objects_page(
+                bucket_name, prefix, delimiter, max_keys, continuation_token
+            ),
+            self.listing_ttl,
+        )
+
+    # Writes
+    def create_bucket(self, bucket_name: str):
+        try:
+            return super().create_bucket(bucket_name)
+        finally:
+            self._invalidate_bucket(bucket_name)
+
+    def delete_bucket(self, bucket_name: str):
+        try:
+            return super().delete_bucket(bucket_name)
+        finally:
+            self._invalidate_bucket(bucket_name)
+
+    def create_object(self, bucket_name: str, folder_name: str):
+        try:
+            return super().create_object(bucket_name, folder_name)
+        finally:
+            # s3Repository writes the folder as "<name>/"
+            self._invalidate_keys(bucket_name, [f"{folder_name.rstrip('/')}/"])
+
+    def delete_objects(self, bucket_name: str, keys: list[str]):
+        try:
+            return super().delete_objects(bucket_name, keys)
+        finally:
+            self._invalidate_keys(bucket_name, keys)
+
+    def delete_object_versions(self, bucket_name: str, versions: list[dict[str, str]]):
+        try:
+            return super().delete_object_versions(bucket_name, versions)
+        finally:
+            self._invalidate_bucket(bucket_name)
+
+    def upload_file(
+        self,
+        bucket_name: str,
+        file_key: str,
+        file_content,
+        content_type: str | None = None,
+        metadata: dict[str, str] | None = None,
+        content_encoding: str | None = None,
+    ):
+        try:
+            return super().upload_file(bucket_name, file_key, file_content, content_type, metadata, content_encoding)
+        finally:
+            self._invalidate_keys(bucket_name, [file_key])
+
+    def complete_multipart_upload(self, bucket_name: str, file_key: str, upload_id: str, parts: list[dict[str, Any]]):
+        try:
+            return super().complete_multipart_upload(bucket_name, file_key, upload_id, parts)
+        finally:
+            self._invalidate_keys(bucket_name, [file_key])
+
+    def confirm_upload(self, bucket_name: str, file_key: str):
+        try:
+            return super().confirm_upload(bucket_name, file_key)
+        finally:
+            self._invalidate_keys(bucket_name, [file_key])
+
+    def delete_file(self, bucket_name: str, file_key: str):
+        try:
+            return super().delete_file(bucket_name, file_key)
+        finally:
+            self._invalidate_keys(bucket_name, [file_key])
+
+    def copy_file(
+        self,
+        bucket_name: str,
+        source_key: str,
+        destination_key: str,
+        source_bucket: str | None = None,
+        **extra_args,
+    ):
+        try:
+            return super().copy_file(bucket_name, source_key, destination_key, source_bucket, **extra_args)
+        finally:
+            self._invalidate_keys(bucket_name, [destination_key])
@@ -0,0 +1,70 @@
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Any
+
+COLUMNS = ("bucket_name", "file_key", "sha256", "size", "etag", "recorded_at")
+
+
+# SHA-256 of objects written by deduplicated uploads, so a later upload of the
+# same bytes under another key can become a server-side copy. Rows go stale
+# when objects change outside these uploads; copies are conditional on the
+# recorded ETag and stale rows are dropped when that condition fails.
+class ContentHashRepository:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS content_hashes (
+                    bucket_name TEXT NOT NULL,
+                    file_key TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT NOT NULL,
+                    recorded_at TEXT NOT NULL,
+                    PRIMARY KEY (bucket_name, file_key)
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS content_hashes_sha256 ON content_hashes (sha256, size)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def record(self, bucket_name: str, file_key: str, sha256: str, size: int, etag: str):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"""
+                INSERT INTO content_hashes ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})
+                ON CONFLICT (bucket_name, file_key) DO UPDATE SET
+                    sha256 = excluded.sha256,
+                    size = excluded.size,
+                    etag = excluded.etag,
+                    recorded_at = excluded.recorded_at
+                """,
+                (bucket_name, file_key, sha256, size, etag, datetime.now(timezone.utc).isoformat()),
+            )
+
+    def find_copies(self, sha256: str, size: int, bucket_name: str, limit: int = 3) -> list[dict[str, Any]]:
+        # Same-bucket copies first, then the most recently recorded
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"""
+                SELECT {', '.join(COLUMNS)} FROM content_hashes
+                WHERE sha256 = ? AND size = ?
+                ORDER BY bucket_name = ? DESC, recorded_at DESC
+                LIMIT ?
+                """,
+                (sha256, size, bucket_name, limit),
+            ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def delete(self, bucket_name: str, file_key: str):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "DELETE FROM content_hashes WHERE bucket_name = ? AND file_key = ?",
+                (bucket_name, file_key),
+            )
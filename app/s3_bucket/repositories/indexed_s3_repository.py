@@ -0,0 +1,95 @@
+from typing import Any, BinaryIO
+
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_index.services.index_service import MetadataIndexService
+
+
+def _content_length(file_content: bytes | BinaryIO) -> int | None:
+    if isinstance(file_content, (bytes, bytearray)):
+        return len(file_content)
+    try:
+        position = file_content.tell()
+        size = file_content.seek(0, 2)
+        file_content.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+
+class IndexedS3Repository:
+    # Wraps the repository the services use (cached or not) and records every
+    # successful write in the metadata index. Reads and all other calls are
+    # forwarded unchanged.
+    def __init__(self, s3_repository: s3Repository, metadata_index: MetadataIndexService):
+        self.s3_repository = s3_repository
+        self.metadata_index = metadata_index
+
+    def __getattr__(self, name: str):
+        return getattr(self.s3_repository, name)
+
+    # Writes
+    def delete_bucket(self, bucket_name: str):
+        response = self.s3_repository.delete_bucket(bucket_name)
+        self.metadata_index.record_bucket_deleted(bucket_name)
+        return response
+
+    def create_object(self, bucket_name: str, folder_name: str):
+        response = self.s3_repository.create_object(bucket_name, folder_name)
+        self.metadata_index.record_put(bucket_name, f"{folder_name.rstrip('/')}/", 0, response)
+        return response
+
+    def delete_objects(self, bucket_name: str, keys: list[str]):
+        response = self.s3_repository.delete_objects(bucket_name, keys)
+        failed = {error.get("Key") for error in response.get("Errors", [])}
+        self.metadata_index.record_delete(bucket_name, [key for key in keys if key not in failed])
+        return response
+
+    def delete_object_versions(self, bucket_name: str, versions: list[dict[str, str]]):
+        # Only used to empty a bucket, every version of these keys is going away
+        response = self.s3_repository.delete_object_versions(bucket_name, versions)
+        self.metadata_index.record_delete(bucket_name, {version["Key"] for version in versions})
+        return response
+
+    def upload_file(
+        self,
+        bucket_name: str,
+        file_key: str,
+        file_content,
+        content_type: str | None = None,
+        metadata: dict[str, str] | None = None,
+        content_encoding: str | None = None,
+    ):
+        response = self.s3_repository.upload_file(
+            bucket_name, file_key, file_content, content_type, metadata, content_encoding
+        )
+        self.metadata_index.record_put(bucket_name, file_key, _content_length(file_content), response)
+        return response
+
+    def complete_multipart_upload(self, bucket_name: str, file_key: str, upload_id: str, parts: list[dict[str, Any]]):
+        response = self.s3_repository.complete_multipart_upload(bucket_name, file_key, upload_id, parts)
+        self.metadata_index.record_put(bucket_name, file_key, None, response)
+        return response
+
+    def confirm_upload(self, bucket_name: str, file_key: str):
+        response = self.s3_repository.confirm_upload(bucket_name, file_key)
+        self.metadata_index.record_put(bucket_name, file_key, response["ContentLength"], response)
+        return response
+
+    def delete_file(self, bucket_name: str, file_key: str):
+        response = self.s3_repository.delete_file(bucket_name, file_key)
+        self.metadata_index.record_delete(bucket_name, [file_key])
+        return response
+
+    def copy_file(
+        self,
+        bucket_name: str,
+        source_key: str,
+        destination_key: str,
+        source_bucket: str | None = None,
+        **extra_args,
+    ):
+        response = self.s3_repository.copy_file(bucket_name, source_key, destination_key, source_bucket, **extra_args)
+        self.metadata_index.record_copy(
+            bucket_name, destination_key, source_bucket or bucket_name, source_key, response
+        )
+        return response
@@ -1,69 +1,341 @@
-from typing import Any
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, Iterator
+from app.core.metrics import S3_RETRIES, S3_THROTTLES
+from app.core.rate_control import THROTTLING_ERROR_CODES, S3RateController
 from app.utils.logging_config import get_logger
 
 class s3Repository:
-    def __init__(self, s3_client):
+    def __init__(self, s3_client, rate_controller: S3RateController | None = None, presign_client=None):
         self.s3_client = s3_client
+        self.rate_controller = rate_controller
+        # Signs presigned URLs, see S3ClientPool.get_presign_client
+        self.presign_client = presign_client or s3_client
         self.logger = get_logger(__name__)
+
+    def _call(self, operation: str, bucket_name: str, key: str = "", **params):
+        # Every S3 call goes through the rate controller when one is configured
+        method = getattr(self.s3_client, operation)
+        if self.rate_controller is None:
+            return method(**params)
+        api_operation = self.s3_client.meta.method_to_api_mapping[operation]
+        body = params.get("Body")
+        # A retried upload has to resend the stream from where the first attempt started
+        position = body.tell() if hasattr(body, "seek") and hasattr(body, "tell") else None
+
+        def on_retry():
+            S3_RETRIES.inc(operation=api_operation)
+            if position is not None:
+                body.seek(position)
+
+        return self.rate_controller.call(bucket_name, key, operation, lambda: method(**params), on_retry)
+
+    def _delete_entries(self, bucket_name: str, entries: list[dict[str, str]]):
+        # DeleteObjects can succeed while throttling some of its keys; those
+        # are retried with backoff and only the remaining failures are returned
+        response = self._call(
+            "delete_objects",
+            bucket_name,
+            entries[0]["Key"] if entries else "",
+            Bucket=bucket_name,
+            Delete={"Objects": entries, "Quiet": True},
+        )
+        if self.rate_controller is None:
+            return response
+        errors = []
+        for attempt in range(self.rate_controller.max_attempts):
+            throttled = [error for error in response.get("Errors", []) if error.get("Code") in THROTTLING_ERROR_CODES]
+            errors.extend(error for error in response.get("Errors", []) if error.get("Code") not in THROTTLING_ERROR_CODES)
+            if not throttled or attempt == self.rate_controller.max_attempts - 1:
+                errors.extend(throttled)
+                break
+            self.rate_controller.record_throttle(bucket_name)
+            S3_THROTTLES.inc(operation="DeleteObjects")
+            S3_RETRIES.inc(operation="DeleteObjects")
+            time.sleep(self.rate_controller.backoff(attempt))
+            entries = [
+                {"Key": error["Key"], **({"VersionId": error["VersionId"]} if error.get("VersionId") else {})}
+                for error in throttled
+            ]
+            response = self._call(
+                "delete_objects",
+                bucket_name,
+                entries[0]["Key"],
+                Bucket=bucket_name,
+                Delete={"Objects": entries, "Quiet": True},
+            )
+        return {**response, "Errors": errors}
     
     # Bucket Operations
     def list_all_buckets(self):
-        print(f"{__file__} | Getting Credentials")    
-        return self.s3_client.list_buckets()
+        return self._call("list_buckets", "")
     
 
     def create_bucket(self, bucket_name: str):
-        return self.s3_client.create_bucket(Bucket=bucket_name)
+        return self._call("create_bucket", bucket_name, Bucket=bucket_name)
 
     
     def delete_bucket(self, bucket_name: str):
-        return self.s3_client.delete_bucket(Bucket=bucket_name)
+        return self._call("delete_bucket", bucket_name, Bucket=bucket_name)
+
+    def head_bucket(self, bucket_name: str):
+        return self._call("head_bucket", bucket_name, Bucket=bucket_name)
     
     # Folder Operations
     def create_object(self, bucket_name:str, folder_name: str):
         if not folder_name.endswith("/"):
             folder_name = f"{folder_name}/"
-        return self.s3_client.put_object(Bucket=bucket_name, Key=folder_name)
+        return self._call("put_object", bucket_name, folder_name, Bucket=bucket_name, Key=folder_name)
     
             
-    def delete_object(self, bucket_name: str, folder_name: str):
-        response = self.s3_client.list_objects_v2(
+    def list_objects_page(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        delimiter: str | None = None,
+        max_keys: int = 1000,
+        continuation_token: str | None = None,
+    ):
+        extra_args = {}
+        if delimiter:
+            extra_args["Delimiter"] = delimiter
+        if continuation_token:
+            extra_args["ContinuationToken"] = continuation_token
+        return self._call(
+            "list_objects_v2",
+            bucket_name,
+            prefix,
             Bucket=bucket_name,
-            Prefix=f"{folder_name}/"
+            Prefix=prefix,
+            MaxKeys=max_keys,
+            **extra_args,
         )
 
-        for obj in response.get("Contents", []):
-            self.s3_client.delete_object(
-                Bucket=bucket_name,
-                Key=obj["Key"]
-            )
+    def iter_objects(self, bucket_name: str, prefix: str) -> Iterator[dict[str, Any]]:
+        for page in self.iter_object_pages(bucket_name, prefix):
+            yield from page.get("Contents", [])
+
+    def iter_object_pages(
+        self,
+        bucket_name: str,
+        prefix: str,
+        continuation_token: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        # Raw pages, so callers can checkpoint NextContinuationToken and resume from it
+        while True:
+            extra_args = {"ContinuationToken": continuation_token} if continuation_token else {}
+            page = self._call("list_objects_v2", bucket_name, prefix, Bucket=bucket_name, Prefix=prefix, **extra_args)
+            yield page
+            if not page.get("IsTruncated"):
+                return
+            continuation_token = page["NextContinuationToken"]
+
+    def iter_object_keys(self, bucket_name: str, prefix: str) -> Iterator[str]:
+        for obj in self.iter_objects(bucket_name, prefix):
+            yield obj["Key"]
+
+    def delete_objects(self, bucket_name: str, keys: list[str]):
+        # Quiet mode only reports the keys that failed
+        return self._delete_entries(bucket_name, [{"Key": key} for key in keys])
+
+    def iter_object_versions(self, bucket_name: str) -> Iterator[dict[str, str]]:
+        # Every object version and delete marker, shaped as DeleteObjects entries
+        extra_args = {}
+        while True:
+            page = self._call("list_object_versions", bucket_name, Bucket=bucket_name, **extra_args)
+            for entry in page.get("Versions", []) + page.get("DeleteMarkers", []):
+                yield {"Key": entry["Key"], "VersionId": entry["VersionId"]}
+            if not page.get("IsTruncated"):
+                return
+            extra_args = {"KeyMarker": page["NextKeyMarker"], "VersionIdMarker": page["NextVersionIdMarker"]}
+
+    def delete_object_versions(self, bucket_name: str, versions: list[dict[str, str]]):
+        return self._delete_entries(bucket_name, versions)
+
+    def iter_multipart_uploads(self, bucket_name: str) -> Iterator[dict[str, Any]]:
+        extra_args = {}
+        while True:
+            page = self._call("list_multipart_uploads", bucket_name, Bucket=bucket_name, **extra_args)
+            yield from page.get("Uploads", [])
+            if not page.get("IsTruncated"):
+                return
+            extra_args = {"KeyMarker": page["NextKeyMarker"], "UploadIdMarker": page["NextUploadIdMarker"]}
 
     # Upload File
-    def upload_file(self, bucket_name:str, file_key: str, file_content:bytes):
-        return self.s3_client.put_object(
+    def upload_file(
+        self,
+        bucket_name:str,
+        file_key: str,
+        file_content: bytes | BinaryIO,
+        content_type: str | None = None,
+        metadata: dict[str, str] | None = None,
+        content_encoding: str | None = None,
+    ):
+        extra_args = {"ContentType": content_type} if content_type else {}
+        if metadata:
+            extra_args["Metadata"] = metadata
+        if content_encoding:
+            extra_args["ContentEncoding"] = content_encoding
+        return self._call(
+            "put_object",
+            bucket_name,
+            file_key,
             Bucket= bucket_name,
             Key=file_key,
-            Body=file_content
+            Body=file_content,
+            **extra_args,
+        )
+
+    # Multipart Upload
+    def create_multipart_upload(
+        self,
+        bucket_name: str,
+        file_key: str,
+        content_type: str | None = None,
+        **extra_args,
+    ):
+        if content_type:
+            extra_args["ContentType"] = content_type
+        return self._call(
+            "create_multipart_upload",
+            bucket_name,
+            file_key,
+            Bucket=bucket_name,
+            Key=file_key,
+            **extra_args,
+        )
+
+    def upload_part(self, bucket_name: str, file_key: str, upload_id: str, part_number: int, body: bytes | BinaryIO):
+        return self._call(
+            "upload_part",
+            bucket_name,
+            file_key,
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+
+    def upload_part_copy(
+        self,
+        bucket_name: str,
+        file_key: str,
+        upload_id: str,
+        part_number: int,
+        source_key: str,
+        byte_range: str,
+        source_bucket: str | None = None,
+    ):
+        return self._call(
+            "upload_part_copy",
+            bucket_name,
+            file_key,
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource={
+                "Bucket": source_bucket or bucket_name,
+                "Key": source_key,
+            },
+            CopySourceRange=byte_range,
+        )
+
+    def complete_multipart_upload(self, bucket_name: str, file_key: str, upload_id: str, parts: list[dict[str, Any]]):
+        return self._call(
+            "complete_multipart_upload",
+            bucket_name,
+            file_key,
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+
+    def list_parts(self, bucket_name: str, file_key: str, upload_id: str) -> list[dict[str, Any]]:
+        parts = []
+        extra_args = {}
+        while True:
+            page = self._call(
+                "list_parts", bucket_name, file_key, Bucket=bucket_name, Key=file_key, UploadId=upload_id, **extra_args
+            )
+            parts.extend(page.get("Parts", []))
+            if not page.get("IsTruncated"):
+                return parts
+            extra_args = {"PartNumberMarker": page["NextPartNumberMarker"]}
+
+    def abort_multipart_upload(self, bucket_name: str, file_key: str, upload_id: str):
+        return self._call(
+            "abort_multipart_upload",
+            bucket_name,
+            file_key,
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
         )
 
+    def head_object(self, bucket_name: str, file_key: str):
+        return self._call("head_object", bucket_name, file_key, Bucket=bucket_name, Key=file_key)
+
+    def confirm_upload(self, bucket_name: str, file_key: str):
+        # An object written around this service (a presigned PUT); the wrapping
+        # repositories run the same write hooks as for upload_file
+        return self.head_object(bucket_name, file_key)
+
+    # Download File
+    def get_object(
+        self,
+        bucket_name: str,
+        file_key: str,
+        byte_range: str | None = None,
+        if_none_match: str | None = None,
+        if_modified_since: datetime | None = None,
+    ):
+        extra_args = {}
+        if byte_range:
+            extra_args["Range"] = byte_range
+        if if_none_match:
+            extra_args["IfNoneMatch"] = if_none_match
+        if if_modified_since:
+            extra_args["IfModifiedSince"] = if_modified_since
+        return self._call("get_object", bucket_name, file_key, Bucket=bucket_name, Key=file_key, **extra_args)
+
     def delete_file(self, bucket_name: str, file_key: str):
-        return self.s3_client.delete_object(
+        return self._call(
+            "delete_object",
+            bucket_name,
+            file_key,
             Bucket=bucket_name,
             Key=file_key
         )
         
+    # Presigned URLs, signed locally without calling S3
+    def generate_presigned_url(self, client_method: str, params: dict[str, Any], expires_in: int):
+        return self.presign_client.generate_presigned_url(
+            ClientMethod=client_method,
+            Params=params,
+            ExpiresIn=expires_in,
+        )
+
     # Copy file
     def copy_file(
         self,
         bucket_name: str,
         source_key: str,
         destination_key: str,
+        source_bucket: str | None = None,
+        **extra_args,
     ):
-        return self.s3_client.copy_object(
+        return self._call(
+            "copy_object",
+            bucket_name,
+            destination_key,
             Bucket=bucket_name,
             CopySource={
-                "Bucket": bucket_name,
+                "Bucket": source_bucket or bucket_name,
                 "Key": source_key,
             },
             Key=destination_key,
+            **extra_args,
         )
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Any
+
+COLUMNS = ("session_id", "bucket_name", "file_key", "upload_id", "part_size", "content_type", "created_at")
+
+
+# Upload sessions are kept in SQLite so they survive a process restart.
+# Stored parts are not tracked here, S3 list_parts is the source of truth.
+class UploadSessionRepository:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS upload_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    bucket_name TEXT NOT NULL,
+                    file_key TEXT NOT NULL,
+                    upload_id TEXT NOT NULL,
+                    part_size INTEGER NOT NULL,
+                    content_type TEXT,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def create_session(
+        self,
+        session_id: str,
+        bucket_name: str,
+        file_key: str,
+        upload_id: str,
+        part_size: int,
+        content_type: str | None,
+    ) -> dict[str, Any]:
+        session = {
+            "session_id": session_id,
+            "bucket_name": bucket_name,
+            "file_key": file_key,
+            "upload_id": upload_id,
+            "part_size": part_size,
+            "content_type": content_type,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"INSERT INTO upload_sessions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                tuple(session[column] for column in COLUMNS),
+            )
+        return session
+
+    def get_session(self, session_id: str) -> dict[str, Any] | None:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM upload_sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def delete_session(self, session_id: str):
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM upload_sessions WHERE session_id = ?", (session_id,))
@@ -0,0 +1,278 @@
+from tempfile import SpooledTemporaryFile
+
+from fastapi import APIRouter, Depends, File, Form, Header, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from app.core.metadata_cache import MetadataCache
+from app.core.object_cache import ObjectCache
+from app.core.rate_control import S3RateController
+from app.core.session_dependencies import (
+    get_async_s3_service,
+    get_metadata_cache,
+    get_object_cache,
+    get_rate_controller,
+    get_s3_service,
+)
+from app.s3_bucket.schemas.s3_request_schema import (
+    CopyMoveFileRequest,
+    CopyMoveFolderRequest,
+    CreateBucketRequest,
+    CreateFolderRequest,
+    DeleteFilesRequest,
+    DeleteFolderRequest,
+    SyncFolderRequest,
+)
+from app.s3_bucket.services.async_s3_service import asyncS3Service
+from app.s3_bucket.services.s3_service import s3Service
+
+# Streamed key lists larger than this are spooled to disk
+KEY_LIST_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Same endpoints as s3_route on the async engine, selected with S3_ENGINE=async
+router = APIRouter(
+    prefix="/s3",
+    tags=["S3"]
+)
+
+# BUCKET ROUTES
+@router.get("/buckets")
+async def list_buckets(service: asyncS3Service = Depends(get_async_s3_service)):
+    return await service.list_buckets()
+
+@router.post("/create-bucket")
+async def create_buckets(request: CreateBucketRequest,service: asyncS3Service = Depends(get_async_s3_service)):
+    return await service.create_bucket(request)
+
+@router.delete("/bucket/{bucket_name}")
+async def delete_bucket(
+    bucket_name: str,
+    force: bool = Query(
+        False,
+        description="Delete every object version, delete marker and in-progress multipart upload first"
+    ),
+    background: bool = Query(
+        False,
+        description="With force, run as a background job and return its job_id"
+    ),
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.delete_bucket(bucket_name, force=force, background=background)
+
+# CACHE ROUTES
+@router.get("/cache/stats")
+async def cache_stats(cache: MetadataCache | None = Depends(get_metadata_cache)):
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.get("/object-cache/stats")
+async def object_cache_stats(cache: ObjectCache | None = Depends(get_object_cache)):
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.get("/dedup/stats")
+async def dedup_stats(service: s3Service = Depends(get_s3_service)):
+    return service.upload_deduplicator.stats()
+
+@router.get("/rate-limits")
+async def rate_limits(rate_controller: S3RateController | None = Depends(get_rate_controller)):
+    if rate_controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **rate_controller.stats()}
+
+# OBJECT ROUTES
+@router.get("/objects/{bucket_name}")
+async def list_objects(
+    bucket_name: str,
+    prefix: str = Query(
+        "",
+        description="Only list keys starting with this prefix (e.g. test_folder/)"
+    ),
+    delimiter: str | None = Query(
+        None,
+        description="Group keys by this delimiter into common prefixes (e.g. /)"
+    ),
+    page_size: int = Query(
+        1000,
+        ge=1,
+        le=1000,
+        description="Maximum number of keys per page"
+    ),
+    continuation_token: str | None = Query(
+        None,
+        description="Opaque token from next_continuation_token of the previous page"
+    ),
+    stream: bool = Query(
+        False,
+        description="Walk every page and stream one JSON object per line (NDJSON)"
+    ),
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.list_objects(bucket_name, prefix, delimiter, page_size, continuation_token, stream)
+
+# FOLDER ROUTES
+@router.post("/create-folder")
+async def create_folder(
+    request:CreateFolderRequest, service: asyncS3Service = Depends(get_async_s3_service)
+):
+    return await service.create_folder(request)
+
+@router.delete("/delete-folder")
+async def delete_folder(
+    request:DeleteFolderRequest, service: asyncS3Service = Depends(get_async_s3_service)
+):
+    return await service.delete_folder(request)
+
+
+@router.post("/upload-file/{bucket_name}")
+async def upload_file(    
+    bucket_name: str,
+    folder_name : str | None = Form(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    file: UploadFile = File(..., description="The file to be uploaded to the S3 bucket. Supports any file type."),
+    dedup: bool = Form(
+        False,
+        description="Skip the upload when the key already holds these bytes, or copy them server side from an identical object"
+    ),
+    service: asyncS3Service = Depends(get_async_s3_service)):
+    return await service.upload_file(bucket_name, file, folder_name, dedup)
+
+# BATCH UPLOAD
+@router.post("/upload-files/{bucket_name}")
+async def upload_files(
+    bucket_name: str,
+    folder_name: str | None = Form(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    files: list[UploadFile] = File(..., description="Files to upload; each keeps its own file name."),
+    service: asyncS3Service = Depends(get_async_s3_service)):
+    return await service.upload_files(bucket_name, files, folder_name)
+
+@router.post("/upload-archive/{bucket_name}")
+async def upload_archive(
+    bucket_name: str,
+    folder_name: str | None = Form(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    archive: UploadFile = File(..., description="A zip or tar (.tar, .tar.gz, .tar.bz2, .tar.xz) archive to extract."),
+    service: asyncS3Service = Depends(get_async_s3_service)):
+    return await service.upload_archive(bucket_name, archive, folder_name)
+
+# DOWNLOAD FILE
+@router.get("/download/{bucket_name}")
+async def download_file(
+    bucket_name: str,
+    file_name: str = Query(
+        ...,
+        description="Name of the file to download (e.g. report.pdf)"
+    ),
+    folder_name: str | None = Query(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    range: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+    if_modified_since: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.download_file(
+        bucket_name,
+        file_name,
+        folder_name,
+        byte_range=range,
+        if_none_match=if_none_match,
+        if_modified_since=if_modified_since,
+        accept_encoding=accept_encoding,
+    )
+
+# DELETE FILE
+@router.delete("/delete-file/{bucket_name}")
+async def delete_file(
+    bucket_name: str,
+    file_name: str = Query(
+        ...,
+        description="Name of the file to delete (e.g. report.pdf)"
+    ),
+    folder_name: str | None = Query(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.delete_file(bucket_name, file_name, folder_name)
+
+# BULK DELETE
+@router.delete("/delete-files/{bucket_name}")
+async def delete_files(
+    bucket_name: str,
+    request: DeleteFilesRequest,
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.delete_files(bucket_name, request)
+
+@router.delete("/delete-files/{bucket_name}/ndjson")
+async def delete_files_ndjson(
+    bucket_name: str,
+    request: Request,
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    # One key or {"file_name", "folder_name"} object per line, spooled to disk as it arrives
+    with SpooledTemporaryFile(max_size=KEY_LIST_SPOOL_MAX_SIZE) as body:
+        async for chunk in request.stream():
+            await run_in_threadpool(body.write, chunk)
+        body.seek(0)
+        return await service.delete_files_ndjson(bucket_name, body)
+
+
+# COPY FOLDER
+@router.post("/copy-file")
+async def copy_file(
+    request: CopyMoveFileRequest,
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.copy_file(
+        bucket_name=request.bucket_name,
+        file_name=request.file_name,
+        source_folder=request.source_folder,
+        destination_folder=request.destination_folder,
+    )
+    
+@router.post("/move-file")
+async def move_file(
+    request: CopyMoveFileRequest,
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.move_file(
+        bucket_name=request.bucket_name,
+        file_name=request.file_name,
+        source_folder=request.source_folder,
+        destination_folder=request.destination_folder,
+    )
+
+
+# COPY / MOVE / SYNC FOLDER
+@router.post("/copy-folder")
+async def copy_folder(
+    request: CopyMoveFolderRequest,
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.copy_folder(request)
+
+@router.post("/move-folder")
+async def move_folder(
+    request: CopyMoveFolderRequest,
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.move_folder(request)
+
+@router.post("/sync-folder")
+async def sync_folder(
+    request: SyncFolderRequest,
+    service: asyncS3Service = Depends(get_async_s3_service),
+):
+    return await service.sync_folder(request)
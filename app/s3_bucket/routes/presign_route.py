@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query
+from app.core.session_dependencies import get_s3_service
+from app.s3_bucket.schemas.s3_request_schema import PresignCompleteRequest, PresignUploadRequest
+from app.s3_bucket.services.s3_service import s3Service
+
+# Signing is local computation, so these routes are shared by both S3 engines
+router = APIRouter(
+    prefix="/s3/presign",
+    tags=["S3 Presigned URLs"]
+)
+
+@router.post("/upload")
+def presign_upload(request: PresignUploadRequest, service: s3Service = Depends(get_s3_service)):
+    return service.presign_upload(request)
+
+@router.post("/upload/complete")
+def complete_presigned_upload(request: PresignCompleteRequest, service: s3Service = Depends(get_s3_service)):
+    return service.complete_presigned_upload(request)
+
+@router.get("/download/{bucket_name}")
+def presign_download(
+    bucket_name: str,
+    file_name: str = Query(
+        ...,
+        description="Name of the file to download (e.g. report.pdf)"
+    ),
+    folder_name: str | None = Query(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    expires_in: int | None = Query(None, ge=1, le=604800, description="URL lifetime in seconds"),
+    service: s3Service = Depends(get_s3_service),
+):
+    return service.presign_download(bucket_name, file_name, folder_name, expires_in)
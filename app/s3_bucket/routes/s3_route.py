@@ -1,9 +1,26 @@
-from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
-from app.core.session_dependencies import get_s3_service
+from tempfile import SpooledTemporaryFile
+
+from fastapi import APIRouter, Depends, File, Form, Header, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from app.core.metadata_cache import MetadataCache
+from app.core.object_cache import ObjectCache
+from app.core.rate_control import S3RateController
+from app.core.session_dependencies import get_metadata_cache, get_object_cache, get_rate_controller, get_s3_service
 from app.s3_bucket.repositories.s3_repository import s3Repository
-from app.s3_bucket.schemas.s3_request_schema import CopyMoveFileRequest, CreateBucketRequest, CreateFolderRequest, DeleteFolderRequest
+from app.s3_bucket.schemas.s3_request_schema import (
+    CopyMoveFileRequest,
+    CopyMoveFolderRequest,
+    CreateBucketRequest,
+    CreateFolderRequest,
+    DeleteFilesRequest,
+    DeleteFolderRequest,
+    SyncFolderRequest,
+)
 from app.s3_bucket.services.s3_service import s3Service
 
+# Streamed key lists larger than this are spooled to disk
+KEY_LIST_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
 router = APIRouter(
     prefix="/s3",
     tags=["S3"]
@@ -19,8 +36,72 @@ def create_buckets(request: CreateBucketRequest,service: s3Service = Depends(get
     return service.create_bucket(request)
 
 @router.delete("/bucket/{bucket_name}")
-def delete_bucket(bucket_name: str, service: s3Service = Depends(get_s3_service)):
-    return service.delete_bucket(bucket_name= bucket_name)
+def delete_bucket(
+    bucket_name: str,
+    force: bool = Query(
+        False,
+        description="Delete every object version, delete marker and in-progress multipart upload first"
+    ),
+    background: bool = Query(
+        False,
+        description="With force, run as a background job and return its job_id"
+    ),
+    service: s3Service = Depends(get_s3_service),
+):
+    return service.delete_bucket(bucket_name, force=force, background=background)
+
+# CACHE ROUTES
+@router.get("/cache/stats")
+def cache_stats(cache: MetadataCache | None = Depends(get_metadata_cache)):
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.get("/object-cache/stats")
+def object_cache_stats(cache: ObjectCache | None = Depends(get_object_cache)):
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@router.get("/dedup/stats")
+def dedup_stats(service: s3Service = Depends(get_s3_service)):
+    return service.upload_deduplicator.stats()
+
+@router.get("/rate-limits")
+def rate_limits(rate_controller: S3RateController | None = Depends(get_rate_controller)):
+    if rate_controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **rate_controller.stats()}
+
+# OBJECT ROUTES
+@router.get("/objects/{bucket_name}")
+def list_objects(
+    bucket_name: str,
+    prefix: str = Query(
+        "",
+        description="Only list keys starting with this prefix (e.g. test_folder/)"
+    ),
+    delimiter: str | None = Query(
+        None,
+        description="Group keys by this delimiter into common prefixes (e.g. /)"
+    ),
+    page_size: int = Query(
+        1000,
+        ge=1,
+        le=1000,
+        description="Maximum number of keys per page"
+    ),
+    continuation_token: str | None = Query(
+        None,
+        description="Opaque token from next_continuation_token of the previous page"
+    ),
+    stream: bool = Query(
+        False,
+        description="Walk every page and stream one JSON object per line (NDJSON)"
+    ),
+    service: s3Service = Depends(get_s3_service),
+):
+    return service.list_objects(bucket_name, prefix, delimiter, page_size, continuation_token, stream)
 
 # FOLDER ROUTES
 @router.post("/create-folder")
@@ -44,8 +125,63 @@ def upload_file(
         description="Optional folder inside the bucket (e.g. test_folder)"
     ),
     file: UploadFile = File(..., description="The file to be uploaded to the S3 bucket. Supports any file type."),
+    dedup: bool = Form(
+        False,
+        description="Skip the upload when the key already holds these bytes, or copy them server side from an identical object"
+    ),
+    service: s3Service = Depends(get_s3_service)):
+    return service.upload_file(bucket_name, file, folder_name, dedup)
+
+# BATCH UPLOAD
+@router.post("/upload-files/{bucket_name}")
+def upload_files(
+    bucket_name: str,
+    folder_name: str | None = Form(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    files: list[UploadFile] = File(..., description="Files to upload; each keeps its own file name."),
     service: s3Service = Depends(get_s3_service)):
-    return service.upload_file(bucket_name, file, folder_name)
+    return service.upload_files(bucket_name, files, folder_name)
+
+@router.post("/upload-archive/{bucket_name}")
+def upload_archive(
+    bucket_name: str,
+    folder_name: str | None = Form(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    archive: UploadFile = File(..., description="A zip or tar (.tar, .tar.gz, .tar.bz2, .tar.xz) archive to extract."),
+    service: s3Service = Depends(get_s3_service)):
+    return service.upload_archive(bucket_name, archive, folder_name)
+
+# DOWNLOAD FILE
+@router.get("/download/{bucket_name}")
+def download_file(
+    bucket_name: str,
+    file_name: str = Query(
+        ...,
+        description="Name of the file to download (e.g. report.pdf)"
+    ),
+    folder_name: str | None = Query(
+        None,
+        description="Optional folder inside the bucket (e.g. test_folder)"
+    ),
+    range: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+    if_modified_since: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
+    service: s3Service = Depends(get_s3_service),
+):
+    return service.download_file(
+        bucket_name,
+        file_name,
+        folder_name,
+        byte_range=range,
+        if_none_match=if_none_match,
+        if_modified_since=if_modified_since,
+        accept_encoding=accept_encoding,
+    )
 
 # DELETE FILE
 @router.delete("/delete-file/{bucket_name}")
@@ -63,6 +199,28 @@ def delete_file(
 ):
     return service.delete_file(bucket_name, file_name, folder_name)
 
+# BULK DELETE
+@router.delete("/delete-files/{bucket_name}")
+def delete_files(
+    bucket_name: str,
+    request: DeleteFilesRequest,
+    service: s3Service = Depends(get_s3_service),
+):
+    return service.delete_files(bucket_name, request)
+
+@router.delete("/delete-files/{bucket_name}/ndjson")
+async def delete_files_ndjson(
+    bucket_name: str,
+    request: Request,
+    service: s3Service = Depends(get_s3_service),
+):
+    # One key or {"file_name", "folder_name"} object per line, spooled to disk as it arrives
+    with SpooledTemporaryFile(max_size=KEY_LIST_SPOOL_MAX_SIZE) as body:
+        async for chunk in request.stream():
+            await run_in_threadpool(body.write, chunk)
+        body.seek(0)
+        return await run_in_threadpool(service.delete_files_ndjson, bucket_name, body)
+
 
 # COPY FOLDER
 @router.post("/copy-file")
@@ -89,3 +247,25 @@ def move_file(
         destination_folder=request.destination_folder,
     )
 
+
+# COPY / MOVE / SYNC FOLDER
+@router.post("/copy-folder")
+def copy_folder(
+    request: CopyMoveFolderRequest,
+    service: s3Service = Depends(get_s3_service),
+):
+    return service.copy_folder(request)
+
+@router.post("/move-folder")
+def move_folder(
+    request: CopyMoveFolderRequest,
+    service: s3Service = Depends(get_s3_service),
+):
+    return service.move_folder(request)
+
+@router.post("/sync-folder")
+def sync_folder(
+    request: SyncFolderRequest,
+    service: s3Service = Depends(get_s3_service),
+):
+    return service.sync_folder(request)
@@ -0,0 +1,59 @@
+from tempfile import SpooledTemporaryFile
+
+from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.session_dependencies import get_upload_session_service
+from app.s3_bucket.schemas.s3_request_schema import CreateUploadSessionRequest
+from app.s3_bucket.services.multipart_upload import MAX_PARTS
+from app.s3_bucket.services.upload_session_service import UploadSessionService
+
+# Parts larger than this are spooled to disk while they are received
+PART_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+router = APIRouter(
+    prefix="/s3/upload-sessions",
+    tags=["S3 Upload Sessions"]
+)
+
+@router.post("")
+def create_upload_session(
+    request: CreateUploadSessionRequest,
+    service: UploadSessionService = Depends(get_upload_session_service),
+):
+    return service.create_session(request)
+
+@router.get("/{session_id}")
+def get_upload_session(session_id: str, service: UploadSessionService = Depends(get_upload_session_service)):
+    return service.get_session(session_id)
+
+@router.put("/{session_id}/parts/{part_number}")
+async def upload_part(
+    session_id: str,
+    request: Request,
+    part_number: int = Path(..., ge=1, le=MAX_PARTS),
+    service: UploadSessionService = Depends(get_upload_session_service),
+):
+    # The raw request body is the part content
+    with SpooledTemporaryFile(max_size=PART_SPOOL_MAX_SIZE) as body:
+        async for chunk in request.stream():
+            await run_in_threadpool(body.write, chunk)
+        body.seek(0)
+        return await run_in_threadpool(service.upload_part, session_id, part_number, body)
+
+@router.post("/{session_id}/parts/{part_number}/presign")
+def presign_part(
+    session_id: str,
+    part_number: int = Path(..., ge=1, le=MAX_PARTS),
+    expires_in: int | None = Query(None, ge=1, le=604800, description="URL lifetime in seconds"),
+    service: UploadSessionService = Depends(get_upload_session_service),
+):
+    return service.presign_part(session_id, part_number, expires_in)
+
+@router.post("/{session_id}/complete")
+def complete_upload_session(session_id: str, service: UploadSessionService = Depends(get_upload_session_service)):
+    return service.complete_session(session_id)
+
+@router.delete("/{session_id}")
+def abort_upload_session(session_id: str, service: UploadSessionService = Depends(get_upload_session_service)):
+    return service.abort_session(session_id)
@@ -26,7 +26,10 @@ class CreateFolderRequest(BaseModel):
     
 
 class DeleteFolderRequest(CreateFolderRequest):
-    pass
+    background: bool = Field(
+        default=False,
+        description="Run the delete as a background job and return its job id. Recommended for very large folders."
+    )
 
 
 class CopyMoveFileRequest(BaseModel):
@@ -46,3 +49,128 @@ class CopyMoveFileRequest(BaseModel):
         default=None,
         description="Optional destination folder (e.g., archive_folder)"
     )
+
+
+class CopyMoveFolderRequest(BaseModel):
+    bucket_name: str = Field(
+        ...,
+        description="Name of the source S3 bucket"
+    )
+    source_folder: str = Field(
+        ...,
+        description="Source folder whose objects are copied (e.g., inbox)"
+    )
+    destination_folder: str | None = Field(
+        default=None,
+        description="Optional destination folder (e.g., archive). Defaults to the bucket root."
+    )
+    destination_bucket: str | None = Field(
+        default=None,
+        description="Optional destination bucket. Defaults to the source bucket."
+    )
+    skip_unchanged: bool = Field(
+        default=False,
+        description="Skip objects whose size and ETag already match at the destination"
+    )
+    background: bool = Field(
+        default=False,
+        description="Run as a background job and return its job id"
+    )
+
+
+class SyncFolderRequest(CopyMoveFolderRequest):
+    skip_unchanged: bool = Field(
+        default=True,
+        description="Skip objects whose size and ETag already match at the destination"
+    )
+    delete_removed: bool = Field(
+        default=False,
+        description="Delete destination objects that no longer exist in the source folder"
+    )
+
+
+class CreateUploadSessionRequest(BaseModel):
+    bucket_name: str = Field(
+        ...,
+        description="Name of the S3 bucket"
+    )
+    file_name: str = Field(
+        ...,
+        description="Name of the file being uploaded (e.g., backup.tar)"
+    )
+    folder_name: str | None = Field(
+        default=None,
+        description="Optional folder inside the bucket (e.g., test_folder)"
+    )
+    file_size: int | None = Field(
+        default=None,
+        ge=0,
+        description="Optional total size in bytes, used to recommend a part size"
+    )
+    content_type: str | None = Field(
+        default=None,
+        description="Optional content type stored with the object"
+    )
+
+
+class PresignUploadRequest(BaseModel):
+    bucket_name: str = Field(
+        ...,
+        description="Name of the S3 bucket"
+    )
+    file_name: str = Field(
+        ...,
+        description="Name of the file to upload (e.g., report.pdf)"
+    )
+    folder_name: str | None = Field(
+        default=None,
+        description="Optional folder inside the bucket (e.g., test_folder)"
+    )
+    content_type: str | None = Field(
+        default=None,
+        description="Content type the client must send with the upload"
+    )
+    file_size: int | None = Field(
+        default=None,
+        ge=0,
+        description="Exact size in bytes the client must send, signed as the Content-Length header"
+    )
+    expires_in: int | None = Field(
+        default=None,
+        ge=1,
+        le=604800,
+        description="URL lifetime in seconds"
+    )
+
+
+class PresignCompleteRequest(BaseModel):
+    bucket_name: str = Field(
+        ...,
+        description="Name of the S3 bucket"
+    )
+    file_key: str = Field(
+        ...,
+        description="Key returned by the presign request, once the PUT succeeded"
+    )
+
+
+class FileReference(BaseModel):
+    file_name: str = Field(
+        ...,
+        description="Name of the file (e.g., report.pdf)"
+    )
+    folder_name: str | None = Field(
+        default=None,
+        description="Optional folder inside the bucket (e.g., test_folder)"
+    )
+
+
+class DeleteFilesRequest(BaseModel):
+    keys: list[str] = Field(
+        default_factory=list,
+        description="Full object keys to delete"
+    )
+    files: list[FileReference] = Field(
+        default_factory=list,
+        description="Folder and file name pairs to delete"
+    )
@@ -0,0 +1,579 @@
+import asyncio
+import json
+import math
+from datetime import timezone
+from email.utils import format_datetime
+from typing import Any, AsyncIterator, BinaryIO, Callable
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+
+from app.core.compression import UNCOMPRESSED_SIZE_METADATA_KEY, aiter_decompressed, negotiate_download
+from app.core.config import (
+    S3_DELETE_CONCURRENCY,
+    S3_DOWNLOAD_CHUNK_SIZE,
+    S3_MULTIPART_CONCURRENCY,
+    S3_MULTIPART_COPY_CONCURRENCY,
+    S3_MULTIPART_COPY_PART_SIZE,
+    S3_MULTIPART_COPY_THRESHOLD,
+    S3_MULTIPART_PART_SIZE,
+    S3_MULTIPART_THRESHOLD,
+)
+from app.s3_bucket.repositories.async_s3_repository import AsyncS3Repository
+from app.s3_bucket.schemas.s3_request_schema import (
+    CopyMoveFolderRequest,
+    CreateBucketRequest,
+    CreateFolderRequest,
+    DeleteFilesRequest,
+    DeleteFolderRequest,
+    SyncFolderRequest,
+)
+from app.s3_bucket.services.batch_delete import DELETE_BATCH_SIZE, MAX_REPORTED_ERRORS
+from app.s3_bucket.services.multipart_copy import PRESERVED_ATTRIBUTES
+from app.s3_bucket.services.multipart_upload import MAX_PARTS, MIN_PART_SIZE
+from app.s3_bucket.services.s3_service import s3Service
+from app.s3_index.services.index_service import MetadataIndexService
+from app.utils.http_headers import content_disposition
+from app.utils.logging_config import get_logger
+
+
+class asyncS3Service:
+    # Async versions of the s3Service request-path operations. Key building,
+    # validation and serialization are shared with the sync service, and the
+    # long-running folder operations and background jobs are delegated to it.
+    def __init__(
+        self,
+        s3_repository: AsyncS3Repository,
+        sync_service: s3Service,
+        metadata_index: MetadataIndexService | None = None,
+    ):
+        self.s3_repository = s3_repository
+        self.sync_service = sync_service
+        self.metadata_index = metadata_index
+        self.logger = get_logger(__name__)
+
+    def _log_client_error(self, e: ClientError) -> str:
+        error_code = e.response["Error"]["Code"]
+        self.logger.error("Error Code: %s", error_code, exc_info=True)
+        return error_code
+
+    async def _update_index(self, bucket_name: str, update: Callable[[MetadataIndexService], None]):
+        # Index updates are blocking SQLite calls, skipped for buckets that are not indexed
+        if self.metadata_index is not None and self.metadata_index.is_indexed(bucket_name):
+            await run_in_threadpool(update, self.metadata_index)
+
+    # Transfers
+    async def _multipart_upload(
+        self,
+        bucket_name: str,
+        file_key: str,
+        file: UploadFile,
+        file_size: int,
+        content_type: str | None,
+    ):
+        part_size = max(S3_MULTIPART_PART_SIZE, MIN_PART_SIZE, math.ceil(file_size / MAX_PARTS))
+        upload_id = (await self.s3_repository.create_multipart_upload(bucket_name, file_key, content_type))["UploadId"]
+        # Each slot is one part held in memory and in flight
+        slots = asyncio.Semaphore(max(S3_MULTIPART_CONCURRENCY, 1))
+        tasks: list[asyncio.Task] = []
+
+        async def upload_part(part_number: int, body: bytes):
+            try:
+                response = await self.s3_repository.upload_part(bucket_name, file_key, upload_id, part_number, body)
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+            finally:
+                slots.release()
+
+        try:
+            part_number = 1
+            while True:
+                await slots.acquire()
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+
+                body = await file.read(part_size)
+                if not body and part_number > 1:
+                    slots.release()
+                    break
+                tasks.append(asyncio.create_task(upload_part(part_number, body)))
+                part_number += 1
+
+            parts = await asyncio.gather(*tasks)
+            return await self.s3_repository.complete_multipart_upload(bucket_name, file_key, upload_id, list(parts))
+
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.logger.error("Aborting multipart upload for '%s' in bucket '%s'", file_key, bucket_name)
+            try:
+                await self.s3_repository.abort_multipart_upload(bucket_name, file_key, upload_id)
+            except Exception:
+                self.logger.error("Failed to abort multipart upload '%s'", upload_id, exc_info=True)
+            raise
+
+    async def _multipart_copy(
+        self,
+        bucket_name: str,
+        source_key: str,
+        destination_key: str,
+        source_head: dict[str, Any],
+    ):
+        size = source_head["ContentLength"]
+        part_size = max(S3_MULTIPART_COPY_PART_SIZE, MIN_PART_SIZE, math.ceil(size / MAX_PARTS))
+        extra_args = {
+            attribute: source_head[attribute]
+            for attribute in PRESERVED_ATTRIBUTES
+            if source_head.get(attribute)
+        }
+        upload_id = (
+            await self.s3_repository.create_multipart_upload(
+                bucket_name, destination_key, source_head.get("ContentType"), **extra_args
+            )
+        )["UploadId"]
+        slots = asyncio.Semaphore(max(S3_MULTIPART_COPY_CONCURRENCY, 1))
+
+        async def copy_part(part_number: int, start: int):
+            async with slots:
+                end = min(start + part_size, size) - 1
+                response = await self.s3_repository.upload_part_copy(
+                    bucket_name, destination_key, upload_id, part_number, source_key, f"bytes={start}-{end}"
+                )
+                return {"PartNumber": part_number, "ETag": response["CopyPartResult"]["ETag"]}
+
+        tasks = [
+            asyncio.create_task(copy_part(part_number, start))
+            for part_number, start in enumerate(range(0, size, part_size), start=1)
+        ]
+        try:
+            parts = await asyncio.gather(*tasks)
+            return await self.s3_repository.complete_multipart_upload(
+                bucket_name, destination_key, upload_id, list(parts)
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.logger.error("Aborting multipart copy to '%s' in bucket '%s'", destination_key, bucket_name)
+            try:
+                await self.s3_repository.abort_multipart_upload(bucket_name, destination_key, upload_id)
+            except Exception:
+                self.logger.error("Failed to abort multipart upload '%s'", upload_id, exc_info=True)
+            raise
+
+    async def _head_source(self, bucket_name: str, file_key: str):
+        # HEAD answers a bare 404 for a missing bucket and a missing key alike,
+        # where copy_object would have said NoSuchBucket
+        try:
+            return await self.s3_repository.head_object(bucket_name, file_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "404":
+                raise
+            try:
+                await self.s3_repository.head_bucket(bucket_name)
+            except ClientError as bucket_error:
+                if bucket_error.response["Error"]["Code"] in ("404", "NoSuchBucket"):
+                    raise ClientError(
+                        {"Error": {"Code": "NoSuchBucket", "Message": f"Bucket '{bucket_name}' does not exist"}},
+                        "HeadObject",
+                    ) from e
+            raise
+
+    async def _copy_object(self, bucket_name: str, source_key: str, destination_key: str):
+        source_head = await self._head_source(bucket_name, source_key)
+        if source_head["ContentLength"] >= S3_MULTIPART_COPY_THRESHOLD:
+            return await self._multipart_copy(bucket_name, source_key, destination_key, source_head)
+        return await self.s3_repository.copy_file(bucket_name, source_key, destination_key)
+
+    async def _delete_prefix(self, bucket_name: str, folder_name: str):
+        prefix = f"{folder_name.rstrip('/')}/"
+        result = {"deleted": 0, "failed": 0, "errors": []}
+        slots = asyncio.Semaphore(max(S3_DELETE_CONCURRENCY, 1))
+        tasks: list[asyncio.Task] = []
+
+        async def delete_batch(batch: list[str]):
+            try:
+                errors = (await self.s3_repository.delete_objects(bucket_name, batch)).get("Errors", [])
+                failed = {error.get("Key") for error in errors}
+                await self._update_index(
+                    bucket_name,
+                    lambda index: index.record_delete(bucket_name, [key for key in batch if key not in failed]),
+                )
+            finally:
+                slots.release()
+            result["deleted"] += len(batch) - len(errors)
+            result["failed"] += len(errors)
+            for error in errors[: MAX_REPORTED_ERRORS - len(result["errors"])]:
+                result["errors"].append(
+                    {"key": error.get("Key"), "code": error.get("Code"), "message": error.get("Message")}
+                )
+
+        async def submit(batch: list[str]):
+            await slots.acquire()
+            tasks.append(asyncio.create_task(delete_batch(batch)))
+
+        try:
+            batch = []
+            async for key in self.s3_repository.iter_object_keys(bucket_name, prefix):
+                batch.append(key)
+                if len(batch) == DELETE_BATCH_SIZE:
+                    await submit(batch)
+                    batch = []
+            if batch:
+                await submit(batch)
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return result
+
+    async def _iter_body(self, body) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in body.iter_chunks(S3_DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    async def _iter_ndjson_pages(self, page, bucket_name: str, prefix: str, delimiter: str | None, page_size: int):
+        while True:
+            lines = [json.dumps(self.sync_service._serialize_object(obj)) + "\n" for obj in page.get("Contents", [])]
+            lines.extend(json.dumps({"prefix": entry["Prefix"]}) + "\n" for entry in page.get("CommonPrefixes", []))
+            if lines:
+                yield "".join(lines)
+            if not page.get("IsTruncated"):
+                return
+            page = await self.s3_repository.list_objects_page(
+                bucket_name, prefix, delimiter, page_size, page["NextContinuationToken"]
+            )
+
+    # LIST BUCKETS
+    async def list_buckets(self):
+        try:
+            self.logger.info("Fetching all S3 buckets")
+            return await self.s3_repository.list_all_buckets()
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "AccessDenied":
+                raise HTTPException(403, "Access denied while listing S3 buckets.")
+            raise HTTPException(500, "Failed to list S3 buckets.")
+
+    # CREATE BUCKETS
+    async def create_bucket(self, request: CreateBucketRequest):
+        self.logger.info("Bucket Name %s | Creating S3 Buckets", request.bucket_name)
+        self.sync_service._validate_bucket_name(bucket_name=request.bucket_name)
+        try:
+            return await self.s3_repository.create_bucket(request.bucket_name)
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "BucketAlreadyExists":
+                raise HTTPException(409, "Bucket name already exists. Please choose a different name.")
+            if error_code == "BucketAlreadyOwnedByYou":
+                raise HTTPException(409, "Bucket already exists in your account.")
+            raise HTTPException(500, "Failed to create bucket.")
+
+    # DELETE BUCKET
+    async def delete_bucket(self, bucket_name: str, force: bool = False, background: bool = False):
+        if force:
+            # Purging is a bulk operation, run on the sync engine's pools
+            return await run_in_threadpool(self.sync_service.delete_bucket, bucket_name, True, background)
+        try:
+            self.logger.info("Deleting Bucket")
+            response = await self.s3_repository.delete_bucket(bucket_name)
+            await self._update_index(bucket_name, lambda index: index.record_bucket_deleted(bucket_name))
+            return response
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist in your account.")
+            if error_code == "BucketNotEmpty":
+                raise HTTPException(409, "Bucket is not empty. Delete contents first.")
+            raise HTTPException(500, "Failed to delete bucket.")
+
+    # LIST OBJECTS
+    async def list_objects(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        delimiter: str | None = None,
+        page_size: int = 1000,
+        continuation_token: str | None = None,
+        stream: bool = False,
+    ):
+        try:
+            self.logger.info("Listing objects in bucket '%s' with prefix '%s'", bucket_name, prefix)
+            page = await self.s3_repository.list_objects_page(
+                bucket_name, prefix, delimiter, page_size, continuation_token
+            )
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+            if error_code == "AccessDenied":
+                raise HTTPException(403, "Access denied while listing objects")
+            if error_code == "InvalidArgument":
+                raise HTTPException(400, "Invalid continuation token")
+            raise HTTPException(500, "Failed to list objects")
+
+        if stream:
+            return StreamingResponse(
+                self._iter_ndjson_pages(page, bucket_name, prefix, delimiter, page_size),
+                media_type="application/x-ndjson",
+            )
+        return self.sync_service._serialize_page(page)
+
+    # CREATE FOLDER
+    async def create_folder(self, request: CreateFolderRequest):
+        try:
+            self.logger.info(
+                "Creating Folder with bucket %s and folder %s", request.bucket_name, request.folder_name
+            )
+            response = await self.s3_repository.create_object(request.bucket_name, request.folder_name)
+            folder_key = f"{request.folder_name.rstrip('/')}/"
+            await self._update_index(
+                request.bucket_name, lambda index: index.record_put(request.bucket_name, folder_key, 0, response)
+            )
+            return {
+                "message": f"Folder '{request.folder_name}' created in bucket '{request.bucket_name}'."
+            }
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist.")
+            raise HTTPException(500, "Failed to create folder.")
+
+    # DELETE FOLDER
+    async def delete_folder(self, request: DeleteFolderRequest):
+        if request.background:
+            return await run_in_threadpool(self.sync_service.delete_folder, request)
+        try:
+            self.logger.info(
+                "Deleting Folder with bucket %s and folder %s", request.bucket_name, request.folder_name
+            )
+            result = await self._delete_prefix(request.bucket_name, request.folder_name)
+            return {
+                "message": f"Folder '{request.folder_name}' deleted from bucket '{request.bucket_name}'.",
+                **result,
+            }
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist.")
+            raise HTTPException(500, "Failed to delete folder.")
+
+    # Upload Files
+    async def upload_file(self, bucket_name: str, file: UploadFile, folder_name: str | None, dedup: bool = False):
+        if dedup:
+            # Hashing and the content hash index live in the sync engine
+            return await run_in_threadpool(self.sync_service.upload_file, bucket_name, file, folder_name, True)
+        filename = file.filename
+        file_key = self.sync_service._build_file_key(filename, folder_name)
+        file_size = await run_in_threadpool(self.sync_service._get_upload_size, file)
+        if self.sync_service.upload_compressor.rule_for(file_key, file.content_type, file_size) is not None:
+            # Compression is CPU bound, the sync engine runs it in the threadpool
+            return await run_in_threadpool(self.sync_service.upload_file, bucket_name, file, folder_name)
+        try:
+            self.logger.info("Uploading file '%s' to bucket '%s'", filename, bucket_name)
+            if file_size < S3_MULTIPART_THRESHOLD:
+                body = await file.read()
+                response = await self.s3_repository.upload_file(bucket_name, file_key, body, file.content_type)
+                uploaded_size = len(body)
+            else:
+                response = await self._multipart_upload(bucket_name, file_key, file, file_size, file.content_type)
+                uploaded_size = None
+            await self._update_index(
+                bucket_name, lambda index: index.record_put(bucket_name, file_key, uploaded_size, response)
+            )
+
+            self.logger.info("File '%s' uploaded successfully to bucket '%s'", filename, bucket_name)
+            return {"message": f"File '{filename}' uploaded to bucket '{bucket_name}'."}
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(status_code=404, detail="Bucket does not exist.")
+            raise HTTPException(status_code=500, detail="Failed to upload file.")
+
+    # Download File
+    async def download_file(
+        self,
+        bucket_name: str,
+        file_name: str,
+        folder_name: str | None = None,
+        byte_range: str | None = None,
+        if_none_match: str | None = None,
+        if_modified_since: str | None = None,
+        accept_encoding: str | None = None,
+    ):
+        file_key = self.sync_service._build_file_key(file_name, folder_name)
+        try:
+            self.logger.info("Downloading file '%s' from bucket '%s'", file_key, bucket_name)
+            response = await self.s3_repository.get_object(
+                bucket_name,
+                file_key,
+                byte_range=byte_range,
+                if_none_match=if_none_match,
+                if_modified_since=self.sync_service._parse_http_date(if_modified_since),
+            )
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            if error_code in ("304", "NotModified"):
+                headers = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+                not_modified_headers = {"ETag": headers["etag"]} if "etag" in headers else {}
+                return Response(status_code=304, headers=not_modified_headers)
+
+            self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+            if error_code == "NoSuchKey":
+                raise HTTPException(404, "File does not exist")
+            if error_code == "InvalidRange":
+                raise HTTPException(416, "Requested range not satisfiable")
+            raise HTTPException(500, "Failed to download file")
+
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(response["ContentLength"]),
+            "ETag": response["ETag"],
+            "Content-Disposition": content_disposition(file_name),
+        }
+        if "LastModified" in response:
+            headers["Last-Modified"] = format_datetime(
+                response["LastModified"].astimezone(timezone.utc), usegmt=True
+            )
+        if "ContentRange" in response:
+            headers["Content-Range"] = response["ContentRange"]
+
+        body = self._iter_body(response["Body"])
+        codec = negotiate_download(
+            headers,
+            response.get("ContentEncoding"),
+            accept_encoding,
+            response.get("Metadata", {}).get(UNCOMPRESSED_SIZE_METADATA_KEY),
+        )
+        if codec:
+            body = aiter_decompressed(body, codec)
+        return StreamingResponse(
+            body,
+            status_code=206 if "ContentRange" in response else 200,
+            media_type=response.get("ContentType", "application/octet-stream"),
+            headers=headers,
+        )
+
+    # DELETE FILE
+    async def delete_file(self, bucket_name: str, file_name: str, folder_name: str | None = None):
+        file_key = self.sync_service._build_file_key(file_name, folder_name)
+        try:
+            self.logger.info("Deleting file '%s' from bucket '%s'", file_key, bucket_name)
+            await self.s3_repository.delete_file(bucket_name, file_key)
+            await self._update_index(bucket_name, lambda index: index.record_delete(bucket_name, [file_key]))
+            return {
+                "message": f"File '{file_key}' deleted from bucket '{bucket_name}'."
+            }
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+            if error_code == "NoSuchKey":
+                raise HTTPException(404, "File does not exist")
+            raise HTTPException(500, "Failed to delete file")
+
+    # COPY / MOVE FILE
+    async def copy_file(
+        self,
+        bucket_name: str,
+        file_name: str,
+        source_folder: str | None,
+        destination_folder: str | None,
+    ):
+        source_key = self.sync_service._build_file_key(file_name, source_folder)
+        destination_key = self.sync_service._build_file_key(file_name, destination_folder)
+        try:
+            self.logger.info(
+                "Copying file from '%s' to '%s' in bucket '%s'", source_key, destination_key, bucket_name
+            )
+            response = await self._copy_object(bucket_name, source_key, destination_key)
+            await self._update_index(
+                bucket_name,
+                lambda index: index.record_copy(bucket_name, destination_key, bucket_name, source_key, response),
+            )
+            return {
+                "message": "File copied successfully",
+                "source_key": source_key,
+                "destination_key": destination_key,
+            }
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+            if error_code in ("NoSuchKey", "404"):
+                raise HTTPException(404, "Source file does not exist")
+            raise HTTPException(500, "Failed to copy file")
+
+    async def move_file(
+        self,
+        bucket_name: str,
+        file_name: str,
+        source_folder: str | None,
+        destination_folder: str | None,
+    ):
+        source_key = self.sync_service._build_file_key(file_name, source_folder)
+        destination_key = self.sync_service._build_file_key(file_name, destination_folder)
+        try:
+            self.logger.info(
+                "Moving file from '%s' to '%s' in bucket '%s'", source_key, destination_key, bucket_name
+            )
+            response = await self._copy_object(bucket_name, source_key, destination_key)
+            await self.s3_repository.delete_file(bucket_name, source_key)
+
+            def update(index: MetadataIndexService):
+                index.record_copy(bucket_name, destination_key, bucket_name, source_key, response)
+                index.record_delete(bucket_name, [source_key])
+
+            await self._update_index(bucket_name, update)
+            return {
+                "message": "File moved successfully",
+                "source_key": source_key,
+                "destination_key": destination_key,
+            }
+
+        except ClientError as e:
+            error_code = self._log_client_error(e)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+            if error_code in ("NoSuchKey", "404"):
+                raise HTTPException(404, "Source file does not exist")
+            raise HTTPException(500, "Failed to move file")
+
+    # BATCH UPLOAD / BULK DELETE / COPY / MOVE / SYNC FOLDER
+    # Bulk operations keep running on the sync engine's bounded pools
+    async def upload_files(self, bucket_name: str, files: list[UploadFile], folder_name: str | None):
+        return await run_in_threadpool(self.sync_service.upload_files, bucket_name, files, folder_name)
+
+    async def upload_archive(self, bucket_name: str, archive: UploadFile, folder_name: str | None):
+        return await run_in_threadpool(self.sync_service.upload_archive, bucket_name, archive, folder_name)
+
+    async def delete_files(self, bucket_name: str, request: DeleteFilesRequest):
+        return await run_in_threadpool(self.sync_service.delete_files, bucket_name, request)
+
+    async def delete_files_ndjson(self, bucket_name: str, body: BinaryIO):
+        return await run_in_threadpool(self.sync_service.delete_files_ndjson, bucket_name, body)
+
+    async def copy_folder(self, request: CopyMoveFolderRequest):
+        return await run_in_threadpool(self.sync_service.copy_folder, request)
+
+    async def move_folder(self, request: CopyMoveFolderRequest):
+        return await run_in_threadpool(self.sync_service.move_folder, request)
+
+    async def sync_folder(self, request: SyncFolderRequest):
+        return await run_in_threadpool(self.sync_service.sync_folder, request)
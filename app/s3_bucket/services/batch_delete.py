@@ -0,0 +1,98 @@
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from itertools import islice
+from typing import Any, Callable, Iterable
+
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.utils.logging_config import get_logger
+
+# S3 DeleteObjects limit
+DELETE_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+def _batched(keys: Iterable[Any], size: int) -> Iterable[list[Any]]:
+    iterator = iter(keys)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class BatchDeleter:
+    # Groups keys into DeleteObjects batches and keeps up to `concurrency`
+    # batches in flight while the key iterator (e.g. a paginated listing)
+    # produces the next one.
+    def __init__(self, s3_repository: s3Repository, executor: Executor, concurrency: int):
+        self.s3_repository = s3_repository
+        self.executor = executor
+        self.concurrency = max(concurrency, 1)
+        self.logger = get_logger(__name__)
+
+    def delete_keys(
+        self,
+        bucket_name: str,
+        keys: Iterable[str],
+        on_progress: Callable[[int, int], None] | None = None,
+        max_errors: int | None = MAX_REPORTED_ERRORS,
+    ):
+        # max_errors=None reports every failed key
+        return self._delete_batches(
+            bucket_name, keys, self.s3_repository.delete_objects, on_progress, max_errors
+        )
+
+    def delete_versions(
+        self,
+        bucket_name: str,
+        versions: Iterable[dict[str, str]],
+        on_progress: Callable[[int, int], None] | None = None,
+        max_errors: int | None = MAX_REPORTED_ERRORS,
+    ):
+        # Entries are {"Key", "VersionId"}; delete markers are removed the same way
+        return self._delete_batches(
+            bucket_name, versions, self.s3_repository.delete_object_versions, on_progress, max_errors
+        )
+
+    def _delete_batches(
+        self,
+        bucket_name: str,
+        entries: Iterable[Any],
+        delete_batch: Callable[[str, list[Any]], dict[str, Any]],
+        on_progress: Callable[[int, int], None] | None,
+        max_errors: int | None,
+    ):
+        result = {"deleted": 0, "failed": 0, "errors": []}
+        in_flight: dict[Future, int] = {}
+
+        def collect(done: set[Future]):
+            for future in done:
+                batch_size = in_flight.pop(future)
+                errors = future.result().get("Errors", [])
+                result["deleted"] += batch_size - len(errors)
+                result["failed"] += len(errors)
+                if max_errors is not None:
+                    errors = errors[: max(max_errors - len(result["errors"]), 0)]
+                for error in errors:
+                    reported = {"key": error.get("Key"), "code": error.get("Code"), "message": error.get("Message")}
+                    if error.get("VersionId"):
+                        reported["version_id"] = error["VersionId"]
+                    result["errors"].append(reported)
+            if on_progress:
+                on_progress(result["deleted"], result["failed"])
+
+        try:
+            for batch in _batched(entries, DELETE_BATCH_SIZE):
+                if len(in_flight) >= self.concurrency:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = self.executor.submit(delete_batch, bucket_name, batch)
+                in_flight[future] = len(batch)
+
+            done, _ = wait(in_flight)
+            collect(done)
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+
+        self.logger.info(
+            "Deleted %s objects from bucket '%s', %s failed", result["deleted"], bucket_name, result["failed"]
+        )
+        return result
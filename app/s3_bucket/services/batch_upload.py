@@ -0,0 +1,150 @@
+import posixpath
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import BinaryIO, Iterable, Iterator, NamedTuple
+
+from botocore.exceptions import ClientError
+
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.multipart_upload import MultipartUploader
+from app.utils.logging_config import get_logger
+
+
+class BatchUploadItem(NamedTuple):
+    name: str
+    key: str | None
+    fileobj: BinaryIO | None
+    size: int
+    content_type: str | None
+
+
+def _safe_member_name(name: str) -> str | None:
+    # Archive paths become object keys, so absolute paths and ".." are refused
+    name = posixpath.normpath(name.replace("\\", "/"))
+    if name.startswith("/") or name == "." or name.split("/")[0] == "..":
+        return None
+    return name
+
+
+def iter_archive_members(fileobj: BinaryIO) -> Iterator[tuple[str, BinaryIO | None, int]]:
+    # Yields (name, stream, size) for each regular file; stream is None for an
+    # unsafe path. Tar archives (optionally compressed) are read as a forward
+    # stream, zip archives need the seekable spooled upload for their index.
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                name = _safe_member_name(info.filename)
+                if name is None:
+                    yield info.filename, None, info.file_size
+                    continue
+                with archive.open(info) as member:
+                    yield name, member, info.file_size
+        return
+
+    fileobj.seek(0)
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            name = _safe_member_name(info.name)
+            if name is None:
+                yield info.name, None, info.size
+                continue
+            yield name, archive.extractfile(info), info.size
+
+
+class BatchUploader:
+    # Uploads many files into one bucket with up to `concurrency` small PUTs in
+    # flight on the shared transfer pool. Each small file is read into memory
+    # before it is submitted, so sequential sources such as a tar stream can
+    # move on to the next member; files at or above `multipart_threshold` are
+    # streamed through the multipart uploader from the calling thread instead.
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        multipart_uploader: MultipartUploader,
+        executor: Executor,
+        multipart_threshold: int,
+        concurrency: int,
+    ):
+        self.s3_repository = s3_repository
+        self.multipart_uploader = multipart_uploader
+        self.executor = executor
+        self.multipart_threshold = multipart_threshold
+        self.concurrency = max(concurrency, 1)
+        self.logger = get_logger(__name__)
+
+    def upload(self, bucket_name: str, items: Iterable[BatchUploadItem]):
+        started = time.perf_counter()
+        result = {"uploaded": 0, "failed": 0, "skipped": 0, "bytes_uploaded": 0, "files": []}
+        in_flight: dict[Future, dict] = {}
+
+        def record(entry: dict, error: Exception | None = None):
+            if error is None:
+                entry["status"] = "uploaded"
+                result["uploaded"] += 1
+                result["bytes_uploaded"] += entry["size"]
+            else:
+                entry["status"] = "failed"
+                entry["error"] = error.response["Error"]["Code"] if isinstance(error, ClientError) else str(error)
+                result["failed"] += 1
+                self.logger.error("Failed to upload '%s'", entry["file_key"], exc_info=error)
+
+        def collect(done: set[Future]):
+            for future in done:
+                entry = in_flight.pop(future)
+                record(entry, future.exception())
+
+        try:
+            for item in items:
+                if item.fileobj is None:
+                    result["skipped"] += 1
+                    result["files"].append({"file_name": item.name, "status": "skipped", "error": "Unsafe path"})
+                    continue
+
+                entry = {"file_name": item.name, "file_key": item.key, "size": item.size}
+                result["files"].append(entry)
+
+                if item.size >= self.multipart_threshold:
+                    try:
+                        self.multipart_uploader.upload(
+                            bucket_name, item.key, item.fileobj, item.size, item.content_type
+                        )
+                    except Exception as e:
+                        record(entry, e)
+                    else:
+                        record(entry)
+                    continue
+
+                if len(in_flight) >= self.concurrency:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                body = item.fileobj.read()
+                entry["size"] = len(body)
+                future = self.executor.submit(
+                    self.s3_repository.upload_file, bucket_name, item.key, body, item.content_type
+                )
+                in_flight[future] = entry
+
+            done, _ = wait(in_flight)
+            collect(done)
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+
+        elapsed = time.perf_counter() - started
+        result["elapsed_seconds"] = round(elapsed, 3)
+        result["objects_per_second"] = round(result["uploaded"] / elapsed, 2) if elapsed else 0.0
+        self.logger.info(
+            "Batch upload to '%s': %s uploaded, %s failed, %s skipped",
+            bucket_name, result["uploaded"], result["failed"], result["skipped"]
+        )
+        return result
+
@@ -0,0 +1,114 @@
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable
+
+from botocore.exceptions import ClientError
+
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.batch_delete import MAX_REPORTED_ERRORS, BatchDeleter
+from app.utils.logging_config import get_logger
+
+MAX_PURGE_PASSES = 5
+
+
+class BucketPurger:
+    # Empties a bucket completely so delete_bucket can succeed: in-progress
+    # multipart uploads are aborted with up to `concurrency` calls in flight,
+    # then every object version and delete marker goes through the batch
+    # deleter. Unversioned buckets list their objects with version "null",
+    # so the same path covers them. A listing taken while deletes are running
+    # can miss entries (and new ones may arrive), so passes repeat until one
+    # finds nothing left; failures of the last pass are reported.
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        batch_deleter: BatchDeleter,
+        executor: Executor,
+        concurrency: int,
+    ):
+        self.s3_repository = s3_repository
+        self.batch_deleter = batch_deleter
+        self.executor = executor
+        self.concurrency = max(concurrency, 1)
+        self.logger = get_logger(__name__)
+
+    def _abort_uploads(self, bucket_name: str, result: dict[str, Any], report: Callable[[], None]):
+        in_flight: dict[Future, dict[str, Any]] = {}
+
+        def collect(done: set[Future]):
+            for future in done:
+                upload = in_flight.pop(future)
+                try:
+                    future.result()
+                except ClientError as e:
+                    # Already completed or aborted elsewhere
+                    if e.response["Error"]["Code"] == "NoSuchUpload":
+                        continue
+                    result["failed"] += 1
+                    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                        result["errors"].append(
+                            {"key": upload["Key"], "upload_id": upload["UploadId"], "code": e.response["Error"]["Code"]}
+                        )
+                    continue
+                result["uploads_aborted"] += 1
+            report()
+
+        try:
+            for upload in self.s3_repository.iter_multipart_uploads(bucket_name):
+                if len(in_flight) >= self.concurrency:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = self.executor.submit(
+                    self.s3_repository.abort_multipart_upload, bucket_name, upload["Key"], upload["UploadId"]
+                )
+                in_flight[future] = upload
+
+            done, _ = wait(in_flight)
+            collect(done)
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+
+    def purge(self, bucket_name: str, on_progress: Callable[[int, int], None] | None = None):
+        result = {"versions_deleted": 0, "uploads_aborted": 0, "failed": 0, "errors": [], "passes": 0}
+
+        def report():
+            if on_progress:
+                on_progress(result["versions_deleted"] + result["uploads_aborted"], result["failed"])
+
+        for _ in range(MAX_PURGE_PASSES):
+            result["passes"] += 1
+            result["failed"] = 0
+            result["errors"] = []
+            processed_before = result["versions_deleted"] + result["uploads_aborted"]
+            versions_before = result["versions_deleted"]
+
+            self._abort_uploads(bucket_name, result, report)
+            failed_before = result["failed"]
+
+            def on_versions_deleted(deleted: int, failed: int):
+                result["versions_deleted"] = versions_before + deleted
+                result["failed"] = failed_before + failed
+                report()
+
+            deleted = self.batch_deleter.delete_versions(
+                bucket_name,
+                self.s3_repository.iter_object_versions(bucket_name),
+                on_progress=on_versions_deleted,
+            )
+            result["versions_deleted"] = versions_before + deleted["deleted"]
+            result["failed"] = failed_before + deleted["failed"]
+            result["errors"].extend(deleted["errors"][: max(MAX_REPORTED_ERRORS - len(result["errors"]), 0)])
+
+            if result["versions_deleted"] + result["uploads_aborted"] == processed_before:
+                break
+
+        self.logger.info(
+            "Purged bucket '%s' in %s passes: %s versions deleted, %s uploads aborted, %s failed",
+            bucket_name,
+            result["passes"],
+            result["versions_deleted"],
+            result["uploads_aborted"],
+            result["failed"],
+        )
+        return result
@@ -0,0 +1,223 @@
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Iterator
+
+from botocore.exceptions import ClientError
+
+from app.core.metrics import TracingThreadPoolExecutor
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.batch_delete import MAX_REPORTED_ERRORS, BatchDeleter
+from app.utils.logging_config import get_logger
+
+COUNTERS = ("copied", "skipped", "failed", "deleted", "bytes_copied")
+
+
+def _is_multipart_etag(etag: str) -> bool:
+    return "-" in etag
+
+
+def _is_unchanged(source: dict[str, Any], destination: dict[str, Any] | None) -> bool:
+    if destination is None or source["Size"] != destination["Size"]:
+        return False
+    if source["ETag"] == destination["ETag"]:
+        return True
+    # Multipart ETags depend on the part size, so they differ even for identical
+    # content; fall back to size plus the destination being at least as recent
+    if _is_multipart_etag(source["ETag"]) or _is_multipart_etag(destination["ETag"]):
+        return destination["LastModified"] >= source["LastModified"]
+    return False
+
+
+class FolderTransfer:
+    # Copies every object under a prefix to another prefix (optionally in
+    # another bucket) with up to `concurrency` copies in flight. Each run gets
+    # its own fan-out pool so large objects can still use the shared transfer
+    # pool for their multipart parts without starving it.
+    #
+    # The source is listed page by page. Once a page and every page before it
+    # are finished, `on_checkpoint` receives the token of the next page and the
+    # counters so far; passing that dict back as `checkpoint` resumes the run
+    # without copying the finished pages again.
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        batch_deleter: BatchDeleter,
+        copy_object: Callable[..., Any],
+        concurrency: int,
+    ):
+        self.s3_repository = s3_repository
+        self.batch_deleter = batch_deleter
+        self.copy_object = copy_object
+        self.concurrency = max(concurrency, 1)
+        self.logger = get_logger(__name__)
+
+    def _iter_removed_keys(
+        self,
+        source_bucket: str,
+        source_prefix: str,
+        destination_bucket: str,
+        destination_prefix: str,
+    ) -> Iterator[str]:
+        # Both listings come back in key order, so a merge finds destination
+        # keys missing from the source without holding either side in memory
+        source_keys = (key[len(source_prefix):] for key in self.s3_repository.iter_object_keys(source_bucket, source_prefix))
+        source_key = next(source_keys, None)
+        for key in self.s3_repository.iter_object_keys(destination_bucket, destination_prefix):
+            relative_key = key[len(destination_prefix):]
+            while source_key is not None and source_key < relative_key:
+                source_key = next(source_keys, None)
+            if source_key != relative_key:
+                yield key
+
+    def run(
+        self,
+        source_bucket: str,
+        source_prefix: str,
+        destination_bucket: str,
+        destination_prefix: str,
+        skip_unchanged: bool = False,
+        delete_source: bool = False,
+        delete_removed: bool = False,
+        on_progress: Callable[[int, int, int], None] | None = None,
+        checkpoint: dict[str, Any] | None = None,
+        on_checkpoint: Callable[[dict[str, Any]], None] | None = None,
+    ):
+        started = time.perf_counter()
+        result = {counter: 0 for counter in COUNTERS}
+        result["errors"] = []
+        continuation_token = None
+        listing_done = False
+        if checkpoint:
+            result.update({counter: checkpoint["result"][counter] for counter in COUNTERS})
+            result["errors"] = list(checkpoint["result"]["errors"])
+            continuation_token = checkpoint["continuation_token"]
+            listing_done = checkpoint["listing_done"]
+        copied_at_start = result["copied"]
+        bytes_at_start = result["bytes_copied"]
+
+        # Source keys come back in key order, so the destination listing is
+        # walked alongside them (as in _iter_removed_keys) instead of being
+        # loaded up front
+        destination_objects = (
+            self.s3_repository.iter_objects(destination_bucket, destination_prefix)
+            if skip_unchanged and not listing_done
+            else iter(())
+        )
+        destination = None
+
+        def destination_object(relative_key: str) -> dict[str, Any] | None:
+            nonlocal destination
+            while destination is None or destination["Key"][len(destination_prefix):] < relative_key:
+                destination = next(destination_objects, None)
+                if destination is None:
+                    return None
+            return destination if destination["Key"][len(destination_prefix):] == relative_key else None
+
+        pages: deque[dict[str, Any]] = deque()
+        in_flight: dict[Future, tuple[dict[str, Any], dict[str, Any]]] = {}
+
+        def record_error(key: str, error: Exception):
+            result["failed"] += 1
+            if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                code = error.response["Error"]["Code"] if isinstance(error, ClientError) else type(error).__name__
+                result["errors"].append({"key": key, "code": code, "message": str(error)})
+
+        def save_checkpoint(next_token: str | None):
+            if on_checkpoint:
+                on_checkpoint({
+                    "continuation_token": next_token,
+                    "listing_done": next_token is None,
+                    "result": {**{counter: result[counter] for counter in COUNTERS}, "errors": list(result["errors"])},
+                })
+
+        def finish_pages():
+            while pages and pages[0]["listed"] and pages[0]["pending"] == 0:
+                page = pages.popleft()
+                # Only objects that now exist at the destination are removed from the source
+                if delete_source and page["done_keys"]:
+                    result["deleted"] += self.batch_deleter.delete_keys(source_bucket, page["done_keys"])["deleted"]
+                save_checkpoint(page["next_token"])
+
+        def collect(done: set[Future]):
+            for future in done:
+                obj, page = in_flight.pop(future)
+                page["pending"] -= 1
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error("Failed to copy '%s'", obj["Key"], exc_info=True)
+                    record_error(obj["Key"], e)
+                    continue
+                result["copied"] += 1
+                result["bytes_copied"] += obj["Size"]
+                page["done_keys"].append(obj["Key"])
+            if on_progress:
+                on_progress(result["copied"] + result["skipped"], result["failed"], result["bytes_copied"])
+            finish_pages()
+
+        with TracingThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="s3-folder") as executor:
+            try:
+                listing = (
+                    () if listing_done
+                    else self.s3_repository.iter_object_pages(source_bucket, source_prefix, continuation_token)
+                )
+                for listed_page in listing:
+                    page = {
+                        "next_token": listed_page.get("NextContinuationToken") if listed_page.get("IsTruncated") else None,
+                        "pending": 0,
+                        "listed": False,
+                        "done_keys": [],
+                    }
+                    pages.append(page)
+                    for obj in listed_page.get("Contents", []):
+                        relative_key = obj["Key"][len(source_prefix):]
+                        if skip_unchanged and _is_unchanged(obj, destination_object(relative_key)):
+                            result["skipped"] += 1
+                            page["done_keys"].append(obj["Key"])
+                            continue
+
+                        if len(in_flight) >= self.concurrency:
+                            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                            collect(done)
+
+                        future = executor.submit(
+                            self.copy_object,
+                            destination_bucket,
+                            obj["Key"],
+                            f"{destination_prefix}{relative_key}",
+                            source_bucket,
+                            obj["Size"],
+                        )
+                        in_flight[future] = (obj, page)
+                        page["pending"] += 1
+                    page["listed"] = True
+                    finish_pages()
+
+                done, _ = wait(in_flight)
+                collect(done)
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+        if delete_removed:
+            removed_keys = self._iter_removed_keys(source_bucket, source_prefix, destination_bucket, destination_prefix)
+            result["deleted"] += self.batch_deleter.delete_keys(destination_bucket, removed_keys)["deleted"]
+
+        elapsed = time.perf_counter() - started
+        copied = result["copied"] - copied_at_start
+        result["elapsed_seconds"] = round(elapsed, 3)
+        result["objects_per_second"] = round(copied / elapsed, 2) if elapsed else 0.0
+        result["bytes_per_second"] = round((result["bytes_copied"] - bytes_at_start) / elapsed, 2) if elapsed else 0.0
+        self.logger.info(
+            "Transferred '%s/%s' to '%s/%s': %s copied, %s skipped, %s failed",
+            source_bucket,
+            source_prefix,
+            destination_bucket,
+            destination_prefix,
+            result["copied"],
+            result["skipped"],
+            result["failed"],
+        )
+        return result
@@ -0,0 +1,113 @@
+import math
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any
+
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.multipart_upload import MAX_PARTS, MIN_PART_SIZE
+from app.utils.logging_config import get_logger
+
+# Object attributes carried over to the destination, which a multipart
+# copy does not preserve on its own
+PRESERVED_ATTRIBUTES = (
+    "CacheControl",
+    "ContentDisposition",
+    "ContentEncoding",
+    "ContentLanguage",
+    "Metadata",
+)
+
+
+class MultipartCopier:
+    # Server-side copy through upload_part_copy byte ranges, with up to
+    # `concurrency` parts copied at once. Removes the 5 GB copy_object limit.
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        executor: Executor,
+        part_size: int,
+        concurrency: int,
+    ):
+        self.s3_repository = s3_repository
+        self.executor = executor
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.concurrency = max(concurrency, 1)
+        self.logger = get_logger(__name__)
+
+    def _copy_part(
+        self,
+        bucket_name: str,
+        source_key: str,
+        destination_key: str,
+        upload_id: str,
+        part_number: int,
+        byte_range: str,
+        source_bucket: str | None,
+    ):
+        response = self.s3_repository.upload_part_copy(
+            bucket_name, destination_key, upload_id, part_number, source_key, byte_range, source_bucket
+        )
+        return {"PartNumber": part_number, "ETag": response["CopyPartResult"]["ETag"]}
+
+    def copy(
+        self,
+        bucket_name: str,
+        source_key: str,
+        destination_key: str,
+        source_head: dict[str, Any],
+        source_bucket: str | None = None,
+    ):
+        size = source_head["ContentLength"]
+        part_size = max(self.part_size, math.ceil(size / MAX_PARTS))
+        extra_args = {
+            attribute: source_head[attribute]
+            for attribute in PRESERVED_ATTRIBUTES
+            if source_head.get(attribute)
+        }
+        upload_id = self.s3_repository.create_multipart_upload(
+            bucket_name, destination_key, source_head.get("ContentType"), **extra_args
+        )["UploadId"]
+        self.logger.info(
+            "Started multipart copy of '%s' (%s bytes) to '%s' with part size %s",
+            source_key, size, destination_key, part_size
+        )
+
+        in_flight: set[Future] = set()
+        parts = []
+        try:
+            for part_number, start in enumerate(range(0, size, part_size), start=1):
+                if len(in_flight) >= self.concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    parts.extend(future.result() for future in done)
+
+                end = min(start + part_size, size) - 1
+                in_flight.add(
+                    self.executor.submit(
+                        self._copy_part,
+                        bucket_name,
+                        source_key,
+                        destination_key,
+                        upload_id,
+                        part_number,
+                        f"bytes={start}-{end}",
+                        source_bucket,
+                    )
+                )
+
+            done, in_flight = wait(in_flight)
+            parts.extend(future.result() for future in done)
+            parts.sort(key=lambda part: part["PartNumber"])
+
+            response = self.s3_repository.complete_multipart_upload(bucket_name, destination_key, upload_id, parts)
+            self.logger.info("Completed multipart copy to '%s' with %s parts", destination_key, len(parts))
+            return response
+
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            wait(in_flight)
+            self.logger.error("Aborting multipart copy to '%s' in bucket '%s'", destination_key, bucket_name)
+            try:
+                self.s3_repository.abort_multipart_upload(bucket_name, destination_key, upload_id)
+            except Exception:
+                self.logger.error("Failed to abort multipart upload '%s'", upload_id, exc_info=True)
+            raise
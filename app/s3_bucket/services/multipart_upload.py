@@ -0,0 +1,97 @@
+import math
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import BinaryIO
+
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.utils.logging_config import get_logger
+
+# S3 limits
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10_000
+
+
+class MultipartUploader:
+    # Streams a file object into S3 multipart upload. At most `concurrency`
+    # parts are read into memory and in flight at once, so memory stays at
+    # roughly part_size * concurrency regardless of the file size.
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        executor: Executor,
+        part_size: int,
+        concurrency: int,
+    ):
+        self.s3_repository = s3_repository
+        self.executor = executor
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.concurrency = max(concurrency, 1)
+        self.logger = get_logger(__name__)
+
+    def part_size_for(self, file_size: int | None) -> int:
+        if not file_size:
+            return self.part_size
+        return max(self.part_size, math.ceil(file_size / MAX_PARTS))
+
+    def _upload_part(self, bucket_name: str, file_key: str, upload_id: str, part_number: int, body: bytes):
+        response = self.s3_repository.upload_part(bucket_name, file_key, upload_id, part_number, body)
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def upload(
+        self,
+        bucket_name: str,
+        file_key: str,
+        fileobj: BinaryIO,
+        file_size: int | None = None,
+        content_type: str | None = None,
+        metadata: dict[str, str] | None = None,
+        content_encoding: str | None = None,
+    ):
+        part_size = self.part_size_for(file_size)
+        extra_args = {"Metadata": metadata} if metadata else {}
+        if content_encoding:
+            extra_args["ContentEncoding"] = content_encoding
+        upload_id = self.s3_repository.create_multipart_upload(
+            bucket_name, file_key, content_type, **extra_args
+        )["UploadId"]
+        self.logger.info(
+            "Started multipart upload for '%s' in bucket '%s' with part size %s",
+            file_key, bucket_name, part_size
+        )
+
+        in_flight: set[Future] = set()
+        parts = []
+        try:
+            part_number = 1
+            while True:
+                # Bound the parts held in memory before reading the next one
+                while len(in_flight) >= self.concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    parts.extend(future.result() for future in done)
+
+                body = fileobj.read(part_size)
+                if not body and part_number > 1:
+                    break
+
+                in_flight.add(
+                    self.executor.submit(self._upload_part, bucket_name, file_key, upload_id, part_number, body)
+                )
+                part_number += 1
+
+            done, in_flight = wait(in_flight)
+            parts.extend(future.result() for future in done)
+            parts.sort(key=lambda part: part["PartNumber"])
+
+            response = self.s3_repository.complete_multipart_upload(bucket_name, file_key, upload_id, parts)
+            self.logger.info("Completed multipart upload for '%s' with %s parts", file_key, len(parts))
+            return response
+
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            wait(in_flight)
+            self.logger.error("Aborting multipart upload for '%s' in bucket '%s'", file_key, bucket_name)
+            try:
+                self.s3_repository.abort_multipart_upload(bucket_name, file_key, upload_id)
+            except Exception:
+                self.logger.error("Failed to abort multipart upload '%s'", upload_id, exc_info=True)
+            raise
@@ -1,14 +1,128 @@
+import json
+import mimetypes
+import os
 import re
+import tarfile
+import zipfile
+from concurrent.futures import Executor
+from typing import BinaryIO, Iterable
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from app.core.config import (
+    PRESIGN_DEFAULT_EXPIRES,
+    PRESIGN_MAX_UPLOAD_SIZE,
+    S3_BATCH_UPLOAD_CONCURRENCY,
+    S3_DELETE_CONCURRENCY,
+    S3_DOWNLOAD_CHUNK_SIZE,
+    S3_FOLDER_COPY_CONCURRENCY,
+    S3_MULTIPART_CONCURRENCY,
+    S3_MULTIPART_COPY_CONCURRENCY,
+    S3_MULTIPART_COPY_PART_SIZE,
+    S3_MULTIPART_COPY_THRESHOLD,
+    S3_MULTIPART_PART_SIZE,
+    S3_MULTIPART_THRESHOLD,
+    UPLOAD_COMPRESSION_MIN_SIZE,
+    UPLOAD_COMPRESSION_RULES,
+    UPLOAD_DEDUP_CACHE_TTL,
+)
+from app.core.compression import UNCOMPRESSED_SIZE_METADATA_KEY, iter_decompressed, negotiate_download
+from app.core.enums import JobStatus
+from app.core.metadata_cache import MetadataCache
+from app.core.object_cache import CachedObject, ObjectCache
+from app.jobs.services.job_manager import Job, JobManager
+from app.s3_bucket.repositories.content_hash_repository import ContentHashRepository
 from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.batch_delete import MAX_REPORTED_ERRORS, BatchDeleter
+from app.s3_bucket.services.bucket_purge import BucketPurger
+from app.s3_bucket.services.batch_upload import BatchUploader, BatchUploadItem, iter_archive_members
+from app.s3_bucket.services.folder_transfer import FolderTransfer
+from app.s3_bucket.services.multipart_copy import MultipartCopier
+from app.s3_bucket.services.multipart_upload import MultipartUploader
+from app.s3_bucket.services.upload_compression import CompressedUploader, parse_compression_rules
+from app.s3_bucket.services.upload_dedup import UploadDeduplicator
+from app.utils.http_headers import content_disposition
 from app.utils.logging_config import get_logger
 from fastapi import HTTPException, UploadFile
+from fastapi.responses import Response, StreamingResponse
 from botocore.exceptions import ClientError
-from app.s3_bucket.schemas.s3_request_schema import CreateBucketRequest, CreateFolderRequest, DeleteFolderRequest
+from app.s3_bucket.schemas.s3_request_schema import (
+    CopyMoveFolderRequest,
+    CreateBucketRequest,
+    CreateFolderRequest,
+    DeleteFilesRequest,
+    DeleteFolderRequest,
+    PresignCompleteRequest,
+    PresignUploadRequest,
+    SyncFolderRequest,
+)
 
 class s3Service:
-    def __init__(self, s3_repository: s3Repository):
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        executor: Executor,
+        job_manager: JobManager,
+        content_hashes: ContentHashRepository,
+        hash_cache: MetadataCache | None = None,
+        object_cache: ObjectCache | None = None,
+    ):
         self.s3_repository = s3_repository
+        self.object_cache = object_cache
+        self.executor = executor
+        self.job_manager = job_manager
+        self.multipart_uploader = MultipartUploader(
+            s3_repository,
+            executor,
+            part_size=S3_MULTIPART_PART_SIZE,
+            concurrency=S3_MULTIPART_CONCURRENCY,
+        )
+        self.multipart_copier = MultipartCopier(
+            s3_repository,
+            executor,
+            part_size=S3_MULTIPART_COPY_PART_SIZE,
+            concurrency=S3_MULTIPART_COPY_CONCURRENCY,
+        )
+        self.batch_deleter = BatchDeleter(s3_repository, executor, concurrency=S3_DELETE_CONCURRENCY)
+        self.bucket_purger = BucketPurger(
+            s3_repository, self.batch_deleter, executor, concurrency=S3_DELETE_CONCURRENCY
+        )
+        self.batch_uploader = BatchUploader(
+            s3_repository,
+            self.multipart_uploader,
+            executor,
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            concurrency=S3_BATCH_UPLOAD_CONCURRENCY,
+        )
+        self.upload_compressor = CompressedUploader(
+            s3_repository,
+            self.multipart_uploader,
+            parse_compression_rules(UPLOAD_COMPRESSION_RULES),
+            min_size=UPLOAD_COMPRESSION_MIN_SIZE,
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+        )
+        self.upload_deduplicator = UploadDeduplicator(
+            s3_repository,
+            self.multipart_uploader,
+            self.multipart_copier,
+            content_hashes,
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_copy_threshold=S3_MULTIPART_COPY_THRESHOLD,
+            upload_compressor=self.upload_compressor,
+            cache=hash_cache,
+            cache_ttl=UPLOAD_DEDUP_CACHE_TTL,
+        )
+        self.folder_transfer = FolderTransfer(
+            s3_repository,
+            self.batch_deleter,
+            self._copy_object,
+            concurrency=S3_FOLDER_COPY_CONCURRENCY,
+        )
         self.logger = get_logger(__name__)
+        # Background operations are rebuilt from their stored params after a restart
+        job_manager.register("delete_folder", self._run_delete_folder_job)
+        job_manager.register("delete_bucket", self._run_delete_bucket_job)
+        for operation in ("copy_folder", "move_folder", "sync_folder"):
+            job_manager.register(operation, self._run_transfer_folder_job)
     
     # Validation
     def _validate_bucket_name(self, bucket_name: str):
@@ -25,6 +139,112 @@ class s3Service:
             return f"{folder_name.rstrip('/')}/{file_name}"
         return file_name
 
+    def _reject_compressed_folder(self, file_key: str, content_type: str | None, file_size: int | None):
+        # Presigned and session uploads are stored as sent, so they cannot
+        # honour a compression rule; without a size, assume it is large enough
+        file_size = file_size if file_size is not None else PRESIGN_MAX_UPLOAD_SIZE
+        if self.upload_compressor.rule_for(file_key, content_type, file_size) is not None:
+            raise HTTPException(409, "Uploads to this folder are compressed, upload the file through /s3/upload-file.")
+
+    def _get_upload_size(self, file: UploadFile) -> int:
+        if file.size is not None:
+            return file.size
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+        return size
+
+    def _parse_http_date(self, value: str | None):
+        # Invalid dates are ignored, as required for If-Modified-Since
+        if not value:
+            return None
+        try:
+            return parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _head_source(self, bucket_name: str, file_key: str):
+        # HEAD answers a bare 404 for a missing bucket and a missing key alike,
+        # where copy_object would have said NoSuchBucket
+        try:
+            return self.s3_repository.head_object(bucket_name, file_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "404":
+                raise
+            try:
+                self.s3_repository.head_bucket(bucket_name)
+            except ClientError as bucket_error:
+                if bucket_error.response["Error"]["Code"] in ("404", "NoSuchBucket"):
+                    raise ClientError(
+                        {"Error": {"Code": "NoSuchBucket", "Message": f"Bucket '{bucket_name}' does not exist"}},
+                        "HeadObject",
+                    ) from e
+            raise
+
+    def _copy_object(
+        self,
+        bucket_name: str,
+        source_key: str,
+        destination_key: str,
+        source_bucket: str | None = None,
+        source_size: int | None = None,
+    ):
+        # copy_object is a single serial operation capped at 5 GB, large
+        # objects are copied in parallel byte ranges instead. The HEAD is
+        # skipped when a listing already told us the object is small.
+        if source_size is None or source_size >= S3_MULTIPART_COPY_THRESHOLD:
+            source_head = self._head_source(source_bucket or bucket_name, source_key)
+            if source_head["ContentLength"] >= S3_MULTIPART_COPY_THRESHOLD:
+                return self.multipart_copier.copy(
+                    bucket_name, source_key, destination_key, source_head, source_bucket
+                )
+        return self.s3_repository.copy_file(
+            bucket_name=bucket_name,
+            source_key=source_key,
+            destination_key=destination_key,
+            source_bucket=source_bucket,
+        )
+
+    def _folder_prefix(self, folder_name: str | None):
+        if folder_name and folder_name.strip("/"):
+            return f"{folder_name.strip('/')}/"
+        return ""
+
+    def _serialize_object(self, obj):
+        return {
+            "key": obj["Key"],
+            "size": obj["Size"],
+            "etag": obj.get("ETag"),
+            "last_modified": obj["LastModified"].isoformat(),
+        }
+
+    def _serialize_page(self, page):
+        return {
+            "objects": [self._serialize_object(obj) for obj in page.get("Contents", [])],
+            "common_prefixes": [entry["Prefix"] for entry in page.get("CommonPrefixes", [])],
+            "is_truncated": page.get("IsTruncated", False),
+            "next_continuation_token": page.get("NextContinuationToken"),
+        }
+
+    def _iter_ndjson_pages(self, page, bucket_name: str, prefix: str, delimiter: str | None, page_size: int):
+        # Each page is emitted as soon as it arrives, as one chunk so it is one
+        # threadpool hop and one compression flush; only one page is held in memory
+        while True:
+            lines = [json.dumps(self._serialize_object(obj)) + "\n" for obj in page.get("Contents", [])]
+            lines.extend(json.dumps({"prefix": entry["Prefix"]}) + "\n" for entry in page.get("CommonPrefixes", []))
+            if lines:
+                yield "".join(lines)
+            if not page.get("IsTruncated"):
+                return
+            page = self.s3_repository.list_objects_page(
+                bucket_name, prefix, delimiter, page_size, page["NextContinuationToken"]
+            )
+
+    def _iter_body(self, body):
+        try:
+            yield from body.iter_chunks(S3_DOWNLOAD_CHUNK_SIZE)
+        finally:
+            body.close()
 
     # LIST BUCKETS
     def list_buckets(self):
@@ -34,22 +254,22 @@ class s3Service:
 
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
 
             if error_code == "AccessDenied":
-                self.logger.error(f"{error_code}: Access denied while listing S3 buckets.", exc_info=True)
+                self.logger.error("%s: Access denied while listing S3 buckets.", error_code)
                 raise HTTPException(
                     status_code=403,
                     detail="Access denied while listing S3 buckets."
                 )
-            self.logger.error(f"{error_code}: Failed to list S3 buckets.", exc_info=True)
+            self.logger.error("%s: Failed to list S3 buckets.", error_code)
             raise HTTPException(
                 status_code=500,
                 detail="Failed to list S3 buckets."
             )
 
         except Exception:
-            self.logger.error(f"Unexpected error while listing S3 buckets.", exc_info=True)
+            self.logger.error("Unexpected error while listing S3 buckets.", exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail="Unexpected error while listing S3 buckets."
@@ -59,7 +279,7 @@ class s3Service:
     # CREATE BUCKETS
     def create_bucket(self, request:CreateBucketRequest):
         try:
-            self.logger.info(f"Bucket Name {request.bucket_name} | Creating S3 Buckets")
+            self.logger.info("Bucket Name %s | Creating S3 Buckets", request.bucket_name)
             # Validation
             self._validate_bucket_name(bucket_name=request.bucket_name)
             
@@ -68,17 +288,17 @@ class s3Service:
             return self.s3_repository.create_bucket(request.bucket_name)
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
 
             if error_code == "BucketAlreadyExists":
-                self.logger.error(f"{error_code}: S3 Bucket already exists. Please choose a different name.", exc_info=True)
+                self.logger.error("%s: S3 Bucket already exists. Please choose a different name.", error_code)
                 raise HTTPException(
                     status_code=409,
                     detail="Bucket name already exists. Please choose a different name."
                 )
 
             if error_code == "BucketAlreadyOwnedByYou":
-                self.logger.error(f"{error_code}: Bucket already exists in your account.", exc_info=True)
+                self.logger.error("%s: Bucket already exists in your account.", error_code)
                 raise HTTPException(
                     status_code=409,
                     detail="Bucket already exists in your account."
@@ -91,24 +311,47 @@ class s3Service:
             )
             
     # DELETE BUCKET
-    def delete_bucket(self, bucket_name: str):
+    def _purge_and_delete_bucket(self, bucket_name: str, job: Job | None = None):
+        on_progress = None
+        if job:
+            # Purged entries drop out of the listings, so a resumed job lists again
+            processed_before, failed_before = job.processed, job.failed
+
+            def on_progress(processed: int, failed: int):
+                job.report_progress(processed_before + processed, failed_before + failed)
+
+        result = self.bucket_purger.purge(bucket_name, on_progress=on_progress)
+        if result["failed"]:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Bucket could not be emptied: {result['failed']} versions or uploads failed to delete.",
+            )
+        self.s3_repository.delete_bucket(bucket_name)
+        return result
+
+    def _run_delete_bucket_job(self, job: Job):
+        return self._purge_and_delete_bucket(job.params["bucket_name"], job)
+
+    def delete_bucket(self, bucket_name: str, force: bool = False, background: bool = False):
+        if force:
+            return self._force_delete_bucket(bucket_name, background)
         try:
             self.logger.info("Deleting Bucket")
             return self.s3_repository.delete_bucket(bucket_name)
 
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
 
             if error_code == "NoSuchBucket":
-                self.logger.error(f"{error_code}: Bucket does exists in your account.", exc_info=True)
+                self.logger.error("%s: Bucket does exists in your account.", error_code)
                 raise HTTPException(
                     status_code=404,
                     detail="Bucket does not exist in your account."
                 )
 
             if error_code == "BucketNotEmpty":
-                self.logger.error(f"{error_code}: Bucket is not empty. Delete contents first.", exc_info=True)
+                self.logger.error("%s: Bucket is not empty. Delete contents first.", error_code)
                 raise HTTPException(
                     status_code=409,
                     detail="Bucket is not empty. Delete contents first."
@@ -121,22 +364,47 @@ class s3Service:
             )
     
     
+    def _force_delete_bucket(self, bucket_name: str, background: bool):
+        self.logger.info("Force deleting bucket '%s'", bucket_name)
+        self._check_bucket_exists(bucket_name)
+        if background:
+            job = self.job_manager.submit("delete_bucket", {"bucket_name": bucket_name})
+            return {
+                "message": f"Emptying and deleting bucket '{bucket_name}' in the background.",
+                "job_id": job.job_id,
+            }
+        try:
+            result = self._purge_and_delete_bucket(bucket_name)
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist in your account.")
+            if error_code == "BucketNotEmpty":
+                raise HTTPException(409, "Bucket received new objects while it was being emptied.")
+            if error_code == "AccessDenied":
+                raise HTTPException(403, "Access denied while emptying bucket.")
+            raise HTTPException(500, "Failed to delete bucket.")
+        return {"message": f"Bucket '{bucket_name}' emptied and deleted.", **result}
+
     # CREATE FOLDER 
     def create_folder(self, request: CreateFolderRequest):
         try:
-            self.logger.info(f"Creating Folder with bucket {request.bucket_name} and folder {request.folder_name}")
+            self.logger.info(
+                "Creating Folder with bucket %s and folder %s", request.bucket_name, request.folder_name
+            )
             self.s3_repository.create_object(request.bucket_name, request.folder_name)
-            self.logger.info(f"Folder '{request.folder_name}' created in bucket '{request.bucket_name}")
+            self.logger.info("Folder '%s' created in bucket '%s'", request.folder_name, request.bucket_name)
             return {
                 "message": f"Folder '{request.folder_name}' created in bucket '{request.bucket_name}'."
             }
 
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
 
             if error_code == "NoSuchBucket":
-                self.logger.error(f"{error_code}: Bucket does not exists.", exc_info=True)
+                self.logger.error("%s: Bucket does not exists.", error_code)
                 raise HTTPException(
                     status_code=404,
                     detail="Bucket does not exist."
@@ -148,25 +416,68 @@ class s3Service:
                 detail="Failed to create folder."
             )
     
+    def _delete_prefix(self, bucket_name: str, folder_name: str, job: Job | None = None):
+        prefix = f"{folder_name.rstrip('/')}/"
+        on_progress = None
+        if job:
+            # Deleted keys drop out of the listing, so a resumed job simply
+            # lists again and adds to the counts it had already stored
+            deleted_before, failed_before = job.processed, job.failed
+
+            def on_progress(deleted: int, failed: int):
+                job.report_progress(deleted_before + deleted, failed_before + failed)
+
+        result = self.batch_deleter.delete_keys(
+            bucket_name,
+            self.s3_repository.iter_object_keys(bucket_name, prefix),
+            on_progress=on_progress,
+        )
+        if job:
+            result["deleted"] += deleted_before
+            result["failed"] += failed_before
+        return result
+
+    def _run_delete_folder_job(self, job: Job):
+        return self._delete_prefix(job.params["bucket_name"], job.params["folder_name"], job)
+
     def delete_folder(self, request:DeleteFolderRequest):
         try:
-            self.logger.info(f"Deleting Folder with bucket {request.bucket_name} and folder {request.folder_name}")
-            self.s3_repository.delete_object(request.bucket_name, request.folder_name)
-            self.logger.info(f"Deleted Folder with bucket {request.bucket_name} and folder {request.folder_name}")
+            self.logger.info(
+                "Deleting Folder with bucket %s and folder %s", request.bucket_name, request.folder_name
+            )
+            if request.background:
+                job = self.job_manager.submit(
+                    "delete_folder",
+                    {"bucket_name": request.bucket_name, "folder_name": request.folder_name},
+                )
+                return {
+                    "message": f"Deleting folder '{request.folder_name}' from bucket '{request.bucket_name}' in the background.",
+                    "job_id": job.job_id,
+                }
+
+            result = self._delete_prefix(request.bucket_name, request.folder_name)
+            self.logger.info(
+                "Deleted Folder with bucket %s and folder %s", request.bucket_name, request.folder_name
+            )
             return {
-                "message": f"Folder '{request.folder_name}' deleted from bucket '{request.bucket_name}'."
+                "message": f"Folder '{request.folder_name}' deleted from bucket '{request.bucket_name}'.",
+                **result,
             }
             
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
 
             if error_code == "NoSuchBucket":
-                self.logger.error(f"{error_code}: Bucket does not exists.", exc_info=True)
+                self.logger.error("%s: Bucket does not exists.", error_code)
                 raise HTTPException(
                     status_code=404,
                     detail="Bucket does not exist."
                 )
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to delete folder."
+            )
         except Exception as e:
             
             self.logger.error("Failed to delete folder")
@@ -176,39 +487,273 @@ class s3Service:
             )
 
     # Upload Files
-    def upload_file(self, bucket_name: str, file: UploadFile, folder_name: str | None):
+    def upload_file(self, bucket_name: str, file: UploadFile, folder_name: str | None, dedup: bool = False):
         try:
             filename = file.filename
-            self.logger.info(f"Uploading file '{filename}' to bucket '{bucket_name}'")
+            self.logger.info("Uploading file '%s' to bucket '%s'", filename, bucket_name)
             
             if folder_name:
                 folder_name = folder_name.rstrip("/")
                 file_key = f"{folder_name}/{filename}"
             else:
                 file_key = filename
-            # Read file content as bytes
-            file_content = file.file.read()
-            self.s3_repository.upload_file(bucket_name, str(file_key), file_content)
+            # Stream from the spooled upload file, small files keep the single PUT
+            file_size = self._get_upload_size(file)
+            rule = self.upload_compressor.rule_for(str(file_key), file.content_type, file_size)
+            if dedup:
+                result = self.upload_deduplicator.upload(
+                    bucket_name, str(file_key), file.file, file_size, file.content_type, rule
+                )
+                messages = {
+                    "unchanged": f"File '{filename}' is unchanged in bucket '{bucket_name}', upload skipped.",
+                    "copied": f"File '{filename}' copied to bucket '{bucket_name}' from an identical object.",
+                    "uploaded": f"File '{filename}' uploaded to bucket '{bucket_name}'.",
+                }
+                return {"message": messages[result["dedup"]], **result}
+            if rule is not None:
+                result = self.upload_compressor.upload(
+                    bucket_name, str(file_key), file.file, file_size, file.content_type, rule
+                )
+                self.logger.info("File '%s' uploaded successfully to bucket '%s'", filename, bucket_name)
+                return {"message": f"File '{filename}' uploaded to bucket '{bucket_name}'.", **result}
+            if file_size < S3_MULTIPART_THRESHOLD:
+                self.s3_repository.upload_file(bucket_name, str(file_key), file.file, file.content_type)
+            else:
+                self.multipart_uploader.upload(
+                    bucket_name, str(file_key), file.file, file_size, file.content_type
+                )
             
-            self.logger.info(f"File '{filename}' uploaded successfully to bucket '{bucket_name}'")
+            self.logger.info("File '%s' uploaded successfully to bucket '%s'", filename, bucket_name)
             return {"message": f"File '{filename}' uploaded to bucket '{bucket_name}'."}
         
         except ClientError as e:
             
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
             
             if error_code == "NoSuchBucket":
-                self.logger.error(f"{error_code}: Bucket does not exists.", exc_info=True)
+                self.logger.error("%s: Bucket does not exists.", error_code)
                 raise HTTPException(status_code=404, detail="Bucket does not exist.")
             
-            self.logger.error(f"{error_code}: Failed to upload file.", exc_info=True)
+            self.logger.error("%s: Failed to upload file.", error_code)
             raise HTTPException(status_code=500, detail="Failed to upload file.")
         
         except Exception:
             self.logger.error("Unexpected error while uploading file", exc_info=True)
             raise HTTPException(status_code=500, detail="Unexpected error while uploading file.")
     
+    # BATCH UPLOAD
+    def _check_bucket_exists(self, bucket_name: str):
+        # Fail the whole batch up front instead of once per file
+        try:
+            self.s3_repository.head_bucket(bucket_name)
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+            if error_code in ("404", "NoSuchBucket"):
+                raise HTTPException(status_code=404, detail="Bucket does not exist.")
+            if error_code in ("403", "AccessDenied"):
+                raise HTTPException(status_code=403, detail="Access denied to bucket.")
+            raise HTTPException(status_code=500, detail="Failed to access bucket.")
+
+    def upload_files(self, bucket_name: str, files: list[UploadFile], folder_name: str | None):
+        self.logger.info("Uploading %s files to bucket '%s'", len(files), bucket_name)
+        self._check_bucket_exists(bucket_name)
+        items = (
+            BatchUploadItem(
+                file.filename,
+                self._build_file_key(file.filename, folder_name),
+                file.file,
+                self._get_upload_size(file),
+                file.content_type,
+            )
+            for file in files
+        )
+        return self.batch_uploader.upload(bucket_name, items)
+
+    def upload_archive(self, bucket_name: str, archive: UploadFile, folder_name: str | None):
+        self.logger.info("Extracting archive '%s' into bucket '%s'", archive.filename, bucket_name)
+        self._check_bucket_exists(bucket_name)
+        items = (
+            BatchUploadItem(
+                name,
+                self._build_file_key(name, folder_name) if member else None,
+                member,
+                size,
+                mimetypes.guess_type(name)[0],
+            )
+            for name, member, size in iter_archive_members(archive.file)
+        )
+        try:
+            return self.batch_uploader.upload(bucket_name, items)
+        except (tarfile.TarError, zipfile.BadZipFile, EOFError):
+            self.logger.error("Could not read archive '%s'", archive.filename, exc_info=True)
+            raise HTTPException(status_code=400, detail="File is not a readable zip or tar archive.")
+
+    # LIST OBJECTS
+    def list_objects(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        delimiter: str | None = None,
+        page_size: int = 1000,
+        continuation_token: str | None = None,
+        stream: bool = False,
+    ):
+        try:
+            self.logger.info("Listing objects in bucket '%s' with prefix '%s'", bucket_name, prefix)
+            # The first page is fetched eagerly so errors still map to HTTP status codes
+            page = self.s3_repository.list_objects_page(
+                bucket_name, prefix, delimiter, page_size, continuation_token
+            )
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+
+            if error_code == "AccessDenied":
+                raise HTTPException(403, "Access denied while listing objects")
+
+            if error_code == "InvalidArgument":
+                raise HTTPException(400, "Invalid continuation token")
+
+            raise HTTPException(500, "Failed to list objects")
+
+        if stream:
+            return StreamingResponse(
+                self._iter_ndjson_pages(page, bucket_name, prefix, delimiter, page_size),
+                media_type="application/x-ndjson",
+            )
+        return self._serialize_page(page)
+
+    # Download File
+    def _download_headers(self, file_name: str, size: int, etag: str, last_modified) -> dict[str, str]:
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(size),
+            "ETag": etag,
+            "Content-Disposition": content_disposition(file_name),
+        }
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def _etag_matches(self, if_none_match: str, etag: str) -> bool:
+        candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    def _encoded_body(self, body, headers: dict[str, str], content_encoding, accept_encoding, uncompressed_size):
+        codec = negotiate_download(headers, content_encoding, accept_encoding, uncompressed_size)
+        return iter_decompressed(body, codec) if codec else body
+
+    def _cached_download(
+        self, entry: CachedObject, file_name: str, if_none_match: str | None, accept_encoding: str | None
+    ):
+        if if_none_match and self._etag_matches(if_none_match, entry.etag):
+            return Response(status_code=304, headers={"ETag": entry.etag})
+        body = self.object_cache.open(entry)
+        if body is None:
+            return None
+        headers = self._download_headers(file_name, entry.size, entry.etag, entry.last_modified)
+        body = self._encoded_body(body, headers, entry.content_encoding, accept_encoding, entry.uncompressed_size)
+        return StreamingResponse(body, media_type=entry.content_type, headers=headers)
+
+    def download_file(
+        self,
+        bucket_name: str,
+        file_name: str,
+        folder_name: str | None = None,
+        byte_range: str | None = None,
+        if_none_match: str | None = None,
+        if_modified_since: str | None = None,
+        accept_encoding: str | None = None,
+    ):
+        file_key = self._build_file_key(file_name, folder_name)
+        # Whole-object reads go through the object cache, ranges and date conditions straight to S3
+        cached = None
+        use_cache = self.object_cache is not None and byte_range is None and if_modified_since is None
+        if use_cache:
+            cached = self.object_cache.get(bucket_name, file_key)
+            if cached is not None and cached.fresh:
+                response = self._cached_download(cached, file_name, if_none_match, accept_encoding)
+                if response is not None:
+                    self.object_cache.record_hit(revalidated=False)
+                    return response
+                cached = None
+            generation = self.object_cache.generation(bucket_name)
+        try:
+            self.logger.info("Downloading file '%s' from bucket '%s'", file_key, bucket_name)
+            response = self.s3_repository.get_object(
+                bucket_name,
+                file_key,
+                byte_range=byte_range,
+                # A stale cached copy is revalidated on its ETag
+                if_none_match=cached.etag if cached is not None else if_none_match,
+                if_modified_since=self._parse_http_date(if_modified_since),
+            )
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            if error_code in ("304", "NotModified"):
+                if cached is not None:
+                    self.object_cache.refresh(cached)
+                    cached_response = self._cached_download(cached, file_name, if_none_match, accept_encoding)
+                    if cached_response is not None:
+                        self.object_cache.record_hit(revalidated=True)
+                        return cached_response
+                    # Evicted meanwhile, read it again without the condition
+                    return self.download_file(
+                        bucket_name, file_name, folder_name, None, if_none_match, None, accept_encoding
+                    )
+                headers = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+                not_modified_headers = {"ETag": headers["etag"]} if "etag" in headers else {}
+                return Response(status_code=304, headers=not_modified_headers)
+
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+
+            if error_code == "NoSuchKey":
+                if cached is not None:
+                    self.object_cache.invalidate(bucket_name, [file_key])
+                raise HTTPException(404, "File does not exist")
+
+            if error_code == "InvalidRange":
+                raise HTTPException(416, "Requested range not satisfiable")
+
+            raise HTTPException(500, "Failed to download file")
+
+        if cached is not None and if_none_match and self._etag_matches(if_none_match, response["ETag"]):
+            # Changed since it was cached, but the client already holds the new version
+            response["Body"].close()
+            return Response(status_code=304, headers={"ETag": response["ETag"]})
+
+        headers = self._download_headers(
+            file_name, response["ContentLength"], response["ETag"], response.get("LastModified")
+        )
+        if "ContentRange" in response:
+            headers["Content-Range"] = response["ContentRange"]
+
+        body = self._iter_body(response["Body"])
+        if use_cache:
+            self.object_cache.record_miss()
+            body = self.object_cache.fill(bucket_name, file_key, response, body, generation)
+        # The cache keeps the stored bytes, decompression happens on the way out
+        body = self._encoded_body(
+            body,
+            headers,
+            response.get("ContentEncoding"),
+            accept_encoding,
+            response.get("Metadata", {}).get(UNCOMPRESSED_SIZE_METADATA_KEY),
+        )
+        return StreamingResponse(
+            body,
+            status_code=206 if "ContentRange" in response else 200,
+            media_type=response.get("ContentType", "application/octet-stream"),
+            headers=headers,
+        )
+
     def delete_file(self, bucket_name: str, file_name: str, folder_name: str | None = None):
         try:
             if folder_name:
@@ -218,7 +763,7 @@ class s3Service:
                 file_key = file_name
 
             self.logger.info(
-                f"Deleting file '{file_key}' from bucket '{bucket_name}'"
+                "Deleting file '%s' from bucket '%s'", file_key, bucket_name
             )
 
             self.s3_repository.delete_file(bucket_name, file_key)
@@ -229,18 +774,90 @@ class s3Service:
 
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
             if error_code == "NoSuchBucket":
-                self.logger.error(f"{error_code}: Bucket does not exists.", exc_info=True)
+                self.logger.error("%s: Bucket does not exists.", error_code)
                 raise HTTPException(404, "Bucket does not exist")
 
             if error_code == "NoSuchKey":
-                self.logger.error(f"{error_code}: File does not exists.", exc_info=True)
+                self.logger.error("%s: File does not exists.", error_code)
                 raise HTTPException(404, "File does not exist")
 
-            self.logger.error(f"{error_code}: Failed to delete the file.", exc_info=True)
+            self.logger.error("%s: Failed to delete the file.", error_code)
             raise HTTPException(500, "Failed to delete file")
 
+    # BULK DELETE
+    def _parse_delete_line(self, line: bytes) -> str | None:
+        # An NDJSON line is a key string, {"key": ...} or {"file_name": ..., "folder_name": ...}
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+        if isinstance(entry, str):
+            return entry or None
+        if not isinstance(entry, dict):
+            return None
+        if isinstance(entry.get("key"), str):
+            return entry["key"] or None
+        file_name, folder_name = entry.get("file_name"), entry.get("folder_name")
+        if isinstance(file_name, str) and file_name:
+            return self._build_file_key(file_name, folder_name if isinstance(folder_name, str) else None)
+        return None
+
+    def _reject_invalid(self, invalid: dict, position: int):
+        # position is 1-based: the line number for NDJSON, the list index otherwise
+        invalid["count"] += 1
+        if len(invalid["errors"]) < MAX_REPORTED_ERRORS:
+            invalid["errors"].append(
+                {"position": position, "code": "InvalidEntry", "message": "Expected a key or a file_name entry."}
+            )
+
+    def _delete_key_list(self, bucket_name: str, keys: Iterable[str], invalid: dict):
+        self._check_bucket_exists(bucket_name)
+        try:
+            result = self.batch_deleter.delete_keys(bucket_name, keys, max_errors=None)
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(status_code=404, detail="Bucket does not exist.")
+            if error_code == "AccessDenied":
+                raise HTTPException(status_code=403, detail="Access denied to bucket.")
+            raise HTTPException(status_code=500, detail="Failed to delete files.")
+        result["invalid"] = invalid["count"]
+        result["errors"].extend(invalid["errors"])
+        return result
+
+    def delete_files(self, bucket_name: str, request: DeleteFilesRequest):
+        keys = request.keys + [self._build_file_key(f.file_name, f.folder_name) for f in request.files]
+        self.logger.info("Deleting %s files from bucket '%s'", len(keys), bucket_name)
+        invalid = {"count": 0, "errors": []}
+        valid_keys = []
+        for position, key in enumerate(keys, 1):
+            if key:
+                valid_keys.append(key)
+            else:
+                self._reject_invalid(invalid, position)
+        return self._delete_key_list(bucket_name, valid_keys, invalid)
+
+    def delete_files_ndjson(self, bucket_name: str, body: BinaryIO):
+        # Keys are read lazily from the spooled body, so the list never has to fit in memory
+        self.logger.info("Deleting streamed key list from bucket '%s'", bucket_name)
+        invalid = {"count": 0, "errors": []}
+
+        def iter_keys():
+            for line_number, line in enumerate(body, 1):
+                if not line.strip():
+                    continue
+                key = self._parse_delete_line(line)
+                if key is None:
+                    self._reject_invalid(invalid, line_number)
+                    continue
+                yield key
+
+        return self._delete_key_list(bucket_name, iter_keys(), invalid)
+
+    # COPY FILE
     def copy_file(
     self,
     bucket_name: str,
@@ -253,14 +870,10 @@ class s3Service:
             destination_key = self._build_file_key(file_name, destination_folder)
 
             self.logger.info(
-                f"Copying file from '{source_key}' to '{destination_key}' in bucket '{bucket_name}'"
+                "Copying file from '%s' to '%s' in bucket '%s'", source_key, destination_key, bucket_name
             )
 
-            self.s3_repository.copy_file(
-                bucket_name=bucket_name,
-                source_key=source_key,
-                destination_key=destination_key,
-            )
+            self._copy_object(bucket_name, source_key, destination_key)
 
             return {
                 "message": "File copied successfully",
@@ -270,12 +883,13 @@ class s3Service:
 
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
 
             if error_code == "NoSuchBucket":
                 raise HTTPException(404, "Bucket does not exist")
 
-            if error_code == "NoSuchKey":
+            # HEAD reports a missing key as a bare 404
+            if error_code in ("NoSuchKey", "404"):
                 raise HTTPException(404, "Source file does not exist")
 
             raise HTTPException(500, "Failed to copy file")
@@ -292,15 +906,11 @@ class s3Service:
             destination_key = self._build_file_key(file_name, destination_folder)
 
             self.logger.info(
-                f"Moving file from '{source_key}' to '{destination_key}' in bucket '{bucket_name}'"
+                "Moving file from '%s' to '%s' in bucket '%s'", source_key, destination_key, bucket_name
             )
 
             # Step 1: Copy
-            self.s3_repository.copy_file(
-                bucket_name=bucket_name,
-                source_key=source_key,
-                destination_key=destination_key,
-            )
+            self._copy_object(bucket_name, source_key, destination_key)
 
             # Step 2: Delete original (ONLY after successful copy)
             self.s3_repository.delete_file(bucket_name, source_key)
@@ -313,12 +923,181 @@ class s3Service:
 
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
-            self.logger.error(f"Error Code: {error_code}", exc_info=True)
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
 
             if error_code == "NoSuchBucket":
                 raise HTTPException(404, "Bucket does not exist")
 
-            if error_code == "NoSuchKey":
+            if error_code in ("NoSuchKey", "404"):
                 raise HTTPException(404, "Source file does not exist")
 
             raise HTTPException(500, "Failed to move file")
+
+    # COPY / MOVE / SYNC FOLDER
+    def _transfer_folder(
+        self,
+        operation: str,
+        request: CopyMoveFolderRequest,
+        delete_source: bool = False,
+        delete_removed: bool = False,
+    ):
+        source_prefix = self._folder_prefix(request.source_folder)
+        destination_bucket = request.destination_bucket or request.bucket_name
+        destination_prefix = self._folder_prefix(request.destination_folder)
+
+        if not source_prefix:
+            raise HTTPException(400, "Source folder is required.")
+
+        # A listing that sees its own copies would never finish
+        if destination_bucket == request.bucket_name and (
+            destination_prefix.startswith(source_prefix) or source_prefix.startswith(destination_prefix)
+        ):
+            raise HTTPException(400, "Source and destination folders must not overlap.")
+
+        params = {
+            "source_bucket": request.bucket_name,
+            "source_prefix": source_prefix,
+            "destination_bucket": destination_bucket,
+            "destination_prefix": destination_prefix,
+            "skip_unchanged": request.skip_unchanged,
+            "delete_source": delete_source,
+            "delete_removed": delete_removed,
+        }
+
+        try:
+            self.logger.info(
+                "%s: '%s/%s' to '%s/%s'",
+                operation, request.bucket_name, source_prefix, destination_bucket, destination_prefix
+            )
+            if request.background:
+                job = self.job_manager.submit(operation, params)
+                return {
+                    "message": f"Running {operation} for folder '{request.source_folder}' in the background.",
+                    "job_id": job.job_id,
+                }
+
+            return {
+                "message": f"Folder '{request.source_folder}' processed successfully.",
+                "source_prefix": source_prefix,
+                "destination_bucket": destination_bucket,
+                "destination_prefix": destination_prefix,
+                **self.folder_transfer.run(**params),
+            }
+
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+
+            raise HTTPException(500, f"Failed to run {operation}")
+
+    def _count_objects_in_background(self, job: Job, bucket_name: str, prefix: str, already_processed: int):
+        # Listing is far cheaper than copying, so the total (and with it the
+        # ETA) is usually known long before the job finishes. Runs on the
+        # transfer pool and gives up once the job is cancelled or done
+        def count():
+            total = already_processed
+            try:
+                for _ in self.s3_repository.iter_object_keys(bucket_name, prefix):
+                    if job.stopped or job.status != JobStatus.running:
+                        return
+                    total += 1
+            except Exception:
+                self.logger.warning("Could not count the objects of job '%s'", job.job_id, exc_info=True)
+                return
+            job.set_total(total)
+
+        return self.executor.submit(count)
+
+    def _run_transfer_folder_job(self, job: Job):
+        params = job.params
+        # A move deletes finished sources as it goes, so only the rest are listed
+        self._count_objects_in_background(
+            job,
+            params["source_bucket"],
+            params["source_prefix"],
+            job.processed if params["delete_source"] else 0,
+        )
+        return self.folder_transfer.run(
+            **params,
+            on_progress=job.report_progress,
+            checkpoint=job.checkpoint,
+            on_checkpoint=job.save_checkpoint,
+        )
+
+    def copy_folder(self, request: CopyMoveFolderRequest):
+        return self._transfer_folder("copy_folder", request)
+
+    def move_folder(self, request: CopyMoveFolderRequest):
+        return self._transfer_folder("move_folder", request, delete_source=True)
+
+    def sync_folder(self, request: SyncFolderRequest):
+        return self._transfer_folder("sync_folder", request, delete_removed=request.delete_removed)
+
+    # PRESIGNED URLS
+    def presign_upload(self, request: PresignUploadRequest):
+        if request.file_size is not None and request.file_size > PRESIGN_MAX_UPLOAD_SIZE:
+            raise HTTPException(400, f"File is larger than the {PRESIGN_MAX_UPLOAD_SIZE} byte upload limit.")
+
+        file_key = self._build_file_key(request.file_name, request.folder_name)
+        self._reject_compressed_folder(file_key, request.content_type, request.file_size)
+        expires_in = request.expires_in or PRESIGN_DEFAULT_EXPIRES
+        params = {"Bucket": request.bucket_name, "Key": file_key}
+        # SigV4 signs these headers (X-Amz-SignedHeaders), so S3 rejects a PUT
+        # whose Content-Type or Content-Length differ from the request
+        headers = {}
+        if request.content_type:
+            params["ContentType"] = request.content_type
+            headers["Content-Type"] = request.content_type
+        if request.file_size is not None:
+            params["ContentLength"] = request.file_size
+            headers["Content-Length"] = str(request.file_size)
+
+        self.logger.info("Presigning upload of '%s' to bucket '%s'", file_key, request.bucket_name)
+        return {
+            "method": "PUT",
+            "url": self.s3_repository.generate_presigned_url("put_object", params, expires_in),
+            "headers": headers,
+            "file_key": file_key,
+            "expires_in": expires_in,
+        }
+
+    def complete_presigned_upload(self, request: PresignCompleteRequest):
+        # Runs the write hooks upload_file would have (listing cache, object
+        # cache, dedup hashes, metadata index) for a file PUT straight to S3
+        try:
+            head = self.s3_repository.confirm_upload(request.bucket_name, request.file_key)
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+            if error_code in ("404", "NoSuchKey", "NoSuchBucket"):
+                raise HTTPException(404, "Uploaded file does not exist.")
+            raise HTTPException(500, "Failed to confirm upload.")
+        self.logger.info("Confirmed presigned upload of '%s' to bucket '%s'", request.file_key, request.bucket_name)
+        return {
+            "message": f"File '{request.file_key}' uploaded to bucket '{request.bucket_name}'.",
+            "file_key": request.file_key,
+            "size": head["ContentLength"],
+            "etag": head["ETag"],
+        }
+
+    def presign_download(
+        self,
+        bucket_name: str,
+        file_name: str,
+        folder_name: str | None = None,
+        expires_in: int | None = None,
+    ):
+        file_key = self._build_file_key(file_name, folder_name)
+        expires_in = expires_in or PRESIGN_DEFAULT_EXPIRES
+        self.logger.info("Presigning download of '%s' from bucket '%s'", file_key, bucket_name)
+        return {
+            "method": "GET",
+            "url": self.s3_repository.generate_presigned_url(
+                "get_object", {"Bucket": bucket_name, "Key": file_key}, expires_in
+            ),
+            "file_key": file_key,
+            "expires_in": expires_in,
+        }
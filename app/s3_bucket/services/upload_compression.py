@@ -0,0 +1,168 @@
+import mimetypes
+from typing import Any, BinaryIO, NamedTuple
+
+from app.core.compression import UNCOMPRESSED_SIZE_METADATA_KEY, compressor, require_codec
+from app.core.metrics import REGISTRY, Counter
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.multipart_upload import MultipartUploader
+from app.utils.logging_config import get_logger
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "application/x-yaml",
+    "application/yaml",
+    "application/sql",
+    "application/csv",
+    "image/svg+xml",
+)
+# Text formats mimetypes does not know
+COMPRESSIBLE_EXTENSIONS = (".ndjson", ".jsonl", ".log", ".yaml", ".yml", ".tsv", ".sql", ".md")
+READ_CHUNK_SIZE = 1024 * 1024
+# Stored uncompressed when compression saves less than this share of the bytes
+MIN_SAVING = 0.1
+
+UPLOAD_COMPRESSION_BYTES = REGISTRY.register(
+    Counter("upload_compression_bytes_total", "Bytes of compressed uploads, before and after.", ("codec", "stage"))
+)
+
+
+class CompressionRule(NamedTuple):
+    prefix: str
+    codec: str
+    level: int | None
+
+
+def parse_compression_rules(value: str) -> list[CompressionRule]:
+    # "logs/=gzip,exports/=zstd:10": key prefix, codec and optional level;
+    # the longest matching prefix wins
+    rules = []
+    for item in filter(None, (item.strip() for item in value.split(","))):
+        prefix, separator, setting = item.rpartition("=")
+        if not separator:
+            raise ValueError(f"Compression rule '{item}' must look like <prefix>=<codec>[:<level>]")
+        codec, _, level = setting.strip().partition(":")
+        require_codec(codec)
+        rules.append(CompressionRule(prefix.strip(), codec, int(level) if level else None))
+    return sorted(rules, key=lambda rule: len(rule.prefix), reverse=True)
+
+
+def is_compressible(file_key: str, content_type: str | None) -> bool:
+    # Clients often send text files as application/octet-stream, so fall back to the name
+    if not content_type or content_type == "application/octet-stream":
+        if file_key.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            return True
+        content_type = mimetypes.guess_type(file_key)[0] or ""
+    content_type = content_type.partition(";")[0].strip().lower()
+    return (
+        content_type.startswith("text/")
+        or content_type in COMPRESSIBLE_TYPES
+        or content_type.endswith(("+json", "+xml"))
+    )
+
+
+class CompressingReader:
+    # File object whose read(n) returns the next n bytes of the compressed
+    # stream, compressing the source a chunk at a time as they are asked for
+    def __init__(self, fileobj: BinaryIO, codec: str, level: int | None = None):
+        self.fileobj = fileobj
+        self.raw_size = 0
+        self.compressed_size = 0
+        self._encoder = compressor(codec, level)
+        self._buffer = bytearray()
+        self._finished = False
+
+    def fill(self, size: int) -> bool:
+        # Compresses until size bytes are buffered; True when that is the whole stream
+        while len(self._buffer) < size and not self._finished:
+            chunk = self.fileobj.read(READ_CHUNK_SIZE)
+            if chunk:
+                self.raw_size += len(chunk)
+                self._buffer += self._encoder.compress(chunk)
+            else:
+                self._buffer += self._encoder.flush()
+                self._finished = True
+        return self._finished and len(self._buffer) < size
+
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            while not self._finished:
+                self.fill(len(self._buffer) + READ_CHUNK_SIZE)
+            size = len(self._buffer)
+        else:
+            self.fill(size)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.compressed_size += len(data)
+        return data
+
+
+class CompressedUploader:
+    # Stores uploads under folders with a compression rule compressed, with the
+    # codec as the object's Content-Encoding and the original size in its
+    # metadata. The compressed stream is buffered up to multipart_threshold:
+    # if it ends within that it is one PUT, otherwise it continues as a
+    # multipart upload of unknown size, so memory stays bounded. Content that
+    # does not compress by MIN_SAVING in that first stretch is stored as is.
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        multipart_uploader: MultipartUploader,
+        rules: list[CompressionRule],
+        min_size: int,
+        multipart_threshold: int,
+    ):
+        self.s3_repository = s3_repository
+        self.multipart_uploader = multipart_uploader
+        self.rules = rules
+        self.min_size = min_size
+        self.multipart_threshold = multipart_threshold
+        self.logger = get_logger(__name__)
+
+    def rule_for(self, file_key: str, content_type: str | None, file_size: int) -> CompressionRule | None:
+        if file_size < self.min_size or not is_compressible(file_key, content_type):
+            return None
+        return next((rule for rule in self.rules if file_key.startswith(rule.prefix)), None)
+
+    def upload(
+        self,
+        bucket_name: str,
+        file_key: str,
+        fileobj: BinaryIO,
+        file_size: int,
+        content_type: str | None,
+        rule: CompressionRule,
+        metadata: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        reader = CompressingReader(fileobj, rule.codec, rule.level)
+        complete = reader.fill(self.multipart_threshold)
+        if reader.buffered() > reader.raw_size * (1 - MIN_SAVING):
+            self.logger.info("'%s' does not compress with %s, storing it uncompressed", file_key, rule.codec)
+            fileobj.seek(0)
+            if file_size < self.multipart_threshold:
+                self.s3_repository.upload_file(bucket_name, file_key, fileobj, content_type, metadata)
+            else:
+                self.multipart_uploader.upload(bucket_name, file_key, fileobj, file_size, content_type, metadata)
+            return {"compression": None, "size": file_size, "stored_size": file_size}
+
+        metadata = {**(metadata or {}), UNCOMPRESSED_SIZE_METADATA_KEY: str(file_size)}
+        if complete:
+            self.s3_repository.upload_file(
+                bucket_name, file_key, reader.read(), content_type, metadata, content_encoding=rule.codec
+            )
+        else:
+            self.multipart_uploader.upload(
+                bucket_name, file_key, reader, None, content_type, metadata, content_encoding=rule.codec
+            )
+        UPLOAD_COMPRESSION_BYTES.inc(reader.raw_size, codec=rule.codec, stage="raw")
+        UPLOAD_COMPRESSION_BYTES.inc(reader.compressed_size, codec=rule.codec, stage="stored")
+        self.logger.info(
+            "Stored '%s' with %s: %s bytes as %s",
+            file_key, rule.codec, reader.raw_size, reader.compressed_size
+        )
+        return {"compression": rule.codec, "size": reader.raw_size, "stored_size": reader.compressed_size}
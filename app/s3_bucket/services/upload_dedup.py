@@ -0,0 +1,265 @@
+import hashlib
+import threading
+from typing import Any, BinaryIO, NamedTuple
+
+from botocore.exceptions import ClientError
+
+from app.core.compression import UNCOMPRESSED_SIZE_METADATA_KEY
+from app.core.metadata_cache import MetadataCache
+from app.s3_bucket.repositories.content_hash_repository import ContentHashRepository
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.multipart_copy import MultipartCopier
+from app.s3_bucket.services.multipart_upload import MultipartUploader
+from app.s3_bucket.services.upload_compression import CompressedUploader, CompressionRule
+from app.utils.logging_config import get_logger
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# User metadata key (x-amz-meta-sha256) written by deduplicated uploads
+SHA256_METADATA_KEY = "sha256"
+
+
+class ContentHashes(NamedTuple):
+    sha256: str
+    # The ETag S3 will report for this upload: the MD5, or for a multipart
+    # upload the MD5 of the part MD5s followed by "-<parts>"
+    etag: str
+    size: int
+
+
+def hash_stream(fileobj: BinaryIO, part_size: int | None = None) -> ContentHashes:
+    # One chunked pass computing SHA-256 and the S3 ETag together
+    sha256 = hashlib.sha256()
+    part_md5 = hashlib.md5()
+    part_digests = []
+    part_remaining = part_size
+    size = 0
+    while chunk := fileobj.read(min(HASH_CHUNK_SIZE, part_remaining) if part_size else HASH_CHUNK_SIZE):
+        sha256.update(chunk)
+        part_md5.update(chunk)
+        size += len(chunk)
+        if part_size:
+            part_remaining -= len(chunk)
+            if not part_remaining:
+                part_digests.append(part_md5.digest())
+                part_md5 = hashlib.md5()
+                part_remaining = part_size
+    if part_size is None:
+        return ContentHashes(sha256.hexdigest(), f'"{part_md5.hexdigest()}"', size)
+    if part_remaining != part_size or not part_digests:
+        part_digests.append(part_md5.digest())
+    etag = f'"{hashlib.md5(b"".join(part_digests)).hexdigest()}-{len(part_digests)}"'
+    return ContentHashes(sha256.hexdigest(), etag, size)
+
+
+class UploadDeduplicator:
+    # Uploads a file only when its bytes are not already in S3. The content is
+    # hashed first; an object already holding the same bytes at the key (same
+    # SHA-256 metadata or same ETag) is left alone, and bytes recorded under
+    # another key are copied server side. What a key holds is remembered in
+    # the metadata cache, so a repeated upload does not even need the HEAD.
+    # Under a compression rule the SHA-256 is of the original bytes and the
+    # file is stored compressed; such uploads are never copied from or to,
+    # since a copy would take the source's encoding instead of the rule's.
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        multipart_uploader: MultipartUploader,
+        multipart_copier: MultipartCopier,
+        content_hashes: ContentHashRepository,
+        multipart_threshold: int,
+        multipart_copy_threshold: int,
+        upload_compressor: CompressedUploader | None = None,
+        cache: MetadataCache | None = None,
+        cache_ttl: float = 60,
+    ):
+        self.s3_repository = s3_repository
+        self.multipart_uploader = multipart_uploader
+        self.multipart_copier = multipart_copier
+        self.content_hashes = content_hashes
+        self.multipart_threshold = multipart_threshold
+        self.multipart_copy_threshold = multipart_copy_threshold
+        self.upload_compressor = upload_compressor
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self._counters = {
+            "uploads": 0,
+            "unchanged": 0,
+            "copied": 0,
+            "uploaded": 0,
+            "bytes_saved": 0,
+            "head_requests_saved": 0,
+        }
+        self._lock = threading.Lock()
+        self.logger = get_logger(__name__)
+
+    def _count(self, outcome: str, bytes_saved: int = 0, head_saved: bool = False):
+        with self._lock:
+            self._counters["uploads"] += 1
+            self._counters[outcome] += 1
+            self._counters["bytes_saved"] += bytes_saved
+            self._counters["head_requests_saved"] += head_saved
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    # What the key holds now, from the cache or a HEAD
+    def _head(self, bucket_name: str, file_key: str) -> dict[str, Any] | None:
+        try:
+            head = self.s3_repository.head_object(bucket_name, file_key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return None
+            raise
+        metadata = head.get("Metadata", {})
+        return {
+            "etag": head["ETag"],
+            "sha256": metadata.get(SHA256_METADATA_KEY),
+            # Compressed objects are compared by their original size
+            "size": int(metadata.get(UNCOMPRESSED_SIZE_METADATA_KEY, head["ContentLength"])),
+            "content_encoding": head.get("ContentEncoding"),
+        }
+
+    def _existing(self, bucket_name: str, file_key: str) -> tuple[dict[str, Any] | None, bool]:
+        if self.cache is None:
+            return self._head(bucket_name, file_key), False
+        loaded = []
+
+        def load():
+            loaded.append(True)
+            return self._head(bucket_name, file_key)
+
+        existing = self.cache.get_or_load(("content_hash", bucket_name, file_key), load, self.cache_ttl)
+        return existing, not loaded
+
+    def _remember(self, bucket_name: str, file_key: str, hashes: ContentHashes, etag: str):
+        self.content_hashes.record(bucket_name, file_key, hashes.sha256, hashes.size, etag)
+        if self.cache is not None:
+            # The write just dropped the key's entry, store what it holds now
+            known = {"etag": etag, "sha256": hashes.sha256, "size": hashes.size, "content_encoding": None}
+            self.cache.get_or_load(("content_hash", bucket_name, file_key), lambda: known, self.cache_ttl)
+
+    def _drop_stale(self, source: dict[str, Any]):
+        self.logger.info("Dropping stale content hash of '%s/%s'", source["bucket_name"], source["file_key"])
+        self.content_hashes.delete(source["bucket_name"], source["file_key"])
+
+    def _copy_from(
+        self,
+        bucket_name: str,
+        file_key: str,
+        source: dict[str, Any],
+        metadata: dict[str, str],
+        content_type: str | None,
+    ) -> str | None:
+        # Returns the new ETag, or None when the source no longer holds the recorded bytes
+        if source["size"] >= self.multipart_copy_threshold:
+            source_head = self.s3_repository.head_object(source["bucket_name"], source["file_key"])
+            if source_head["ETag"] != source["etag"]:
+                return None
+            if content_type:
+                source_head["ContentType"] = content_type
+            source_head["Metadata"] = {**source_head.get("Metadata", {}), **metadata}
+            response = self.multipart_copier.copy(
+                bucket_name, source["file_key"], file_key, source_head, source["bucket_name"]
+            )
+            return response["ETag"]
+
+        extra_args = {"ContentType": content_type} if content_type else {}
+        try:
+            response = self.s3_repository.copy_file(
+                bucket_name,
+                source["file_key"],
+                file_key,
+                source["bucket_name"],
+                CopySourceIfMatch=source["etag"],
+                MetadataDirective="REPLACE",
+                Metadata=metadata,
+                **extra_args,
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("PreconditionFailed", "412"):
+                return None
+            raise
+        return response["CopyObjectResult"]["ETag"]
+
+    def _copy_duplicate(
+        self,
+        bucket_name: str,
+        file_key: str,
+        hashes: ContentHashes,
+        content_type: str | None,
+    ) -> tuple[dict[str, Any], str] | None:
+        metadata = {SHA256_METADATA_KEY: hashes.sha256}
+        for source in self.content_hashes.find_copies(hashes.sha256, hashes.size, bucket_name):
+            if (source["bucket_name"], source["file_key"]) == (bucket_name, file_key):
+                continue
+            try:
+                etag = self._copy_from(bucket_name, file_key, source, metadata, content_type)
+            except ClientError as e:
+                error_code = e.response["Error"]["Code"]
+                if error_code in ("NoSuchKey", "404"):
+                    self._drop_stale(source)
+                    continue
+                if error_code in ("AccessDenied", "403"):
+                    continue
+                raise
+            if etag is None:
+                self._drop_stale(source)
+                continue
+            return source, etag
+        return None
+
+    def upload(
+        self,
+        bucket_name: str,
+        file_key: str,
+        fileobj: BinaryIO,
+        file_size: int,
+        content_type: str | None = None,
+        rule: CompressionRule | None = None,
+    ) -> dict[str, Any]:
+        multipart = file_size >= self.multipart_threshold
+        start = fileobj.tell()
+        hashes = hash_stream(fileobj, self.multipart_uploader.part_size_for(file_size) if multipart else None)
+        fileobj.seek(start)
+
+        existing, head_saved = self._existing(bucket_name, file_key)
+        if (
+            existing is not None
+            and existing["size"] == hashes.size
+            and (existing["sha256"] == hashes.sha256 or existing["etag"] == hashes.etag)
+        ):
+            if not existing.get("content_encoding"):
+                self.content_hashes.record(bucket_name, file_key, hashes.sha256, hashes.size, existing["etag"])
+            self._count("unchanged", hashes.size, head_saved)
+            self.logger.info("'%s' in bucket '%s' is unchanged, upload skipped", file_key, bucket_name)
+            return {"dedup": "unchanged", "sha256": hashes.sha256, "bytes_saved": hashes.size}
+
+        if rule is not None:
+            result = self.upload_compressor.upload(
+                bucket_name, file_key, fileobj, file_size, content_type, rule, {SHA256_METADATA_KEY: hashes.sha256}
+            )
+            self._count("uploaded", 0, head_saved)
+            return {"dedup": "uploaded", "sha256": hashes.sha256, "bytes_saved": 0, **result}
+
+        copied = self._copy_duplicate(bucket_name, file_key, hashes, content_type)
+        if copied is not None:
+            source, etag = copied
+            self._remember(bucket_name, file_key, hashes, etag)
+            self._count("copied", hashes.size, head_saved)
+            copied_from = f"{source['bucket_name']}/{source['file_key']}"
+            self.logger.info(
+                "'%s' in bucket '%s' copied from duplicate '%s'", file_key, bucket_name, copied_from
+            )
+            return {"dedup": "copied", "sha256": hashes.sha256, "bytes_saved": hashes.size, "copied_from": copied_from}
+
+        metadata = {SHA256_METADATA_KEY: hashes.sha256}
+        if multipart:
+            response = self.multipart_uploader.upload(
+                bucket_name, file_key, fileobj, file_size, content_type, metadata
+            )
+        else:
+            response = self.s3_repository.upload_file(bucket_name, file_key, fileobj, content_type, metadata)
+        self._remember(bucket_name, file_key, hashes, response["ETag"])
+        self._count("uploaded", 0, head_saved)
+        return {"dedup": "uploaded", "sha256": hashes.sha256, "bytes_saved": 0}
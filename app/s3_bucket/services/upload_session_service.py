@@ -0,0 +1,161 @@
+import math
+import uuid
+from typing import BinaryIO
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from app.core.config import PRESIGN_DEFAULT_EXPIRES, S3_MULTIPART_PART_SIZE
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.repositories.upload_session_repository import UploadSessionRepository
+from app.s3_bucket.schemas.s3_request_schema import CreateUploadSessionRequest
+from app.s3_bucket.services.multipart_upload import MAX_PARTS, MIN_PART_SIZE
+from app.s3_bucket.services.s3_service import s3Service
+from app.utils.logging_config import get_logger
+
+
+class UploadSessionService:
+    # Client-driven multipart uploads: parts are PUT individually, in any
+    # order and in parallel, and the session can be resumed after a failure
+    # or a restart of this process.
+    def __init__(
+        self,
+        s3_repository: s3Repository,
+        session_repository: UploadSessionRepository,
+        s3_service: s3Service,
+    ):
+        self.s3_repository = s3_repository
+        self.session_repository = session_repository
+        self.s3_service = s3_service
+        self.logger = get_logger(__name__)
+
+    def _get_session(self, session_id: str):
+        session = self.session_repository.get_session(session_id)
+        if session is None:
+            raise HTTPException(404, "Upload session does not exist")
+        return session
+
+    def _handle_client_error(self, e: ClientError, session_id: str, action: str):
+        error_code = e.response["Error"]["Code"]
+        self.logger.error("Error Code: %s", error_code, exc_info=True)
+
+        if error_code == "NoSuchUpload":
+            # Aborted or expired on the S3 side, the session cannot be resumed
+            self.session_repository.delete_session(session_id)
+            raise HTTPException(404, "Upload session does not exist")
+
+        if error_code == "NoSuchBucket":
+            raise HTTPException(404, "Bucket does not exist")
+
+        if error_code in ("EntityTooSmall", "InvalidPart", "InvalidPartOrder"):
+            raise HTTPException(400, f"Invalid parts: {e.response['Error'].get('Message', error_code)}")
+
+        raise HTTPException(500, f"Failed to {action}")
+
+    def create_session(self, request: CreateUploadSessionRequest):
+        file_key = self.s3_service._build_file_key(request.file_name, request.folder_name)
+        self.s3_service._reject_compressed_folder(file_key, request.content_type, request.file_size)
+        part_size = max(S3_MULTIPART_PART_SIZE, MIN_PART_SIZE)
+        if request.file_size:
+            part_size = max(part_size, math.ceil(request.file_size / MAX_PARTS))
+
+        try:
+            self.logger.info("Creating upload session for '%s' in bucket '%s'", file_key, request.bucket_name)
+            upload_id = self.s3_repository.create_multipart_upload(
+                request.bucket_name, file_key, request.content_type
+            )["UploadId"]
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+            if error_code == "NoSuchBucket":
+                raise HTTPException(404, "Bucket does not exist")
+            raise HTTPException(500, "Failed to create upload session")
+
+        session = self.session_repository.create_session(
+            uuid.uuid4().hex, request.bucket_name, file_key, upload_id, part_size, request.content_type
+        )
+        return {
+            "session_id": session["session_id"],
+            "bucket_name": session["bucket_name"],
+            "file_key": session["file_key"],
+            "part_size": part_size,
+            "max_parts": MAX_PARTS,
+        }
+
+    def upload_part(self, session_id: str, part_number: int, body: BinaryIO):
+        session = self._get_session(session_id)
+        try:
+            response = self.s3_repository.upload_part(
+                session["bucket_name"], session["file_key"], session["upload_id"], part_number, body
+            )
+        except ClientError as e:
+            self._handle_client_error(e, session_id, "upload part")
+        return {"session_id": session_id, "part_number": part_number, "etag": response["ETag"]}
+
+    def presign_part(self, session_id: str, part_number: int, expires_in: int | None = None):
+        # Lets the client PUT the part straight to S3 instead of through this API
+        session = self._get_session(session_id)
+        expires_in = expires_in or PRESIGN_DEFAULT_EXPIRES
+        url = self.s3_repository.generate_presigned_url(
+            "upload_part",
+            {
+                "Bucket": session["bucket_name"],
+                "Key": session["file_key"],
+                "UploadId": session["upload_id"],
+                "PartNumber": part_number,
+            },
+            expires_in,
+        )
+        return {"method": "PUT", "url": url, "part_number": part_number, "expires_in": expires_in}
+
+    def get_session(self, session_id: str):
+        session = self._get_session(session_id)
+        try:
+            parts = self.s3_repository.list_parts(session["bucket_name"], session["file_key"], session["upload_id"])
+        except ClientError as e:
+            self._handle_client_error(e, session_id, "list parts")
+        return {
+            "session_id": session_id,
+            "bucket_name": session["bucket_name"],
+            "file_key": session["file_key"],
+            "part_size": session["part_size"],
+            "created_at": session["created_at"],
+            "parts": [
+                {"part_number": part["PartNumber"], "size": part["Size"], "etag": part["ETag"]}
+                for part in parts
+            ],
+        }
+
+    def complete_session(self, session_id: str):
+        session = self._get_session(session_id)
+        try:
+            parts = self.s3_repository.list_parts(session["bucket_name"], session["file_key"], session["upload_id"])
+            if not parts:
+                raise HTTPException(400, "No parts have been uploaded")
+            self.s3_repository.complete_multipart_upload(
+                session["bucket_name"],
+                session["file_key"],
+                session["upload_id"],
+                [{"PartNumber": part["PartNumber"], "ETag": part["ETag"]} for part in parts],
+            )
+        except ClientError as e:
+            self._handle_client_error(e, session_id, "complete upload session")
+
+        self.session_repository.delete_session(session_id)
+        self.logger.info("Completed upload session '%s' with %s parts", session_id, len(parts))
+        return {
+            "message": f"File '{session['file_key']}' uploaded to bucket '{session['bucket_name']}'.",
+            "parts": len(parts),
+            "size": sum(part["Size"] for part in parts),
+        }
+
+    def abort_session(self, session_id: str):
+        session = self._get_session(session_id)
+        try:
+            self.s3_repository.abort_multipart_upload(session["bucket_name"], session["file_key"], session["upload_id"])
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchUpload":
+                self._handle_client_error(e, session_id, "abort upload session")
+
+        self.session_repository.delete_session(session_id)
+        return {"message": f"Upload session '{session_id}' aborted."}
@@ -0,0 +1,297 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Any, Iterable
+
+BUCKET_COLUMNS = ("bucket_name", "status", "crawl_id", "job_id", "crawl_started_at", "indexed_at")
+OBJECT_COLUMNS = ("key", "size", "etag", "last_modified", "storage_class")
+
+# `folders` holds the object count and size directly inside each folder and is
+# kept up to date by triggers, so the totals of a folder and everything below
+# it are a range scan over folder rows instead of over objects.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_buckets (
+    bucket_name TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    crawl_id INTEGER NOT NULL,
+    job_id TEXT,
+    crawl_started_at TEXT,
+    indexed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS objects (
+    bucket_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified REAL,
+    storage_class TEXT,
+    crawl_id INTEGER NOT NULL,
+    PRIMARY KEY (bucket_name, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS objects_extension ON objects (bucket_name, extension);
+CREATE INDEX IF NOT EXISTS objects_size ON objects (bucket_name, size);
+CREATE INDEX IF NOT EXISTS objects_last_modified ON objects (bucket_name, last_modified);
+CREATE TABLE IF NOT EXISTS folders (
+    bucket_name TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    object_count INTEGER NOT NULL,
+    total_size INTEGER NOT NULL,
+    PRIMARY KEY (bucket_name, folder)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS objects_insert AFTER INSERT ON objects BEGIN
+    INSERT INTO folders (bucket_name, folder, object_count, total_size)
+    VALUES (NEW.bucket_name, NEW.folder, 1, NEW.size)
+    ON CONFLICT (bucket_name, folder) DO UPDATE SET
+        object_count = object_count + 1,
+        total_size = total_size + excluded.total_size;
+END;
+CREATE TRIGGER IF NOT EXISTS objects_update_size AFTER UPDATE OF size ON objects
+WHEN NEW.size <> OLD.size BEGIN
+    UPDATE folders SET total_size = total_size + NEW.size - OLD.size
+    WHERE bucket_name = NEW.bucket_name AND folder = NEW.folder;
+END;
+CREATE TRIGGER IF NOT EXISTS objects_delete AFTER DELETE ON objects BEGIN
+    UPDATE folders SET object_count = object_count - 1, total_size = total_size - OLD.size
+    WHERE bucket_name = OLD.bucket_name AND folder = OLD.folder;
+    DELETE FROM folders
+    WHERE bucket_name = OLD.bucket_name AND folder = OLD.folder AND object_count <= 0;
+END;
+"""
+
+
+def folder_of(key: str) -> str:
+    # "a/b/c.txt" -> "a/b/"; a folder marker such as "a/b/" belongs to itself
+    return key[: key.rfind("/") + 1]
+
+
+def extension_of(key: str) -> str:
+    # "a/report.tar.gz" -> "gz"; empty when the last path segment has no dot
+    name = key[key.rfind("/") + 1 :]
+    return name[name.rfind(".") + 1 :] if "." in name else ""
+
+
+def prefix_end(prefix: str) -> str | None:
+    # Smallest string above every string starting with `prefix`, so prefix
+    # matches become range scans on an index. Code point order is the UTF-8
+    # byte order SQLite compares TEXT in. None means there is no upper bound.
+    while prefix:
+        code_point = ord(prefix[-1]) + 1
+        if 0xD800 <= code_point <= 0xDFFF:
+            code_point = 0xE000
+        if code_point <= 0x10FFFF:
+            return prefix[:-1] + chr(code_point)
+        prefix = prefix[:-1]
+    return None
+
+
+def _range_conditions(column: str, prefix: str) -> tuple[list[str], list[Any]]:
+    conditions, args = [f"{column} >= ?"], [prefix]
+    end = prefix_end(prefix)
+    if end is not None:
+        conditions.append(f"{column} < ?")
+        args.append(end)
+    return conditions, args
+
+
+# Local index of bucket listings (key, size, ETag, last modified). Rows written
+# by a crawl carry its crawl_id, so objects the crawl did not see are removed
+# once it finishes. Writes for buckets that are not indexed are ignored.
+class MetadataIndexRepository:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            # WAL lets queries read while a crawl is writing
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        # Durable enough with WAL, and saves an fsync per committed crawl page
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    # Buckets
+    def begin_crawl(self, bucket_name: str, status: str, started_at: str) -> int:
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                """
+                INSERT INTO indexed_buckets (bucket_name, status, crawl_id, crawl_started_at)
+                VALUES (?, ?, 1, ?)
+                ON CONFLICT (bucket_name) DO UPDATE SET
+                    status = excluded.status,
+                    crawl_id = crawl_id + 1,
+                    crawl_started_at = excluded.crawl_started_at
+                """,
+                (bucket_name, status, started_at),
+            )
+            row = connection.execute(
+                "SELECT crawl_id FROM indexed_buckets WHERE bucket_name = ?", (bucket_name,)
+            ).fetchone()
+        return row[0]
+
+    def update_bucket(self, bucket_name: str, **fields: Any):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                f"UPDATE indexed_buckets SET {', '.join(f'{column} = ?' for column in fields)} WHERE bucket_name = ?",
+                (*fields.values(), bucket_name),
+            )
+
+    def get_bucket(self, bucket_name: str) -> dict[str, Any] | None:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                f"SELECT {', '.join(BUCKET_COLUMNS)} FROM indexed_buckets WHERE bucket_name = ?",
+                (bucket_name,),
+            ).fetchone()
+        return dict(zip(BUCKET_COLUMNS, row)) if row else None
+
+    def list_buckets(self) -> list[dict[str, Any]]:
+        # With the object count and total size of each bucket
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"""
+                SELECT {', '.join(f'b.{column}' for column in BUCKET_COLUMNS)},
+                    COALESCE(SUM(f.object_count), 0), COALESCE(SUM(f.total_size), 0)
+                FROM indexed_buckets b LEFT JOIN folders f ON f.bucket_name = b.bucket_name
+                GROUP BY b.bucket_name ORDER BY b.bucket_name
+                """
+            ).fetchall()
+        return [dict(zip((*BUCKET_COLUMNS, "object_count", "total_size"), row)) for row in rows]
+
+    def drop_bucket(self, bucket_name: str):
+        with closing(self._connect()) as connection, connection:
+            # Folder rows go first so the delete trigger has nothing to update
+            connection.execute("DELETE FROM folders WHERE bucket_name = ?", (bucket_name,))
+            connection.execute("DELETE FROM objects WHERE bucket_name = ?", (bucket_name,))
+            connection.execute("DELETE FROM indexed_buckets WHERE bucket_name = ?", (bucket_name,))
+
+    def remove_stale_objects(self, bucket_name: str, crawl_id: int) -> int:
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(
+                "DELETE FROM objects WHERE bucket_name = ? AND crawl_id <> ?", (bucket_name, crawl_id)
+            ).rowcount
+
+    # Objects
+    def upsert_objects(self, bucket_name: str, objects: Iterable[tuple], crawl_id: int | None = None):
+        # `objects` are (key, size, etag, last_modified, storage_class) tuples.
+        # Without a crawl_id the rows join the bucket's current crawl.
+        rows = [
+            (key, extension_of(key), folder_of(key), size, etag, last_modified, storage_class, crawl_id, bucket_name)
+            for key, size, etag, last_modified, storage_class in objects
+        ]
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                """
+                INSERT INTO objects (
+                    bucket_name, key, extension, folder, size, etag, last_modified, storage_class, crawl_id
+                )
+                SELECT bucket_name, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, crawl_id)
+                FROM indexed_buckets WHERE bucket_name = ?
+                ON CONFLICT (bucket_name, key) DO UPDATE SET
+                    size = excluded.size,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    storage_class = excluded.storage_class,
+                    crawl_id = excluded.crawl_id
+                """,
+                rows,
+            )
+
+    def delete_objects(self, bucket_name: str, keys: Iterable[str]):
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "DELETE FROM objects WHERE bucket_name = ? AND key = ?",
+                [(bucket_name, key) for key in keys],
+            )
+
+    def get_object(self, bucket_name: str, key: str) -> dict[str, Any] | None:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                f"SELECT {', '.join(OBJECT_COLUMNS)} FROM objects WHERE bucket_name = ? AND key = ?",
+                (bucket_name, key),
+            ).fetchone()
+        return dict(zip(OBJECT_COLUMNS, row)) if row else None
+
+    def query_objects(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        suffix: str = "",
+        min_size: int | None = None,
+        max_size: int | None = None,
+        modified_after: float | None = None,
+        modified_before: float | None = None,
+        start_after: str | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        conditions, args = ["bucket_name = ?"], [bucket_name]
+        if prefix:
+            range_conditions, range_args = _range_conditions("key", prefix)
+            conditions += range_conditions
+            args += range_args
+        if suffix:
+            # Keys ending in ".pdf" all have the extension "pdf", which is
+            # indexed; the exact suffix is checked on the rows that remain
+            extension = suffix[suffix.rfind(".") + 1 :]
+            if "." in suffix and "/" not in extension:
+                conditions.append("extension = ?")
+                args.append(extension)
+            conditions.append("substr(key, -?) = ?")
+            args += [len(suffix), suffix]
+        for condition, value in (
+            ("key > ?", start_after),
+            ("size >= ?", min_size),
+            ("size <= ?", max_size),
+            ("last_modified >= ?", modified_after),
+            ("last_modified < ?", modified_before),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                args.append(value)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"""
+                SELECT {', '.join(OBJECT_COLUMNS)} FROM objects
+                WHERE {' AND '.join(conditions)}
+                ORDER BY key LIMIT ?
+                """,
+                (*args, limit),
+            ).fetchall()
+        return [dict(zip(OBJECT_COLUMNS, row)) for row in rows]
+
+    # Folder aggregates
+    def folder_stats(self, bucket_name: str, folder: str, limit: int) -> dict[str, Any]:
+        # Totals for everything under `folder`, the objects directly inside it
+        # and one entry per direct subfolder
+        range_conditions, range_args = _range_conditions("folder", folder)
+        where = " AND ".join(["bucket_name = ?", *range_conditions])
+        with closing(self._connect()) as connection:
+            object_count, total_size = connection.execute(
+                f"SELECT COALESCE(SUM(object_count), 0), COALESCE(SUM(total_size), 0) FROM folders WHERE {where}",
+                (bucket_name, *range_args),
+            ).fetchone()
+            direct = connection.execute(
+                "SELECT object_count, total_size FROM folders WHERE bucket_name = ? AND folder = ?",
+                (bucket_name, folder),
+            ).fetchone() or (0, 0)
+            subfolders = connection.execute(
+                f"""
+                SELECT substr(folder, 1, ? + instr(substr(folder, ? + 1), '/')) AS subfolder,
+                    SUM(object_count), SUM(total_size)
+                FROM folders WHERE {where} AND folder <> ?
+                GROUP BY subfolder ORDER BY subfolder LIMIT ?
+                """,
+                (len(folder), len(folder), bucket_name, *range_args, folder, limit),
+            ).fetchall()
+        return {
+            "object_count": object_count,
+            "total_size": total_size,
+            "direct_object_count": direct[0],
+            "direct_size": direct[1],
+            "subfolders": [
+                {"folder": subfolder, "object_count": count, "total_size": size}
+                for subfolder, count, size in subfolders
+            ],
+        }
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.session_dependencies import get_metadata_index
+from app.s3_index.schemas.index_schema import (
+    FolderStatsResponse,
+    IndexedBucketResponse,
+    IndexQueryResponse,
+)
+from app.s3_index.services.index_service import MetadataIndexService
+
+router = APIRouter(
+    prefix="/index",
+    tags=["Metadata Index"]
+)
+
+
+def require_metadata_index(
+    metadata_index: MetadataIndexService | None = Depends(get_metadata_index),
+) -> MetadataIndexService:
+    if metadata_index is None:
+        raise HTTPException(status_code=503, detail="Metadata index is disabled.")
+    return metadata_index
+
+# INDEX ROUTES
+@router.get("", response_model=list[IndexedBucketResponse])
+def list_indexes(service: MetadataIndexService = Depends(require_metadata_index)):
+    return service.list_indexes()
+
+@router.post("/{bucket_name}")
+def index_bucket(bucket_name: str, service: MetadataIndexService = Depends(require_metadata_index)):
+    return service.start_index(bucket_name)
+
+@router.get("/{bucket_name}", response_model=IndexedBucketResponse)
+def get_index(bucket_name: str, service: MetadataIndexService = Depends(require_metadata_index)):
+    return service.get_index(bucket_name)
+
+@router.delete("/{bucket_name}")
+def drop_index(bucket_name: str, service: MetadataIndexService = Depends(require_metadata_index)):
+    return service.drop_index(bucket_name)
+
+# QUERY ROUTES
+@router.get("/{bucket_name}/objects", response_model=IndexQueryResponse)
+def query_objects(
+    bucket_name: str,
+    prefix: str = Query("", description="Only keys starting with this prefix (e.g. reports/2024/)"),
+    suffix: str = Query("", description="Only keys ending with this suffix (e.g. .pdf)"),
+    min_size: int | None = Query(None, ge=0, description="Minimum size in bytes"),
+    max_size: int | None = Query(None, ge=0, description="Maximum size in bytes"),
+    modified_after: datetime | None = Query(None, description="Last modified at or after this time"),
+    modified_before: datetime | None = Query(None, description="Last modified before this time"),
+    start_after: str | None = Query(None, description="Return keys after this one, from next_start_after"),
+    limit: int = Query(100, ge=1, le=1000),
+    service: MetadataIndexService = Depends(require_metadata_index),
+):
+    return service.query_objects(
+        bucket_name,
+        prefix=prefix,
+        suffix=suffix,
+        min_size=min_size,
+        max_size=max_size,
+        modified_after=modified_after,
+        modified_before=modified_before,
+        start_after=start_after,
+        limit=limit,
+    )
+
+@router.get("/{bucket_name}/stats", response_model=FolderStatsResponse)
+def folder_stats(
+    bucket_name: str,
+    folder: str = Query("", description="Folder to total (e.g. reports/2024), empty for the whole bucket"),
+    limit: int = Query(1000, ge=0, le=10000, description="Maximum number of subfolders listed"),
+    service: MetadataIndexService = Depends(require_metadata_index),
+):
+    return service.folder_stats(bucket_name, folder, limit)
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from app.core.enums import IndexStatus
+
+
+class IndexedBucketResponse(BaseModel):
+    bucket_name: str
+    status: IndexStatus
+    job_id: str | None = Field(default=None, description="Job of the latest crawl")
+    crawl_started_at: datetime | None = None
+    indexed_at: datetime | None = Field(default=None, description="When the latest complete crawl finished")
+    object_count: int = 0
+    total_size: int = 0
+
+
+class IndexedObject(BaseModel):
+    key: str
+    size: int
+    etag: str | None = None
+    last_modified: datetime | None = None
+    storage_class: str | None = None
+
+
+class IndexQueryResponse(BaseModel):
+    bucket_name: str
+    status: IndexStatus
+    indexed_at: datetime | None = None
+    objects: list[IndexedObject]
+    next_start_after: str | None = Field(
+        default=None, description="Pass as start_after to get the next page; null on the last page"
+    )
+
+
+class FolderStats(BaseModel):
+    folder: str
+    object_count: int
+    total_size: int
+
+
+class FolderStatsResponse(BaseModel):
+    bucket_name: str
+    status: IndexStatus
+    indexed_at: datetime | None = None
+    folder: str = Field(..., description="Folder prefix, empty for the whole bucket")
+    object_count: int = Field(..., description="Objects in the folder and all its subfolders")
+    total_size: int = Field(..., description="Bytes in the folder and all its subfolders")
+    direct_object_count: int = Field(..., description="Objects directly inside the folder")
+    direct_size: int = Field(..., description="Bytes directly inside the folder")
+    subfolders: list[FolderStats] = Field(default_factory=list, description="Totals of each direct subfolder")
@@ -0,0 +1,380 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Iterable
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from app.core.enums import IndexStatus
+from app.jobs.services.job_manager import FINISHED_STATUSES, Job, JobManager, JobStopped
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_index.repositories.index_repository import MetadataIndexRepository
+from app.utils.logging_config import get_logger
+
+# How often a crawl reports progress while waiting for shards
+PROGRESS_INTERVAL = 1.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _timestamp(value: datetime | None) -> float | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _listing_row(obj: dict[str, Any]) -> tuple:
+    return (obj["Key"], obj["Size"], obj.get("ETag"), obj["LastModified"].timestamp(), obj.get("StorageClass"))
+
+
+def _response_time(response: dict[str, Any]) -> float:
+    # PUT responses carry no LastModified; the server's Date header is as close
+    date = response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("date")
+    try:
+        return parsedate_to_datetime(date).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def _serialize_object(obj: dict[str, Any]) -> dict[str, Any]:
+    last_modified = obj["last_modified"]
+    return {
+        **obj,
+        "last_modified": datetime.fromtimestamp(last_modified, timezone.utc) if last_modified is not None else None,
+    }
+
+
+class MetadataIndexService:
+    # Keeps a local SQLite copy of bucket listings so searches and folder
+    # totals do not need a full list_objects_v2 crawl. A bucket is indexed by
+    # an "index_bucket" job that splits the key space into prefix shards and
+    # crawls them in parallel; after that, writes made through this service's
+    # repositories are recorded as they happen.
+    def __init__(
+        self,
+        index_repository: MetadataIndexRepository,
+        s3_repository: s3Repository,
+        executor: Executor,
+        job_manager: JobManager,
+        concurrency: int,
+        min_shards: int,
+        max_shard_depth: int,
+    ):
+        self.index_repository = index_repository
+        self.s3_repository = s3_repository
+        self.executor = executor
+        self.job_manager = job_manager
+        self.concurrency = max(concurrency, 1)
+        self.min_shards = min_shards
+        self.max_shard_depth = max(max_shard_depth, 1)
+        self.logger = get_logger(__name__)
+        self._lock = threading.Lock()
+        # Checked on every write, so unindexed buckets never touch SQLite
+        self._indexed = {bucket["bucket_name"] for bucket in index_repository.list_buckets()}
+        job_manager.register("index_bucket", self._run_index_job)
+
+    def is_indexed(self, bucket_name: str) -> bool:
+        return bucket_name in self._indexed
+
+    # Write tracking, called once the S3 write has succeeded. A failed index
+    # update is only logged: the write itself succeeded, and the next crawl
+    # of the bucket repairs the index.
+    def _update(self, bucket_name: str, key: str, update: Callable[[], None]):
+        if bucket_name not in self._indexed:
+            return
+        try:
+            update()
+        except Exception:
+            self.logger.error(
+                "Failed to update metadata index for '%s' in bucket '%s'", key, bucket_name, exc_info=True
+            )
+
+    def _refresh(self, bucket_name: str, key: str):
+        try:
+            head = self.s3_repository.head_object(bucket_name, key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                self.index_repository.delete_objects(bucket_name, [key])
+                return
+            raise
+        self.index_repository.upsert_objects(
+            bucket_name,
+            [(key, head["ContentLength"], head.get("ETag"), head["LastModified"].timestamp(), head.get("StorageClass", "STANDARD"))],
+        )
+
+    def record_put(self, bucket_name: str, key: str, size: int | None, response: dict[str, Any]):
+        # Without a known size (e.g. a completed multipart upload) the object is read back
+        def update():
+            if size is None:
+                return self._refresh(bucket_name, key)
+            self.index_repository.upsert_objects(
+                bucket_name, [(key, size, response.get("ETag"), _response_time(response), "STANDARD")]
+            )
+
+        self._update(bucket_name, key, update)
+
+    def record_copy(
+        self,
+        bucket_name: str,
+        key: str,
+        source_bucket: str,
+        source_key: str,
+        response: dict[str, Any],
+    ):
+        # A copy keeps the source's size, so a HEAD is only needed when the
+        # source is not indexed or the copy was done in parts
+        def update():
+            result = response.get("CopyObjectResult")
+            source = None
+            if result and source_bucket in self._indexed:
+                source = self.index_repository.get_object(source_bucket, source_key)
+            if source is None:
+                return self._refresh(bucket_name, key)
+            self.index_repository.upsert_objects(
+                bucket_name,
+                [(key, source["size"], result.get("ETag"), _timestamp(result.get("LastModified")), source["storage_class"])],
+            )
+
+        self._update(bucket_name, key, update)
+
+    def record_delete(self, bucket_name: str, keys: Iterable[str]):
+        keys = list(keys)
+        if keys:
+            self._update(bucket_name, keys[0], lambda: self.index_repository.delete_objects(bucket_name, keys))
+
+    def record_bucket_deleted(self, bucket_name: str):
+        if bucket_name in self._indexed:
+            self._update(bucket_name, "", lambda: self._drop(bucket_name))
+
+    # Crawling
+    def _job_active(self, job_id: str | None) -> bool:
+        job = self.job_manager.get_job(job_id) if job_id else None
+        return job is not None and job.status not in FINISHED_STATUSES
+
+    def start_index(self, bucket_name: str):
+        try:
+            self.s3_repository.head_bucket(bucket_name)
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            self.logger.error("Error Code: %s", error_code, exc_info=True)
+            if error_code in ("404", "NoSuchBucket"):
+                raise HTTPException(404, "Bucket does not exist.")
+            if error_code in ("403", "AccessDenied"):
+                raise HTTPException(403, "Access denied to bucket.")
+            raise HTTPException(500, "Failed to access bucket.")
+
+        with self._lock:
+            bucket = self.index_repository.get_bucket(bucket_name)
+            if bucket and bucket["status"] == IndexStatus.crawling.value and self._job_active(bucket["job_id"]):
+                raise HTTPException(409, "Bucket is already being indexed.")
+            # Rows from earlier crawls stay queryable until this one replaces them
+            crawl_id = self.index_repository.begin_crawl(bucket_name, IndexStatus.crawling.value, _now().isoformat())
+            self._indexed.add(bucket_name)
+            job = self.job_manager.submit("index_bucket", {"bucket_name": bucket_name, "crawl_id": crawl_id})
+            self.index_repository.update_bucket(bucket_name, job_id=job.job_id)
+
+        self.logger.info("Indexing bucket '%s' (crawl %s)", bucket_name, crawl_id)
+        return {"message": f"Indexing bucket '{bucket_name}' in the background.", "job_id": job.job_id}
+
+    def _discover_shards(self, bucket_name: str, store: Callable[[list], tuple[int, int]], job: Job):
+        # Lists level by level with a delimiter until there are enough prefixes
+        # to crawl in parallel. Objects found on the way are stored directly.
+        # Prefixes come back sorted, so the shards are in key order.
+        frontier, count, size = [""], 0, 0
+        for _ in range(self.max_shard_depth):
+            next_frontier = []
+            for prefix in frontier:
+                continuation_token = None
+                while True:
+                    job.raise_if_stopped()
+                    page = self.s3_repository.list_objects_page(bucket_name, prefix, "/", 1000, continuation_token)
+                    page_count, page_size = store(page.get("Contents", []))
+                    count += page_count
+                    size += page_size
+                    next_frontier.extend(common["Prefix"] for common in page.get("CommonPrefixes", []))
+                    if not page.get("IsTruncated"):
+                        break
+                    continuation_token = page["NextContinuationToken"]
+            frontier = next_frontier
+            if len(frontier) >= self.min_shards:
+                break
+        return frontier, count, size
+
+    def _crawl_shard(self, bucket_name: str, prefix: str, store: Callable[[list], tuple[int, int]], job: Job):
+        count = size = 0
+        for page in self.s3_repository.iter_object_pages(bucket_name, prefix):
+            job.raise_if_stopped()
+            page_count, page_size = store(page.get("Contents", []))
+            count += page_count
+            size += page_size
+        return count, size
+
+    def _crawl(self, bucket_name: str, crawl_id: int, job: Job):
+        # The checkpoint covers the contiguous run of finished shards, the
+        # shard listing itself is redone by every run
+        checkpoint = job.checkpoint or {}
+        done_through = checkpoint.get("done_through")
+        indexed, indexed_bytes = checkpoint.get("indexed", 0), checkpoint.get("bytes", 0)
+        progress_base = indexed, indexed_bytes
+        written = {"count": 0, "bytes": 0}
+        written_lock = threading.Lock()
+
+        def store(objects: list[dict[str, Any]]):
+            rows = [_listing_row(obj) for obj in objects]
+            if rows:
+                self.index_repository.upsert_objects(bucket_name, rows, crawl_id)
+            size = sum(row[1] for row in rows)
+            with written_lock:
+                written["count"] += len(rows)
+                written["bytes"] += size
+            return len(rows), size
+
+        def report():
+            job.report_progress(progress_base[0] + written["count"], 0, progress_base[1] + written["bytes"])
+
+        shards, discovered, discovered_bytes = self._discover_shards(bucket_name, store, job)
+        next_shard = 0
+        while done_through is not None and next_shard < len(shards) and shards[next_shard] <= done_through:
+            next_shard += 1
+        finished: dict[int, tuple[int, int]] = {}
+        in_flight: dict[Future, int] = {}
+
+        def collect(done: set[Future]):
+            nonlocal next_shard, indexed, indexed_bytes
+            for future in done:
+                finished[in_flight.pop(future)] = future.result()
+            advanced = False
+            while next_shard in finished:
+                count, size = finished.pop(next_shard)
+                indexed += count
+                indexed_bytes += size
+                next_shard += 1
+                advanced = True
+            if advanced:
+                job.save_checkpoint(
+                    {"done_through": shards[next_shard - 1], "indexed": indexed, "bytes": indexed_bytes}
+                )
+            report()
+
+        try:
+            for shard_index in range(next_shard, len(shards)):
+                while len(in_flight) >= self.concurrency:
+                    done, _ = wait(in_flight, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = self.executor.submit(self._crawl_shard, bucket_name, shards[shard_index], store, job)
+                in_flight[future] = shard_index
+            while in_flight:
+                done, _ = wait(in_flight, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                collect(done)
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+
+        removed = self.index_repository.remove_stale_objects(bucket_name, crawl_id)
+        self.index_repository.update_bucket(bucket_name, status=IndexStatus.ready.value, indexed_at=_now().isoformat())
+        report()
+        self.logger.info(
+            "Indexed %s objects in bucket '%s' from %s shards, removed %s stale entries",
+            indexed + discovered, bucket_name, len(shards), removed
+        )
+        return {
+            "indexed": indexed + discovered,
+            "bytes": indexed_bytes + discovered_bytes,
+            "removed": removed,
+            "shards": len(shards),
+        }
+
+    def _run_index_job(self, job: Job):
+        bucket_name = job.params["bucket_name"]
+        try:
+            return self._crawl(bucket_name, job.params["crawl_id"], job)
+        except JobStopped as e:
+            # A shutdown leaves the crawl to be resumed on the next start
+            if e.reason != "shutdown":
+                self.index_repository.update_bucket(bucket_name, status=IndexStatus.incomplete.value)
+            raise
+        except Exception:
+            self.index_repository.update_bucket(bucket_name, status=IndexStatus.incomplete.value)
+            raise
+
+    # Index management
+    def _get_indexed_bucket(self, bucket_name: str) -> dict[str, Any]:
+        bucket = self.index_repository.get_bucket(bucket_name)
+        if bucket is None:
+            raise HTTPException(404, "Bucket is not indexed.")
+        return bucket
+
+    def _drop(self, bucket_name: str):
+        bucket = self.index_repository.get_bucket(bucket_name)
+        if bucket and self._job_active(bucket["job_id"]):
+            self.job_manager.cancel(bucket["job_id"])
+        self._indexed.discard(bucket_name)
+        self.index_repository.drop_bucket(bucket_name)
+
+    def list_indexes(self):
+        return self.index_repository.list_buckets()
+
+    def get_index(self, bucket_name: str):
+        bucket = self._get_indexed_bucket(bucket_name)
+        stats = self.index_repository.folder_stats(bucket_name, "", limit=0)
+        return {**bucket, "object_count": stats["object_count"], "total_size": stats["total_size"]}
+
+    def drop_index(self, bucket_name: str):
+        self._get_indexed_bucket(bucket_name)
+        self._drop(bucket_name)
+        self.logger.info("Dropped metadata index of bucket '%s'", bucket_name)
+        return {"message": f"Index of bucket '{bucket_name}' deleted."}
+
+    # Queries
+    def query_objects(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        suffix: str = "",
+        min_size: int | None = None,
+        max_size: int | None = None,
+        modified_after: datetime | None = None,
+        modified_before: datetime | None = None,
+        start_after: str | None = None,
+        limit: int = 100,
+    ):
+        bucket = self._get_indexed_bucket(bucket_name)
+        # One extra row tells whether there is a next page
+        objects = self.index_repository.query_objects(
+            bucket_name,
+            prefix=prefix,
+            suffix=suffix,
+            min_size=min_size,
+            max_size=max_size,
+            modified_after=_timestamp(modified_after),
+            modified_before=_timestamp(modified_before),
+            start_after=start_after,
+            limit=limit + 1,
+        )
+        next_start_after = objects[limit - 1]["key"] if len(objects) > limit else None
+        return {
+            "bucket_name": bucket_name,
+            "status": bucket["status"],
+            "indexed_at": bucket["indexed_at"],
+            "objects": [_serialize_object(obj) for obj in objects[:limit]],
+            "next_start_after": next_start_after,
+        }
+
+    def folder_stats(self, bucket_name: str, folder: str = "", limit: int = 1000):
+        bucket = self._get_indexed_bucket(bucket_name)
+        folder = f"{folder.rstrip('/')}/" if folder.rstrip("/") else ""
+        return {
+            "bucket_name": bucket_name,
+            "status": bucket["status"],
+            "indexed_at": bucket["indexed_at"],
+            "folder": folder,
+            **self.index_repository.folder_stats(bucket_name, folder, limit),
+        }
@@ -0,0 +1,17 @@
+import re
+import unicodedata
+from urllib.parse import quote
+
+# Characters a quoted-string cannot carry as they are (controls end the header)
+_UNSAFE_FALLBACK = re.compile(r'[\x00-\x1f\x7f"\\]|[^\x00-\x7f]')
+
+
+def content_disposition(file_name: str, disposition: str = "attachment") -> str:
+    # Headers are latin-1, so the name goes in twice: an ASCII approximation in
+    # filename= for old clients, and the exact UTF-8 name in filename*= (RFC 6266/5987)
+    ascii_name = unicodedata.normalize("NFKD", file_name).encode("ascii", "ignore").decode()
+    fallback = _UNSAFE_FALLBACK.sub("_", ascii_name) or "download"
+    value = f'{disposition}; filename="{fallback}"'
+    if fallback != file_name:
+        value += f"; filename*=UTF-8''{quote(file_name, safe='')}"
+    return value
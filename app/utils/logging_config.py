@@ -1,10 +1,144 @@
+import atexit
+import json
 import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+from app.core.config import (
+    LOG_ASYNC,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_QUEUE_SIZE,
+    LOG_RATE_LIMIT_BURST,
+    LOG_RATE_LIMIT_SAMPLE,
+    LOG_RATE_LIMIT_WINDOW,
 )
 
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+# One JSON object per line, with any extra= fields as top-level keys
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update(
+            (name, value) for name, value in vars(record).items() if name not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{message} ({suppressed} similar suppressed)" if suppressed else message
+
+
+# Caps repeated warnings and errors per call site: the first `burst` records
+# of a window pass, after that one in `sample`. The next record let through
+# carries the number dropped before it as `suppressed`.
+class RateLimitFilter(logging.Filter):
+    def __init__(self, burst: int, window: float, sample: int, level: int = logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.sample = sample
+        self.level = level
+        self._sites: dict[tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or self.burst <= 0:
+            return True
+        site = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None or now - state[0] >= self.window:
+                # [window start, records seen in the window, suppressed since the last one let through]
+                state = self._sites[site] = [now, 0, state[2] if state else 0]
+            state[1] += 1
+            if state[1] > self.burst and (self.sample <= 0 or (state[1] - self.burst) % self.sample):
+                state[2] += 1
+                return False
+            suppressed, state[2] = state[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+# Hands records to the listener thread without formatting them: the message
+# and any traceback are rendered off the request path, so %-style arguments
+# must not be mutated after the call. Records are dropped, and counted, when
+# the queue is full rather than blocking the caller.
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: QueueListener | None = None
+
+
+def configure_logging():
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter(TEXT_FORMAT))
+    rate_limit = RateLimitFilter(LOG_RATE_LIMIT_BURST, LOG_RATE_LIMIT_WINDOW, LOG_RATE_LIMIT_SAMPLE)
+
+    handler = stream_handler
+    if LOG_ASYNC:
+        handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        _listener = QueueListener(handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+    # On the handler rather than the loggers, so it covers records propagated from every module
+    handler.addFilter(rate_limit)
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(LOG_LEVEL)
+    # uvicorn installs its own stream handlers before importing the app; the
+    # access log would write to stderr on the event loop for every request
+    for name in ("uvicorn", "uvicorn.access"):
+        logging.getLogger(name).handlers.clear()
+        logging.getLogger(name).propagate = True
+
+
+def logging_stats() -> dict[str, int]:
+    handler = logging.getLogger().handlers[0] if logging.getLogger().handlers else None
+    return {
+        "queued": handler.queue.qsize() if isinstance(handler, NonBlockingQueueHandler) else 0,
+        "dropped": handler.dropped if isinstance(handler, NonBlockingQueueHandler) else 0,
+    }
+
+
+configure_logging()
+
 def get_logger(name: str):
     return logging.getLogger(name)
-
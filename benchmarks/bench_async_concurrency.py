@@ -0,0 +1,87 @@
+# Concurrent GET /s3/buckets against a slow S3 on the sync and async engines.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_async_concurrency --concurrency 400 --latency 0.5
+#
+# The moto stand-in answers in ~1 ms, so each S3 call is delayed by
+# --latency seconds to model a slow S3. The sync engine is bounded by the
+# Starlette threadpool (40 threads); the async engine is not.
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+
+async def run_engine(concurrency: int, latency: float):
+    import httpx
+
+    from benchmarks.local_s3 import local_s3_server
+    from app.core.config import S3_ENGINE
+    from app.main import app
+
+    with local_s3_server():
+        async with app.router.lifespan_context(app):
+            app.state.s3_client_pool.get_client().create_bucket(Bucket="bench-bucket")
+            add_s3_latency(app, S3_ENGINE, latency)
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                started = time.perf_counter()
+                responses = await asyncio.gather(
+                    *(client.get("/s3/buckets") for _ in range(concurrency))
+                )
+                elapsed = time.perf_counter() - started
+
+    failed = sum(response.status_code != 200 for response in responses)
+    print(
+        f"{S3_ENGINE:<6} {concurrency} concurrent requests  {elapsed:.2f}s  "
+        f"{concurrency / elapsed:.1f} req/s  {failed} failed"
+    )
+
+
+def add_s3_latency(app, engine: str, latency: float):
+    if engine == "async":
+        async def delay(**kwargs):
+            await asyncio.sleep(latency)
+
+        client = app.state.async_s3_service.s3_repository.s3_client
+    else:
+        def delay(**kwargs):
+            time.sleep(latency)
+
+        client = app.state.s3_client_pool.get_client()
+    client.meta.events.register("before-send.s3", delay)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds added to every S3 call")
+    parser.add_argument("--engine", choices=["sync", "async"])
+    args = parser.parse_args()
+
+    if args.engine:
+        os.environ["METADATA_CACHE_ENABLED"] = "false"
+        os.environ["S3_ENGINE"] = args.engine
+        # Let the connection pool follow the offered load for both engines
+        os.environ.setdefault("S3_MAX_POOL_CONNECTIONS", str(args.concurrency))
+        asyncio.run(run_engine(args.concurrency, args.latency))
+        return
+
+    # S3_ENGINE is read at import time, so each engine runs in its own process
+    for engine in ("sync", "async"):
+        subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_async_concurrency",
+                "--engine", engine,
+                "--concurrency", str(args.concurrency),
+                "--latency", str(args.latency),
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Many small files through POST /s3/upload-file (one request per file) vs
+# POST /s3/upload-files (batches of --batch-size) vs POST /s3/upload-archive
+# (one tar). The app is served by uvicorn so HTTP round trips are included,
+# and each S3 call is delayed by --latency seconds to model a real S3 PUT.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_batch_upload --files 2000 --size 8192 --batch-size 500 --latency 0.02
+import argparse
+import io
+import os
+import tarfile
+import threading
+import time
+
+from benchmarks.local_s3 import local_s3_server
+
+APP_PORT = int(os.getenv("BENCH_APP_PORT", "5056"))
+BUCKET = "bench-bucket"
+
+
+def report(label: str, files: int, elapsed: float):
+    print(f"{label:<28} {files} files  {elapsed:.2f}s  {files / elapsed:,.0f} files/s")
+
+
+def build_tar(files: list[tuple[str, bytes]]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for name, data in files:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=8192, help="Bytes per file")
+    parser.add_argument("--batch-size", type=int, default=500, help="Files per /upload-files request (max 1000)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every S3 call")
+    args = parser.parse_args()
+
+    import httpx
+    import uvicorn
+
+    from app.main import app
+
+    files = [(f"thumb_{i:05}.jpg", os.urandom(args.size)) for i in range(args.files)]
+
+    with local_s3_server():
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=APP_PORT, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        app.state.s3_client_pool.get_client().meta.events.register(
+            "before-send.s3", lambda **kwargs: time.sleep(args.latency)
+        )
+
+        base_url = f"http://127.0.0.1:{APP_PORT}/s3"
+        with httpx.Client(base_url=base_url, timeout=None) as client:
+            client.post("/create-bucket", json={"bucket_name": BUCKET})
+
+            started = time.perf_counter()
+            for name, data in files:
+                client.post(f"/upload-file/{BUCKET}", files={"file": (name, data)}, data={"folder_name": "single"})
+            report("upload-file (1 per request)", args.files, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            for offset in range(0, args.files, args.batch_size):
+                batch = files[offset:offset + args.batch_size]
+                client.post(
+                    f"/upload-files/{BUCKET}",
+                    files=[("files", (name, data)) for name, data in batch],
+                    data={"folder_name": "batch"},
+                )
+            report(f"upload-files ({args.batch_size} per request)", args.files, time.perf_counter() - started)
+
+            archive = build_tar(files)
+            started = time.perf_counter()
+            client.post(f"/upload-archive/{BUCKET}", files={"archive": ("thumbs.tar", archive)}, data={"folder_name": "tar"})
+            report("upload-archive (one tar)", args.files, time.perf_counter() - started)
+
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
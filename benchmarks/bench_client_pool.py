@@ -0,0 +1,36 @@
+# Per-request overhead of building a boto3 client vs reusing the pooled one.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_client_pool --requests 200
+import argparse
+import time
+
+from benchmarks.local_s3 import local_s3_server
+from app.core.config import get_s3_client_credentials
+from app.core.s3_client_pool import S3ClientPool
+
+
+def run(label: str, requests: int, get_client):
+    started = time.perf_counter()
+    for _ in range(requests):
+        get_client().list_buckets()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {requests} requests  {elapsed:.3f}s  {elapsed / requests * 1000:.2f} ms/request")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with local_s3_server():
+        pool = S3ClientPool()
+        pool.get_client().create_bucket(Bucket="bench-bucket")
+
+        run("client per request", args.requests, get_s3_client_credentials)
+        run("pooled client", args.requests, pool.get_client)
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# Bytes saved against CPU spent by compression, in three parts:
+#   codecs     ratio and single-core compress/decompress throughput per codec
+#              and level on generated NDJSON logs, CSV and random bytes
+#   uploads    upload-file of NDJSON logs through the app against moto, with
+#              no compression rule and with a rule per codec: stored bytes,
+#              request throughput and process CPU seconds
+#   listings   a JSON and an NDJSON listing of --list-objects keys, requested
+#              with and without Accept-Encoding: gzip: bytes on the wire,
+#              latency and CPU per response
+# zstd rows are skipped unless the zstandard package is installed. Each upload
+# mode runs in its own process since the rules are read at import.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_compression --size 4194304 --uploads 40 --list-objects 5000
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.local_s3 import local_s3_server
+
+BUCKET = "bench-bucket"
+LEVELS = {"gzip": (1, 6, 9), "zstd": (1, 3, 10)}
+UPLOAD_MODES = {"none": "", "gzip-1": "logs/=gzip:1", "gzip": "logs/=gzip", "zstd": "logs/=zstd"}
+
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def ndjson_logs(size: int, rng: random.Random) -> bytes:
+    levels = ("info", "info", "info", "warning", "error")
+    services = ("upload", "download", "listing", "jobs")
+    lines, total = [], 0
+    while total < size:
+        line = (
+            f'{{"ts": "2024-05-01T12:{rng.randrange(60):02}:{rng.randrange(60):02}.{rng.randrange(1000):03}Z", '
+            f'"level": "{rng.choice(levels)}", "service": "{rng.choice(services)}", '
+            f'"request_id": "{rng.getrandbits(64):016x}", "latency_ms": {rng.randrange(1, 2000)}, '
+            f'"msg": "handled request for folder_{rng.randrange(500):04}/obj_{rng.randrange(100000):06}.bin"}}\n'
+        ).encode()
+        lines.append(line)
+        total += len(line)
+    return b"".join(lines)[:size]
+
+
+def csv_rows(size: int, rng: random.Random) -> bytes:
+    lines, total = [b"id,name,region,amount,ratio\n"], 0
+    while total < size:
+        line = (
+            f"{rng.randrange(10 ** 9)},customer_{rng.randrange(10000)},"
+            f"{rng.choice(('eu-west-1', 'us-east-1', 'ap-south-2'))},{rng.randrange(10 ** 6)},{rng.random():.6f}\n"
+        ).encode()
+        lines.append(line)
+        total += len(line)
+    return b"".join(lines)[:size]
+
+
+def bench_codecs(args):
+    from app.core.compression import compressor, decompressor
+
+    rng = random.Random(7)
+    datasets = {
+        "ndjson": ndjson_logs(args.size, rng),
+        "csv": csv_rows(args.size, rng),
+        "random": rng.randbytes(args.size),
+    }
+    codecs = [codec for codec in LEVELS if codec != "zstd" or zstd_available()]
+    print(f"{'data':<8} {'codec':<6} {'level':>5} {'ratio':>7} {'saved':>7} {'compress MB/s':>14} {'decompress MB/s':>16}")
+    for name, data in datasets.items():
+        for codec in codecs:
+            for level in LEVELS[codec]:
+                started = time.process_time()
+                encoder = compressor(codec, level)
+                compressed = b"".join(
+                    encoder.compress(data[offset:offset + 1024 * 1024]) for offset in range(0, len(data), 1024 * 1024)
+                ) + encoder.flush()
+                compress_seconds = time.process_time() - started
+                started = time.process_time()
+                decoder = decompressor(codec)
+                restored = decoder.decompress(compressed) + decoder.flush()
+                decompress_seconds = time.process_time() - started
+                assert restored == data
+                megabytes = len(data) / (1024 * 1024)
+                print(
+                    f"{name:<8} {codec:<6} {level:>5} {len(data) / len(compressed):>7.2f} "
+                    f"{1 - len(compressed) / len(data):>7.1%} {megabytes / max(compress_seconds, 1e-9):>14,.1f} "
+                    f"{megabytes / max(decompress_seconds, 1e-9):>16,.1f}"
+                )
+
+
+async def bench_app(args):
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench-compression-")
+
+    import httpx
+
+    from app.main import app
+
+    payload = ndjson_logs(args.size, random.Random(11))
+    with local_s3_server():
+        async with app.router.lifespan_context(app):
+            s3_client = app.state.s3_client_pool.get_client()
+            s3_client.create_bucket(Bucket=BUCKET)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def upload(i: int):
+                    async with semaphore:
+                        response = await client.post(
+                            f"/s3/upload-file/{BUCKET}",
+                            files={"file": (f"app_{i:05}.ndjson", payload, "application/x-ndjson")},
+                            data={"folder_name": "logs"},
+                        )
+                        response.raise_for_status()
+
+                cpu_started, started = time.process_time(), time.perf_counter()
+                await asyncio.gather(*(upload(i) for i in range(args.uploads)))
+                elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+                stored = sum(
+                    obj["Size"]
+                    for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=BUCKET, Prefix="logs/")
+                    for obj in page.get("Contents", [])
+                )
+                print(
+                    f"uploads  {args.mode:<6} {args.uploads * len(payload) / (1024 * 1024):>9,.1f} MB "
+                    f"-> {stored / (1024 * 1024):>9,.1f} MB stored  {args.uploads / elapsed:>7,.1f} req/s  "
+                    f"{cpu:>6.2f} s CPU",
+                    flush=True,
+                )
+                if args.mode != "none":
+                    return
+
+                # Listings, once the keys exist; the first request warms the metadata cache
+                keys = [f"listing/folder_{i // 100:04}/obj_{i:06}.bin" for i in range(args.list_objects)]
+                with ThreadPoolExecutor(max_workers=16) as executor:
+                    list(executor.map(lambda key: s3_client.put_object(Bucket=BUCKET, Key=key, Body=b""), keys))
+                for label, params in (
+                    ("json", {"prefix": "listing/", "page_size": 1000}),
+                    ("ndjson", {"prefix": "listing/", "stream": "true"}),
+                ):
+                    for encoding in ("identity", "gzip"):
+                        sizes, latencies = [], []
+                        cpu_started = time.process_time()
+                        for _ in range(args.listing_requests):
+                            started = time.perf_counter()
+                            async with client.stream(
+                                "GET", f"/s3/objects/{BUCKET}", params=params, headers={"Accept-Encoding": encoding}
+                            ) as response:
+                                sizes.append(sum([len(chunk) async for chunk in response.aiter_raw()]))
+                            latencies.append(time.perf_counter() - started)
+                        cpu = time.process_time() - cpu_started
+                        print(
+                            f"listing  {label:<6} {encoding:<8} {statistics.median(sizes):>10,.0f} bytes  "
+                            f"p50 {statistics.median(latencies) * 1000:>7.1f} ms  "
+                            f"{cpu / args.listing_requests * 1000:>6.1f} ms CPU per response"
+                        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=4 * 1024 * 1024, help="Bytes per generated file")
+    parser.add_argument("--uploads", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--list-objects", type=int, default=5000, help="Keys in the listed folder")
+    parser.add_argument("--listing-requests", type=int, default=20)
+    parser.add_argument("--mode", choices=list(UPLOAD_MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(bench_app(args))
+        return
+    bench_codecs(args)
+    print()
+    for mode, rules in UPLOAD_MODES.items():
+        if mode.startswith("zstd") and not zstd_available():
+            continue
+        env = {**os.environ, "UPLOAD_COMPRESSION_RULES": rules, "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")}
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_compression", *sys.argv[1:], "--mode", mode], env=env, check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
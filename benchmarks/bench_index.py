@@ -0,0 +1,92 @@
+# Folder totals and searches from a list_objects_v2 crawl vs the metadata index.
+# Every S3 call is delayed by --latency seconds to model a real listing page;
+# the index crawl lists prefix shards in parallel, then queries are served
+# from SQLite without calling S3. moto scans the whole bucket for every page
+# under one GIL, so the crawl's parallel speedup here is far below what S3
+# gives; the query timings are what this measures.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_index --objects 20000 --latency 0.05
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.local_s3 import local_s3_server
+
+BUCKET = "bench-bucket"
+
+
+def crawl_totals(client, prefix: str = ""):
+    count = size = 0
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=BUCKET, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            count += 1
+            size += obj["Size"]
+    return count, size
+
+
+def time_requests(client, path: str, params: dict, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        client.get(path, params=params).raise_for_status()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=20000)
+    parser.add_argument("--folders", type=int, default=40, help="Top-level folders the objects are spread over")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every S3 call")
+    parser.add_argument("--repeat", type=int, default=200, help="Requests per timed index query")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench-index-")
+    os.environ["JOB_DB_PATH"] = os.path.join(data_dir, "jobs.sqlite3")
+    os.environ["METADATA_INDEX_DB_PATH"] = os.path.join(data_dir, "metadata_index.sqlite3")
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with local_s3_server(), TestClient(app) as client:
+        s3_client = app.state.s3_client_pool.get_client()
+        client.post("/s3/create-bucket", json={"bucket_name": BUCKET})
+        keys = [
+            f"folder{i % args.folders:03}/sub{i % 7}/file_{i:07}.{'pdf' if i % 10 == 0 else 'log'}"
+            for i in range(args.objects)
+        ]
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            list(executor.map(lambda key: s3_client.put_object(Bucket=BUCKET, Key=key, Body=b"x" * 128), keys))
+        s3_client.meta.events.register("before-send.s3", lambda **kwargs: time.sleep(args.latency))
+
+        started = time.perf_counter()
+        count, size = crawl_totals(s3_client)
+        print(f"{'bucket totals by listing':<32} {count} objects {size} bytes  {time.perf_counter() - started:.2f}s")
+        started = time.perf_counter()
+        count, size = crawl_totals(s3_client, "folder001/")
+        print(f"{'folder totals by listing':<32} {count} objects {size} bytes  {time.perf_counter() - started:.2f}s")
+
+        started = time.perf_counter()
+        job_id = client.post(f"/index/{BUCKET}").json()["job_id"]
+        while (job := client.get(f"/jobs/{job_id}").json())["status"] in ("pending", "running"):
+            time.sleep(0.05)
+        result = job["result"]
+        print(
+            f"{'index crawl':<32} {result['indexed']} objects in {result['shards']} shards  "
+            f"{time.perf_counter() - started:.2f}s"
+        )
+
+        for label, path, params in (
+            ("bucket totals from index", f"/index/{BUCKET}/stats", {}),
+            ("folder totals from index", f"/index/{BUCKET}/stats", {"folder": "folder001"}),
+            ("*.pdf search (100 results)", f"/index/{BUCKET}/objects", {"suffix": ".pdf"}),
+            ("prefix + suffix search", f"/index/{BUCKET}/objects", {"prefix": "folder001/", "suffix": ".pdf"}),
+        ):
+            print(f"{label:<32} {time_requests(client, path, params, args.repeat):.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
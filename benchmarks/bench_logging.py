@@ -0,0 +1,107 @@
+# Request latency while --error-rate of the requests fail (downloads of
+# missing keys, each logging a traceback), with logging written inline and
+# unlimited ("inline") and through the queue with rate limiting ("queued").
+# Log output goes to a sink that takes --sink-latency seconds per write, to
+# model a slow disk or a log shipper pipe. Each mode runs in its own process
+# since the logging settings are read at import.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_logging --requests 2000 --concurrency 50 --error-rate 0.5 --sink-latency 0.002
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.local_s3 import local_s3_server
+
+BUCKET = "bench-bucket"
+MODES = {
+    "inline": {"LOG_ASYNC": "false", "LOG_RATE_LIMIT_BURST": "0"},
+    "queued": {"LOG_ASYNC": "true"},
+}
+
+
+class SlowSink:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def write(self, text: str):
+        with self._lock:
+            self.writes += 1
+            time.sleep(self.latency)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+async def run(args):
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench-logging-")
+    sink = sys.stderr = SlowSink(args.sink_latency)
+
+    import httpx
+
+    from app.main import app
+
+    with local_s3_server():
+        async with app.router.lifespan_context(app):
+            s3_client = app.state.s3_client_pool.get_client()
+            s3_client.create_bucket(Bucket=BUCKET)
+            s3_client.put_object(Bucket=BUCKET, Key="data/present.bin", Body=b"x" * 1024)
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                semaphore = asyncio.Semaphore(args.concurrency)
+                every = round(1 / args.error_rate) if args.error_rate else 0
+
+                async def request(i: int):
+                    name = "missing.bin" if every and i % every == 0 else "present.bin"
+                    async with semaphore:
+                        started = time.perf_counter()
+                        response = await client.get(
+                            f"/s3/download/{BUCKET}", params={"file_name": name, "folder_name": "data"}
+                        )
+                        await response.aread()
+                        return time.perf_counter() - started, response.status_code
+
+                started = time.perf_counter()
+                results = await asyncio.gather(*(request(i) for i in range(args.requests)))
+                elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(status != 200 for _, status in results)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{args.mode:<7} {args.requests} requests  {errors} errors  {elapsed:.2f}s  "
+        f"{args.requests / elapsed:,.0f} req/s  p50 {statistics.median(latencies) * 1000:.1f} ms  "
+        f"p99 {p99 * 1000:.1f} ms  {sink.writes} log writes",
+        file=sys.__stdout__,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.5, help="Fraction of requests that fail")
+    parser.add_argument("--sink-latency", type=float, default=0.002, help="Seconds per log write")
+    parser.add_argument("--mode", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(run(args))
+        return
+    for mode, settings in MODES.items():
+        env = {**os.environ, **settings}
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_logging", *sys.argv[1:], "--mode", mode], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Presigned URL issuance rate on the pooled client. Signing is local, so no S3 server is needed.
+#
+#   python -m benchmarks.bench_presign --signatures 20000 --threads 1 4
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import benchmarks.local_s3  # noqa: F401  (sets dummy credentials before config is imported)
+from app.core.s3_client_pool import S3ClientPool
+
+OPERATIONS = {
+    "put_object": {"Bucket": "bench-bucket", "Key": "folder/report.pdf", "ContentType": "application/pdf"},
+    "get_object": {"Bucket": "bench-bucket", "Key": "folder/report.pdf"},
+    "upload_part": {"Bucket": "bench-bucket", "Key": "folder/big.bin", "UploadId": "upload-id", "PartNumber": 1},
+}
+
+
+def run(client, operation: str, signatures: int, threads: int):
+    params = OPERATIONS[operation]
+
+    def sign(count: int):
+        for _ in range(count):
+            client.generate_presigned_url(ClientMethod=operation, Params=params, ExpiresIn=900)
+
+    per_thread = signatures // threads
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(sign, per_thread) for _ in range(threads)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    total = per_thread * threads
+    print(f"{operation:<12} threads={threads:<3} {total} signatures  {elapsed:.3f}s  {total / elapsed:,.0f} signatures/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--signatures", type=int, default=20000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    pool = S3ClientPool()
+    client = pool.get_presign_client()
+    for operation in OPERATIONS:
+        for threads in args.threads:
+            run(client, operation, args.signatures, threads)
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
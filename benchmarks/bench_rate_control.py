@@ -0,0 +1,108 @@
+# POST /s3/copy-folder against an S3 that answers 503 SlowDown above
+# --capacity requests per second, with rate control on and off. Every S3
+# call is delayed by --latency seconds; the throttling is simulated in a
+# before-send hook in front of moto. Each mode runs in its own process since
+# S3_RATE_CONTROL_ENABLED is read at import.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_rate_control --objects 1000 --capacity 50 --latency 0.05
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.local_s3 import local_s3_server
+
+BUCKET = "bench-bucket"
+SLOW_DOWN = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b"<Error><Code>SlowDown</Code><Message>Please reduce your request rate.</Message></Error>"
+)
+
+
+class ThrottlingS3:
+    # Token bucket standing in for S3's per-prefix request rate
+    def __init__(self, capacity: float, latency: float):
+        self.capacity = capacity
+        self.latency = latency
+        self.tokens = capacity / 10
+        self.updated = time.monotonic()
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request, **kwargs):
+        from botocore.awsrequest import AWSResponse
+
+        time.sleep(self.latency)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity / 10, self.tokens + (now - self.updated) * self.capacity)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            self.throttled += 1
+        return AWSResponse(request.url, 503, {"Content-Type": "application/xml"}, _Raw(SLOW_DOWN))
+
+
+class _Raw:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def run(args):
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench-rate-control-")
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with local_s3_server(), TestClient(app) as client:
+        s3_client = app.state.s3_client_pool.get_client()
+        client.post("/s3/create-bucket", json={"bucket_name": BUCKET})
+        for i in range(args.objects):
+            s3_client.put_object(Bucket=BUCKET, Key=f"source/file_{i:06}.bin", Body=b"x" * 64)
+
+        throttling = ThrottlingS3(args.capacity, args.latency)
+        s3_client.meta.events.register("before-send.s3", throttling)
+        started = time.perf_counter()
+        response = client.post(
+            "/s3/copy-folder",
+            json={"bucket_name": BUCKET, "source_folder": "source", "destination_folder": "copy"},
+        )
+        elapsed = time.perf_counter() - started
+        result = response.json()
+        copied = result.get("copied", 0) if response.status_code == 200 else 0
+        limits = client.get("/s3/rate-limits").json()
+        bucket_stats = limits.get("buckets", {}).get(BUCKET, {})
+        label = "rate control on" if limits["enabled"] else "rate control off"
+        print(
+            f"{label:<18} {copied}/{args.objects} copied  {elapsed:.2f}s  {copied / elapsed:,.0f} copies/s  "
+            f"{throttling.throttled} SlowDowns  concurrency limit {bucket_stats.get('concurrency_limit', '-')}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--capacity", type=float, default=50, help="Requests per second before SlowDown")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every S3 call")
+    parser.add_argument("--mode", choices=["on", "off"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args)
+        return
+    for mode in ("off", "on"):
+        env = {**os.environ, "S3_RATE_CONTROL_ENABLED": "true" if mode == "on" else "false"}
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_rate_control", *sys.argv[1:], "--mode", mode], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Cold start of the app: import time of app.main, lifespan startup, time
+# until /ready answers 200 (when the route exists), and the latency of the
+# first and second /s3/buckets requests. Then a page load of / as a browser
+# would do it: the first visit fetches the page and the assets it links, a
+# repeat visit skips assets still fresh in the cache and revalidates the rest
+# with If-None-Match. Every run is a fresh interpreter, moto runs in this
+# process so it does not pollute the children's imports.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_startup --runs 5
+#   S3_WARMUP_ENABLED=false python -m benchmarks.bench_startup --runs 5
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.local_s3 import local_s3_server
+
+ASSET_PATTERN = re.compile(r'(?:href|src)="([^"]+\.(?:css|js))"')
+
+
+def decode(raw: bytes, content_encoding: str | None) -> bytes:
+    if content_encoding == "gzip":
+        return gzip.decompress(raw)
+    if content_encoding == "br":
+        import brotli
+
+        return brotli.decompress(raw)
+    return raw
+
+
+async def page_load(client) -> dict:
+    # Bytes over the wire and requests made, for a first and a repeat visit
+    cache: dict[str, dict] = {}
+    visits = {}
+    for visit in ("first", "repeat"):
+        transferred, requests, not_modified, failed = 0, 0, 0, 0
+        page = None
+        urls = ["/"]
+        while urls:
+            url = urls.pop(0)
+            cached = cache.get(url)
+            if cached and "immutable" in cached["cache_control"]:
+                continue
+            headers = {"Accept-Encoding": "gzip, br"}
+            if cached and cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            async with client.stream("GET", url, headers=headers) as response:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            body = decode(raw, response.headers.get("content-encoding"))
+            requests += 1
+            transferred += len(raw)
+            if response.status_code == 304:
+                not_modified += 1
+                body = cached["body"]
+            elif response.status_code != 200:
+                failed += 1
+                continue
+            else:
+                cache[url] = {
+                    "etag": response.headers.get("etag"),
+                    "cache_control": response.headers.get("cache-control", ""),
+                    "body": body,
+                }
+            if url == "/":
+                page = body.decode()
+                urls.extend(
+                    link if link.startswith("/") else "/" + link for link in ASSET_PATTERN.findall(page)
+                )
+        visits[visit] = {"requests": requests, "bytes": transferred, "not_modified": not_modified, "failed": failed}
+    return visits
+
+
+async def run_child() -> dict:
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench-startup-")
+    started = time.perf_counter()
+    from app.main import app
+    import_ms = (time.perf_counter() - started) * 1000
+
+    import httpx
+
+    result = {"import_ms": import_ms}
+    transport = httpx.ASGITransport(app=app)
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        result["startup_ms"] = (time.perf_counter() - started) * 1000
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            while True:
+                response = await client.get("/ready")
+                if response.status_code != 503:
+                    break
+                await asyncio.sleep(0.005)
+            result["ready_ms"] = (time.perf_counter() - started) * 1000 if response.status_code == 200 else None
+            for name in ("first_request_ms", "second_request_ms"):
+                request_started = time.perf_counter()
+                response = await client.get("/s3/buckets")
+                response.raise_for_status()
+                result[name] = (time.perf_counter() - request_started) * 1000
+            result["page"] = await page_load(client)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start; medians are reported")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_child())))
+        return
+
+    env = {**os.environ, "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")}
+    runs = []
+    with local_s3_server():
+        for _ in range(args.runs):
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+                env=env,
+                check=True,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    for name in ("import_ms", "startup_ms", "ready_ms", "first_request_ms", "second_request_ms"):
+        values = [run[name] for run in runs if run.get(name) is not None]
+        print(f"{name:<18} {statistics.median(values):>8.1f}" if values else f"{name:<18} {'-':>8}")
+    for visit, page in runs[-1]["page"].items():
+        print(
+            f"page {visit:<13} {page['requests']} requests  {page['bytes']:,} bytes  "
+            f"{page['not_modified']} not modified  {page['failed']} failed"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# Hot-path benchmark suite: drives the FastAPI app in-process against moto
+# and reports throughput, p50/p99 latency and peak RSS per scenario, as JSON
+# that a later run can be compared against. Each scenario runs in its own
+# process, so peak RSS is per scenario; it includes moto's in-memory store.
+# Seeding the objects a scenario needs is not timed.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_suite --output baseline.json
+#   python -m benchmarks.bench_suite --baseline baseline.json --tolerance 0.15 --repeat 3
+#
+# Exits with status 1 when a scenario's throughput drops, or its p99 latency
+# grows, by more than --tolerance relative to the baseline.
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.local_s3 import local_s3_server
+
+BUCKET = "bench-bucket"
+SCENARIOS = (
+    "list-buckets",
+    "upload-small",
+    "upload-large",
+    "download-hot",
+    "copy",
+    "move",
+    "delete-file",
+    "delete-folder",
+)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def scenario_plan(args) -> tuple[int, int, int, int]:
+    # Requests, object size, folders to seed and objects per folder
+    return {
+        "list-buckets": (args.requests, 0, 0, 0),
+        "upload-small": (args.requests, args.small_size, 0, 0),
+        "upload-large": (args.large_requests, args.large_size, 0, 0),
+        "download-hot": (args.requests, args.small_size, args.hot_objects, 1),
+        "copy": (args.requests, args.small_size, args.requests, 1),
+        "move": (args.requests, args.small_size, args.requests, 1),
+        "delete-file": (args.requests, args.small_size, args.requests, 1),
+        "delete-folder": (args.folder_requests, args.small_size, args.folder_requests, args.folder_objects),
+    }[args.scenario]
+
+
+def seed(s3_client, folders: int, per_folder: int, body: bytes):
+    # Request i works on folder_<i>; with one object per folder that is obj_<i>
+    keys = [
+        f"folder_{folder:05}/obj_{folder * per_folder + j:06}.bin"
+        for folder in range(folders)
+        for j in range(per_folder)
+    ]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda key: s3_client.put_object(Bucket=BUCKET, Key=key, Body=body), keys))
+
+
+def build_request(scenario: str, i: int, payload: bytes, folders: int):
+    source = f"folder_{i:05}"
+    if scenario == "list-buckets":
+        return "GET", "/s3/buckets", {}
+    if scenario == "download-hot":
+        # Round robin over the few seeded objects
+        return "GET", f"/s3/download/{BUCKET}", {
+            "params": {"file_name": f"obj_{i % folders:06}.bin", "folder_name": f"folder_{i % folders:05}"},
+        }
+    if scenario in ("upload-small", "upload-large"):
+        return "POST", f"/s3/upload-file/{BUCKET}", {
+            "files": {"file": (f"obj_{i:06}.bin", payload)},
+            "data": {"folder_name": "uploads"},
+        }
+    if scenario in ("copy", "move"):
+        return "POST", f"/s3/{scenario}-file", {
+            "json": {
+                "bucket_name": BUCKET,
+                "file_name": f"obj_{i:06}.bin",
+                "source_folder": source,
+                "destination_folder": f"{scenario}-destination",
+            },
+        }
+    if scenario == "delete-file":
+        return "DELETE", f"/s3/delete-file/{BUCKET}", {
+            "params": {"file_name": f"obj_{i:06}.bin", "folder_name": source},
+        }
+    return "DELETE", "/s3/delete-folder", {"json": {"bucket_name": BUCKET, "folder_name": source}}
+
+
+async def run_scenario(args) -> dict:
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench-suite-")
+
+    import httpx
+
+    from app.core.config import S3_ENGINE
+    from app.main import app
+
+    requests, size, folders, per_folder = scenario_plan(args)
+    payload = os.urandom(size)
+    with local_s3_server():
+        async with app.router.lifespan_context(app):
+            s3_client = app.state.s3_client_pool.get_client()
+            s3_client.create_bucket(Bucket=BUCKET)
+            seed(s3_client, folders, per_folder, payload)
+            rss_before = peak_rss_mb()
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def request(i: int):
+                    method, url, kwargs = build_request(args.scenario, i, payload, folders)
+                    async with semaphore:
+                        started = time.perf_counter()
+                        response = await client.request(method, url, **kwargs)
+                        return time.perf_counter() - started, response.status_code
+
+                started = time.perf_counter()
+                results = await asyncio.gather(*(request(i) for i in range(requests)))
+                elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        "engine": S3_ENGINE,
+        "requests": requests,
+        "concurrency": args.concurrency,
+        "object_size": size,
+        "seeded_objects": folders * per_folder,
+        "errors": sum(status >= 400 for _, status in results),
+        "seconds": round(elapsed, 4),
+        "throughput": round(requests / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[math.ceil(len(latencies) * 0.99) - 1] * 1000, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "seeded_rss_mb": round(rss_before, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    print(f"\n{'scenario':<14} {'req/s':>10} {'baseline':>10} {'change':>8}   {'p99 ms':>9} {'baseline':>9} {'change':>8}")
+    for name, result in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            print(f"{name:<14} {result['throughput']:>10,.1f} {'-':>10}")
+            continue
+        settings = ("engine", "requests", "concurrency", "object_size", "seeded_objects")
+        if any(result[setting] != previous.get(setting) for setting in settings):
+            print(f"{name:<14} {result['throughput']:>10,.1f}   baseline ran with other settings, not compared")
+            continue
+        throughput_change = result["throughput"] / previous["throughput"] - 1
+        p99_change = result["p99_ms"] / previous["p99_ms"] - 1 if previous["p99_ms"] else 0
+        flags = []
+        if throughput_change < -tolerance:
+            flags.append("throughput")
+        if p99_change > tolerance:
+            flags.append("p99")
+        if flags:
+            regressions.append(f"{name}: {' and '.join(flags)} regressed")
+        print(
+            f"{name:<14} {result['throughput']:>10,.1f} {previous['throughput']:>10,.1f} {throughput_change:>+8.1%}   "
+            f"{result['p99_ms']:>9,.1f} {previous['p99_ms']:>9,.1f} {p99_change:>+8.1%}"
+            f"{'   REGRESSION' if flags else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--large-requests", type=int, default=8, help="Requests for upload-large")
+    parser.add_argument("--folder-requests", type=int, default=20, help="Requests for delete-folder")
+    parser.add_argument("--folder-objects", type=int, default=100, help="Objects per folder for delete-folder")
+    parser.add_argument("--hot-objects", type=int, default=10, help="Objects read round robin by download-hot")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--small-size", type=int, default=4096, help="Bytes per object")
+    parser.add_argument("--large-size", type=int, default=32 * 1024 * 1024, help="Bytes per upload-large file")
+    parser.add_argument("--engine", choices=["sync", "async"], default=os.getenv("S3_ENGINE", "sync"))
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the median run by throughput is kept")
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(asyncio.run(run_scenario(args))))
+        return
+
+    # Request logging would otherwise dominate the terminal and the timings
+    env = {**os.environ, "S3_ENGINE": args.engine, "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")}
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": args.engine,
+        "scenarios": {},
+    }
+    print(f"{'scenario':<14} {'requests':>8} {'errors':>6} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak RSS MB':>12}")
+    for scenario in args.scenarios:
+        runs = []
+        for _ in range(args.repeat):
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_suite", *sys.argv[1:], "--scenario", scenario],
+                env=env,
+                check=True,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        result = sorted(runs, key=lambda run: run["throughput"])[len(runs) // 2]
+        result["runs"] = len(runs)
+        results["scenarios"][scenario] = result
+        print(
+            f"{scenario:<14} {result['requests']:>8} {result['errors']:>6} {result['throughput']:>10,.1f} "
+            f"{result['p50_ms']:>9,.1f} {result['p99_ms']:>9,.1f} {result['peak_rss_mb']:>12,.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n" + "\n".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Re-uploading the same files through POST /s3/upload-file with and without
+# dedup=true, and uploading them again under new keys (server-side copies).
+# Every S3 call is delayed by --latency seconds plus its request body size
+# divided by --bandwidth, to model a real uplink.
+#
+#   pip install -r requirements-dev.txt
+#   python -m benchmarks.bench_upload_dedup --files 50 --size 1048576 --bandwidth 10
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.local_s3 import local_s3_server
+
+BUCKET = "bench-bucket"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--size", type=int, default=1024 * 1024, help="Bytes per file")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every S3 call")
+    parser.add_argument("--bandwidth", type=float, default=10, help="Upload bandwidth to S3 in MB/s")
+    args = parser.parse_args()
+
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench-upload-dedup-")
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    files = [(f"file_{i:04}.bin", os.urandom(args.size)) for i in range(args.files)]
+
+    def delay(request, **kwargs):
+        time.sleep(args.latency + int(request.headers.get("Content-Length") or 0) / (args.bandwidth * 1e6))
+
+    def upload_all(client, folder: str, dedup: bool):
+        started = time.perf_counter()
+        for name, data in files:
+            response = client.post(
+                f"/s3/upload-file/{BUCKET}",
+                files={"file": (name, data)},
+                data={"folder_name": folder, "dedup": str(dedup).lower()},
+            )
+            response.raise_for_status()
+        return time.perf_counter() - started
+
+    with local_s3_server(), TestClient(app) as client:
+        client.post("/s3/create-bucket", json={"bucket_name": BUCKET})
+        app.state.s3_client_pool.get_client().meta.events.register("before-send.s3", delay)
+        total_mb = args.files * args.size / 1e6
+
+        elapsed = upload_all(client, "first", dedup=True)
+        print(f"{'first upload (dedup)':<30} {total_mb:.1f} MB  {elapsed:.2f}s")
+        elapsed = upload_all(client, "first", dedup=False)
+        print(f"{'re-upload':<30} {total_mb:.1f} MB  {elapsed:.2f}s")
+        elapsed = upload_all(client, "first", dedup=True)
+        print(f"{'re-upload (dedup, HEAD)':<30} {total_mb:.1f} MB  {elapsed:.2f}s")
+        elapsed = upload_all(client, "first", dedup=True)
+        print(f"{'re-upload (dedup, cached)':<30} {total_mb:.1f} MB  {elapsed:.2f}s")
+        elapsed = upload_all(client, "second", dedup=True)
+        print(f"{'same bytes, new keys (dedup)':<30} {total_mb:.1f} MB  {elapsed:.2f}s")
+        print(client.get("/s3/dedup/stats").json())
+
+
+if __name__ == "__main__":
+    main()
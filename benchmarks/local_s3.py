@@ -0,0 +1,26 @@
+# Local S3 stand-in shared by the benchmarks, no network or AWS credentials needed.
+import logging
+import os
+from contextlib import contextmanager
+
+HOST = "127.0.0.1"
+PORT = int(os.getenv("BENCH_S3_PORT", "5055"))
+ENDPOINT_URL = f"http://{HOST}:{PORT}"
+
+# Must be set before app.core.config is imported
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ["S3_ENDPOINT_URL"] = ENDPOINT_URL
+
+
+@contextmanager
+def local_s3_server():
+    from moto.server import ThreadedMotoServer
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = ThreadedMotoServer(ip_address=HOST, port=PORT, verbose=False)
+    server.start()
+    try:
+        yield ENDPOINT_URL
+    finally:
+        server.stop()
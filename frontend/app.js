@@ -164,6 +164,8 @@ async function uploadFile() {
         return;
     }
 
+    if (await uploadFileDirect(bucket, folder, file)) return;
+
     const fd = new FormData();
     fd.append("file", file);
     if (folder) fd.append("folder_name", folder);
@@ -175,6 +177,42 @@ async function uploadFile() {
     await showResponse(res);
 }
 
+// Send the bytes straight to S3 with a presigned URL, then tell the server so
+// it updates its caches and index; returns false so the caller can fall back
+// to the proxied upload (e.g. bucket has no CORS rule, or the folder is compressed)
+async function uploadFileDirect(bucket, folder, file) {
+    try {
+        const presign = await fetch(`${API}/presign/upload`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({
+                bucket_name: bucket,
+                folder_name: folder || null,
+                file_name: file.name,
+                content_type: file.type || null,
+                file_size: file.size
+            })
+        });
+        if (!presign.ok) return false;
+        const { url, headers, file_key } = await presign.json();
+
+        // Content-Length is set by the browser and matches the signed size
+        const { "Content-Length": _, ...sendHeaders } = headers;
+        const res = await fetch(url, { method: "PUT", headers: sendHeaders, body: file });
+        if (!res.ok) return false;
+
+        const complete = await fetch(`${API}/presign/upload/complete`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ bucket_name: bucket, file_key })
+        });
+        await showResponse(complete);
+        return true;
+    } catch (err) {
+        return false;
+    }
+}
+
 async function deleteFile() {
     const bucket = document.getElementById("deleteFileBucket").value;
     const file = document.getElementById("deleteFileName").value;
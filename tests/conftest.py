@@ -0,0 +1,58 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# Settings are read when app.core.config is imported: small multipart
+# thresholds keep multipart paths testable with a few MB, a private data dir
+# keeps the SQLite stores and the object cache out of the working tree,
+# logs/ is a compression folder
+os.environ.setdefault("BENCH_S3_PORT", "5099")
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="s3-tests-")
+os.environ.setdefault("S3_WARMUP_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("S3_MULTIPART_THRESHOLD", str(6 * 1024 * 1024))
+os.environ.setdefault("S3_MULTIPART_PART_SIZE", str(5 * 1024 * 1024))
+os.environ.setdefault("S3_MULTIPART_COPY_THRESHOLD", str(6 * 1024 * 1024))
+os.environ.setdefault("S3_MULTIPART_COPY_PART_SIZE", str(5 * 1024 * 1024))
+os.environ.setdefault("UPLOAD_COMPRESSION_RULES", "logs/=gzip")
+os.environ.setdefault("OBJECT_CACHE_ENABLED", "true")
+
+from benchmarks.local_s3 import local_s3_server  # noqa: E402  (sets credentials and S3_ENDPOINT_URL)
+
+MB = 1024 * 1024
+
+
+@pytest.fixture(scope="session")
+def s3_server():
+    with local_s3_server() as endpoint_url:
+        yield endpoint_url
+
+
+@pytest.fixture
+def app(s3_server):
+    from app.main import app
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def s3_client(client, app):
+    return app.state.s3_client_pool.get_client()
+
+
+@pytest.fixture
+def bucket(s3_client):
+    # moto keeps its state for the whole session, every test gets its own bucket
+    name = f"test-{uuid.uuid4().hex[:12]}"
+    s3_client.create_bucket(Bucket=name)
+    return name
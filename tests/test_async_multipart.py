@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.s3_bucket.services.async_s3_service import asyncS3Service
+from tests.conftest import MB
+
+
+class FailingCopyRepository:
+    # Part 1 fails, the other parts stay in flight until they are cancelled
+    def __init__(self):
+        self.in_flight = 0
+        self.in_flight_at_abort = None
+
+    async def create_multipart_upload(self, bucket_name, file_key, content_type, **extra_args):
+        return {"UploadId": "upload"}
+
+    async def upload_part_copy(self, bucket_name, file_key, upload_id, part_number, source_key, copy_range):
+        if part_number == 1:
+            await asyncio.sleep(0.01)
+            raise ClientError({"Error": {"Code": "InternalError"}}, "UploadPartCopy")
+        self.in_flight += 1
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.in_flight -= 1
+
+    async def abort_multipart_upload(self, bucket_name, file_key, upload_id):
+        self.in_flight_at_abort = self.in_flight
+
+
+def test_multipart_copy_cancels_parts_before_abort():
+    repository = FailingCopyRepository()
+    service = asyncS3Service(repository, sync_service=None)
+    head = {"ContentLength": 20 * MB, "ContentType": "text/plain"}
+
+    with pytest.raises(ClientError):
+        asyncio.run(service._multipart_copy("bucket", "source", "destination", head))
+    assert repository.in_flight_at_abort == 0
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.batch_delete import BatchDeleter
+
+
+class LockedKeysRepository(s3Repository):
+    # Reports keys under locked/ the way DeleteObjects reports per-key failures
+    def delete_objects(self, bucket_name, keys):
+        response = super().delete_objects(bucket_name, [key for key in keys if not key.startswith("locked/")])
+        errors = [
+            {"Key": key, "Code": "AccessDenied", "Message": "Access Denied"} for key in keys if key.startswith("locked/")
+        ]
+        return {**response, "Errors": response.get("Errors", []) + errors}
+
+
+def put_many(s3_client, bucket, keys):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda key: s3_client.put_object(Bucket=bucket, Key=key, Body=b""), keys))
+
+
+def test_delete_folder_past_one_batch(client, s3_client, bucket):
+    put_many(s3_client, bucket, [f"docs/{number:04d}" for number in range(1003)] + ["other/keep"])
+
+    response = client.request("DELETE", "/s3/delete-folder", json={"bucket_name": bucket, "folder_name": "docs"})
+
+    assert response.status_code == 200
+    assert (response.json()["deleted"], response.json()["failed"]) == (1003, 0)
+    assert [obj["Key"] for obj in s3_client.list_objects_v2(Bucket=bucket)["Contents"]] == ["other/keep"]
+
+
+def test_per_key_errors_are_reported(s3_client, bucket):
+    keys = [f"docs/{number:04d}" for number in range(1001)] + ["locked/a", "locked/b", "locked/c"]
+    put_many(s3_client, bucket, keys)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        deleter = BatchDeleter(LockedKeysRepository(s3_client), executor, concurrency=2)
+        result = deleter.delete_keys(bucket, iter(keys), max_errors=2)
+
+    assert (result["deleted"], result["failed"]) == (1001, 3)
+    assert [error["code"] for error in result["errors"]] == ["AccessDenied", "AccessDenied"]
+    assert {error["key"] for error in result["errors"]} <= {"locked/a", "locked/b", "locked/c"}
+    assert s3_client.list_objects_v2(Bucket=bucket)["KeyCount"] == 3
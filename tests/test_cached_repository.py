@@ -0,0 +1,37 @@
+from app.core.metadata_cache import MetadataCache
+from app.s3_bucket.repositories.cached_s3_repository import CachedS3Repository
+
+PREFIXES = ["", "docs/", "docs/2024/", "docs/20", "do", "logs/", "docs/2024/a.txt", "other/docs/"]
+
+
+def cached_keys(written_keys: list[str]) -> set:
+    cache = MetadataCache(max_entries=1000)
+    for bucket in ("bucket", "other"):
+        for prefix in PREFIXES:
+            cache.get_or_load(("objects", bucket, prefix, "/", 1000, None), lambda: {}, 60)
+        for key in ("docs/2024/a.txt", "logs/b.txt"):
+            cache.get_or_load(("content_hash", bucket, key), lambda: "hash", 60)
+    repository = CachedS3Repository(None, cache, buckets_ttl=60, listing_ttl=60)
+    repository._invalidate_keys("bucket", written_keys)
+    return set(cache._entries)
+
+
+def test_invalidate_keys_drops_listings_under_written_keys():
+    remaining = cached_keys(["docs/2024/a.txt"])
+    stale = {
+        key
+        for key in cached_keys([])
+        if key[1] == "bucket"
+        and (key[2] == "docs/2024/a.txt" if key[0] == "content_hash" else "docs/2024/a.txt".startswith(key[2]))
+    }
+    assert stale == {
+        ("objects", "bucket", prefix, "/", 1000, None)
+        for prefix in ["", "docs/", "docs/2024/", "docs/20", "do", "docs/2024/a.txt"]
+    } | {("content_hash", "bucket", "docs/2024/a.txt")}
+    assert remaining == cached_keys([]) - stale
+
+
+def test_invalidate_keys_keeps_unrelated_listings():
+    remaining = cached_keys(["top.txt"])
+    dropped = cached_keys([]) - remaining
+    assert dropped == {("objects", "bucket", "", "/", 1000, None)}
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.enums import JobStatus
+from app.jobs.services.job_manager import Job, JobStopped
+
+
+def put(s3_client, bucket, key, body=b"same"):
+    s3_client.put_object(Bucket=bucket, Key=key, Body=body)
+
+
+def test_sync_skips_unchanged_objects(client, s3_client, bucket):
+    for name in ("1", "3", "4", "5", "7"):
+        put(s3_client, bucket, f"src/{name}")
+    # Unchanged copies of 1, 3 and 7, a changed 4 and destination-only keys in between
+    for name in ("0", "1", "2", "3", "7"):
+        put(s3_client, bucket, f"dst/{name}")
+    put(s3_client, bucket, "dst/4", b"changed")
+
+    response = client.post(
+        "/s3/sync-folder",
+        json={"bucket_name": bucket, "source_folder": "src", "destination_folder": "dst", "delete_removed": True},
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["copied"], result["skipped"], result["deleted"]) == (2, 3, 2)
+    keys = [obj["Key"] for obj in s3_client.list_objects_v2(Bucket=bucket, Prefix="dst/")["Contents"]]
+    assert keys == ["dst/1", "dst/3", "dst/4", "dst/5", "dst/7"]
+    assert s3_client.get_object(Bucket=bucket, Key="dst/4")["Body"].read() == b"same"
+
+
+def put_many(s3_client, bucket, keys):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda key: put(s3_client, bucket, key), keys))
+
+
+def list_keys(s3_client, bucket, prefix):
+    paginator = s3_client.get_paginator("list_objects_v2")
+    return [obj["Key"] for page in paginator.paginate(Bucket=bucket, Prefix=prefix) for obj in page.get("Contents", [])]
+
+
+def test_transfer_resumes_from_checkpoint(app, s3_client, bucket):
+    # Two listing pages: the run is stopped at the first checkpoint and resumed into another folder
+    put_many(s3_client, bucket, [f"src/{number:04d}" for number in range(1003)])
+    transfer = app.state.s3_service.folder_transfer
+    checkpoints = []
+
+    def stop_after_first_page(checkpoint):
+        checkpoints.append(checkpoint)
+        raise JobStopped("shutdown")
+
+    with pytest.raises(JobStopped):
+        transfer.run(bucket, "src/", bucket, "dst/", on_checkpoint=stop_after_first_page)
+    assert checkpoints[0]["continuation_token"] and not checkpoints[0]["listing_done"]
+    copied_before = checkpoints[0]["result"]["copied"]
+    assert copied_before >= 1000
+
+    result = transfer.run(bucket, "src/", bucket, "resumed/", checkpoint=checkpoints[0])
+
+    assert result["copied"] == copied_before + 3
+    assert list_keys(s3_client, bucket, "resumed/") == ["resumed/1000", "resumed/1001", "resumed/1002"]
+
+
+def test_background_count_sets_total_and_stops_with_the_job(app, s3_client, bucket):
+    put_many(s3_client, bucket, [f"src/{number}" for number in range(5)])
+    service = app.state.s3_service
+
+    running = Job("sync_folder", {}, status=JobStatus.running)
+    service._count_objects_in_background(running, bucket, "src/", 2).result(timeout=10)
+    assert running.total == 7
+
+    cancelled = Job("sync_folder", {}, status=JobStatus.running)
+    cancelled.stop_reason = "cancel"
+    service._count_objects_in_background(cancelled, bucket, "src/", 0).result(timeout=10)
+    assert cancelled.total is None
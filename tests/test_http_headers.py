@@ -0,0 +1,17 @@
+from app.utils.http_headers import content_disposition
+
+
+def test_ascii_name_is_sent_as_is():
+    assert content_disposition("report.pdf") == 'attachment; filename="report.pdf"'
+
+
+def test_non_ascii_name_is_encoded_for_latin1_headers():
+    value = content_disposition("résumé€.txt")
+    value.encode("latin-1")
+    assert value == "attachment; filename=\"resume.txt\"; filename*=UTF-8''r%C3%A9sum%C3%A9%E2%82%AC.txt"
+
+
+def test_quotes_backslashes_and_controls_do_not_break_the_header():
+    value = content_disposition('a"b\\c\r\nd.txt')
+    assert value.startswith('attachment; filename="a_b_c__d.txt"; ')
+    assert value.endswith("filename*=UTF-8''a%22b%5Cc%0D%0Ad.txt")
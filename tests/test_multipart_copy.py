@@ -0,0 +1,38 @@
+import os
+
+from tests.conftest import MB
+
+
+def copy_file(client, bucket, file_name="big.csv"):
+    return client.post(
+        "/s3/copy-file",
+        json={"bucket_name": bucket, "file_name": file_name, "source_folder": "src", "destination_folder": "dst"},
+    )
+
+
+def test_multipart_copy_keeps_content_type_and_metadata(client, s3_client, bucket):
+    body = os.urandom(11 * MB)
+    s3_client.put_object(
+        Bucket=bucket,
+        Key="src/big.csv",
+        Body=body,
+        ContentType="text/csv",
+        CacheControl="max-age=60",
+        Metadata={"owner": "reports"},
+    )
+
+    assert copy_file(client, bucket).status_code == 200
+
+    head = s3_client.head_object(Bucket=bucket, Key="dst/big.csv")
+    assert head["ETag"].endswith('-3"')
+    assert (head["ContentType"], head["CacheControl"], head["Metadata"]) == ("text/csv", "max-age=60", {"owner": "reports"})
+    assert s3_client.get_object(Bucket=bucket, Key="dst/big.csv")["Body"].read() == body
+
+
+def test_copy_tells_missing_key_from_missing_bucket(client, bucket):
+    missing_key = copy_file(client, bucket, "absent.csv")
+    missing_bucket = copy_file(client, f"{bucket}-absent")
+
+    assert (missing_key.status_code, missing_bucket.status_code) == (404, 404)
+    assert missing_key.json()["detail"] != missing_bucket.json()["detail"]
+    assert "bucket" in missing_bucket.json()["detail"].lower()
@@ -0,0 +1,36 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.s3_bucket.repositories.s3_repository import s3Repository
+from app.s3_bucket.services.multipart_upload import MultipartUploader
+from tests.conftest import MB
+
+
+class FailingPartRepository(s3Repository):
+    def upload_part(self, bucket_name, file_key, upload_id, part_number, body):
+        if part_number == 2:
+            raise ClientError({"Error": {"Code": "InternalError"}}, "UploadPart")
+        return super().upload_part(bucket_name, file_key, upload_id, part_number, body)
+
+
+def test_large_upload_is_sent_in_parts(client, s3_client, bucket):
+    body = os.urandom(11 * MB)
+    response = client.post(f"/s3/upload-file/{bucket}", files={"file": ("big.bin", body)})
+
+    assert response.status_code == 200
+    assert s3_client.head_object(Bucket=bucket, Key="big.bin")["ETag"].endswith('-3"')
+    assert s3_client.get_object(Bucket=bucket, Key="big.bin")["Body"].read() == body
+
+
+def test_failed_part_aborts_upload(s3_client, bucket):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        uploader = MultipartUploader(FailingPartRepository(s3_client), executor, part_size=5 * MB, concurrency=2)
+        with pytest.raises(ClientError):
+            uploader.upload(bucket, "big.bin", io.BytesIO(os.urandom(16 * MB)))
+
+    assert "Uploads" not in s3_client.list_multipart_uploads(Bucket=bucket)
+    assert "Contents" not in s3_client.list_objects_v2(Bucket=bucket)
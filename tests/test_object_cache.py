@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from app.core.object_cache import ObjectCache
+
+
+def upload(client, bucket, body):
+    response = client.post(f"/s3/upload-file/{bucket}", files={"file": ("a.bin", body)})
+    assert response.status_code == 200
+
+
+def download(client, bucket):
+    response = client.get(f"/s3/download/{bucket}", params={"file_name": "a.bin"})
+    assert response.status_code == 200
+    return response.content
+
+
+def cache_hits(client):
+    return client.get("/s3/object-cache/stats").json()["hits"]
+
+
+# Memory tier and disk tier
+@pytest.mark.parametrize("size", [1024, 512 * 1024])
+def test_cached_download_is_invalidated_by_upload(client, bucket, size):
+    first, second = os.urandom(size), os.urandom(size)
+    upload(client, bucket, first)
+    assert download(client, bucket) == first
+
+    hits = cache_hits(client)
+    assert download(client, bucket) == first
+    assert cache_hits(client) == hits + 1
+
+    upload(client, bucket, second)
+    assert download(client, bucket) == second
+
+
+def test_fill_started_before_invalidation_is_not_stored(tmp_path):
+    cache = ObjectCache(
+        str(tmp_path),
+        ttl=60,
+        max_idle=60,
+        memory_max_bytes=1024 * 1024,
+        memory_max_object_size=1024,
+        disk_max_bytes=1024 * 1024,
+        disk_max_object_size=1024 * 1024,
+        chunk_size=1024,
+    )
+    for size, chunks in ((6, [b"old", b"bod"]), (2048, [b"x" * 1024, b"y" * 1024])):
+        response = {"ContentLength": size, "ETag": '"old"'}
+        filling = cache.fill("bucket", "a.bin", response, iter(chunks), cache.generation("bucket"))
+        next(filling)
+        # A write lands while the old body is still streaming to the client
+        cache.invalidate("bucket", ["a.bin"])
+        assert b"".join(filling)
+        assert cache.get("bucket", "a.bin") is None
+
+        filling = cache.fill("bucket", "a.bin", response, iter(chunks), cache.generation("bucket"))
+        assert len(b"".join(filling)) == size
+        assert cache.get("bucket", "a.bin").size == size
+        cache.invalidate("bucket", ["a.bin"])
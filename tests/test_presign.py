@@ -0,0 +1,42 @@
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+
+def signed_headers(url: str) -> list[str]:
+    return parse_qs(urlparse(url).query)["X-Amz-SignedHeaders"][0].split(";")
+
+
+def test_presigned_upload_is_sigv4_with_signed_size_and_type(client, bucket):
+    response = client.post(
+        "/s3/presign/upload",
+        json={"bucket_name": bucket, "file_name": "a.txt", "content_type": "text/plain", "file_size": 5},
+    )
+    assert response.status_code == 200
+    url = response.json()["url"]
+    query = parse_qs(urlparse(url).query)
+    assert query["X-Amz-Algorithm"] == ["AWS4-HMAC-SHA256"]
+    assert "AWSAccessKeyId" not in query
+    assert {"content-length", "content-type", "host"} <= set(signed_headers(url))
+
+
+def test_presigned_upload_round_trip_is_completed(client, bucket):
+    presign = client.post(
+        "/s3/presign/upload",
+        json={"bucket_name": bucket, "folder_name": "docs", "file_name": "a.txt", "file_size": 5},
+    ).json()
+    # Cached before the PUT, and current again after the completion call
+    assert client.get(f"/s3/objects/{bucket}", params={"prefix": "docs/"}).json()["objects"] == []
+    assert httpx.put(presign["url"], headers=presign["headers"], content=b"hello").status_code == 200
+
+    completed = client.post(
+        "/s3/presign/upload/complete", json={"bucket_name": bucket, "file_key": presign["file_key"]}
+    )
+    assert completed.json()["size"] == 5
+    listing = client.get(f"/s3/objects/{bucket}", params={"prefix": "docs/"}).json()
+    assert [obj["key"] for obj in listing["objects"]] == ["docs/a.txt"]
+
+
+def test_presigned_download_is_sigv4(client, bucket):
+    response = client.get(f"/s3/presign/download/{bucket}", params={"file_name": "a.txt"})
+    assert signed_headers(response.json()["url"]) == ["host"]
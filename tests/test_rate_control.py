@@ -0,0 +1,62 @@
+import pytest
+from botocore.exceptions import ClientError, NoCredentialsError, ParamValidationError
+
+from app.core.rate_control import S3RateController
+
+
+def make_controller(**overrides) -> S3RateController:
+    settings = dict(
+        reads_per_prefix=1000,
+        writes_per_prefix=1000,
+        prefix_depth=1,
+        initial_concurrency=2,
+        min_concurrency=1,
+        max_concurrency=2,
+        max_attempts=3,
+        base_delay=0,
+        max_delay=0,
+    )
+    settings.update(overrides)
+    return S3RateController(**settings)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        NoCredentialsError(),
+        ParamValidationError(report="Invalid bucket name"),
+        OSError("body read failed"),
+        ClientError({"Error": {"Code": "NoSuchBucket"}}, "ListObjectsV2"),
+    ],
+)
+def test_failed_call_releases_its_slot(error):
+    controller = make_controller()
+
+    def send():
+        raise error
+
+    # More failures than the limit has slots: a leaked slot would block here
+    for _ in range(5):
+        with pytest.raises(type(error)):
+            controller.call("bucket", "key", "get_object", send)
+    assert controller.concurrency_limit("bucket").in_flight == 0
+    assert controller.call("bucket", "key", "get_object", lambda: "ok") == "ok"
+    # Reads are rate limited by the read token bucket only
+    assert [write for (_, _, write) in controller._token_buckets] == [False]
+
+
+def test_throttled_call_is_retried_and_releases_every_slot():
+    controller = make_controller()
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ClientError({"Error": {"Code": "SlowDown"}}, "PutObject")
+        return "ok"
+
+    assert controller.call("bucket", "key", "put_object", send) == "ok"
+    stats = controller.concurrency_limit("bucket").stats()
+    assert stats["in_flight"] == 0
+    assert stats["retries"] == 2
+    assert [write for (_, _, write) in controller._token_buckets] == [True]
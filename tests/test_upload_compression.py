@@ -0,0 +1,51 @@
+import gzip
+
+from app.core.compression import UNCOMPRESSED_SIZE_METADATA_KEY
+
+BODY = b"".join(b"2026-10-17 INFO request %d served\n" % number for number in range(2000))
+
+
+def upload(client, bucket, dedup=False):
+    response = client.post(
+        f"/s3/upload-file/{bucket}",
+        data={"folder_name": "logs", "dedup": str(dedup).lower()},
+        files={"file": ("app.log", BODY, "text/plain")},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def download(client, bucket, accept_encoding):
+    return client.get(
+        f"/s3/download/{bucket}",
+        params={"file_name": "app.log", "folder_name": "logs"},
+        headers={"Accept-Encoding": accept_encoding},
+    )
+
+
+def test_compressed_upload_round_trip(client, s3_client, bucket):
+    result = upload(client, bucket)
+
+    assert (result["compression"], result["size"]) == ("gzip", len(BODY))
+    assert result["stored_size"] < len(BODY) // 2
+    head = s3_client.head_object(Bucket=bucket, Key="logs/app.log")
+    assert head["ContentEncoding"] == "gzip"
+    assert head["Metadata"][UNCOMPRESSED_SIZE_METADATA_KEY] == str(len(BODY))
+    stored = s3_client.get_object(Bucket=bucket, Key="logs/app.log")["Body"].read()
+    assert gzip.decompress(stored) == BODY
+
+    # Sent as stored to clients that accept gzip, decompressed for the others
+    compressed = download(client, bucket, "gzip")
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.content == BODY
+    plain = download(client, bucket, "identity")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Content-Length"] == str(len(BODY))
+    assert plain.headers["ETag"].startswith("W/")
+    assert plain.content == BODY
+
+
+def test_dedup_upload_is_compressed_and_then_unchanged(client, s3_client, bucket):
+    assert upload(client, bucket, dedup=True)["dedup"] == "uploaded"
+    assert s3_client.head_object(Bucket=bucket, Key="logs/app.log")["ContentEncoding"] == "gzip"
+    assert upload(client, bucket, dedup=True)["dedup"] == "unchanged"
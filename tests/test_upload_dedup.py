@@ -0,0 +1,47 @@
+import hashlib
+import os
+
+from tests.conftest import MB
+
+
+def upload(client, bucket, folder_name, file_name, body):
+    response = client.post(
+        f"/s3/upload-file/{bucket}",
+        data={"folder_name": folder_name, "dedup": "true"},
+        files={"file": (file_name, body, "text/plain")},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_dedup_upload_unchanged_and_copied(client, s3_client, bucket):
+    body = b"report contents\n" * 100
+
+    assert upload(client, bucket, "docs", "a.txt", body)["dedup"] == "uploaded"
+    assert upload(client, bucket, "docs", "a.txt", body)["dedup"] == "unchanged"
+    copied = upload(client, bucket, "other", "b.txt", body)
+
+    assert (copied["dedup"], copied["copied_from"], copied["bytes_saved"]) == ("copied", f"{bucket}/docs/a.txt", len(body))
+    head = s3_client.head_object(Bucket=bucket, Key="other/b.txt")
+    assert head["Metadata"]["sha256"] == hashlib.sha256(body).hexdigest()
+    assert s3_client.get_object(Bucket=bucket, Key="other/b.txt")["Body"].read() == body
+
+
+def test_dedup_drops_stale_rows(app, client, s3_client, bucket):
+    # moto ignores CopySourceIfMatch, so the stale sources are a deleted small
+    # object and an overwritten one past the multipart copy threshold, whose
+    # ETag is checked with a HEAD first
+    small, large = b"small bytes\n" * 100, os.urandom(7 * MB)
+    upload(client, bucket, "docs", "small.txt", small)
+    upload(client, bucket, "docs", "large.txt", large)
+    s3_client.delete_object(Bucket=bucket, Key="docs/small.txt")
+    s3_client.put_object(Bucket=bucket, Key="docs/large.txt", Body=b"overwritten")
+
+    content_hashes = app.state.s3_service.upload_deduplicator.content_hashes
+    for body in (small, large):
+        result = upload(client, bucket, "other", "copy.txt", body)
+
+        assert result["dedup"] == "uploaded"
+        copies = content_hashes.find_copies(hashlib.sha256(body).hexdigest(), len(body), bucket)
+        assert [copy["file_key"] for copy in copies] == ["other/copy.txt"]
+        assert s3_client.get_object(Bucket=bucket, Key="other/copy.txt")["Body"].read() == body
@@ -0,0 +1,49 @@
+import os
+
+import httpx
+
+from app.core.config import UPLOAD_SESSION_DB_PATH
+from app.s3_bucket.repositories.upload_session_repository import UploadSessionRepository
+from app.s3_bucket.services.upload_session_service import UploadSessionService
+from tests.conftest import MB
+
+
+def create_session(client, bucket, **fields):
+    return client.post("/s3/upload-sessions", json={"bucket_name": bucket, **fields})
+
+
+def test_session_into_compression_folder_is_rejected(client, s3_client, bucket):
+    response = create_session(client, bucket, folder_name="logs", file_name="app.log", content_type="text/plain")
+    assert response.status_code == 409
+    assert "Uploads" not in s3_client.list_multipart_uploads(Bucket=bucket)
+
+
+def test_session_for_incompressible_file_is_created(client, bucket):
+    response = create_session(client, bucket, folder_name="logs", file_name="app.tar", content_type="application/x-tar")
+    assert response.status_code == 200
+    assert response.json()["file_key"] == "logs/app.tar"
+
+
+def test_session_round_trip_resumes_from_stored_parts(app, client, s3_client, bucket):
+    first_part, last_part = os.urandom(5 * MB), b"tail"
+    session = create_session(client, bucket, folder_name="backups", file_name="backup.tar").json()
+    session_url = f"/s3/upload-sessions/{session['session_id']}"
+
+    assert client.put(f"{session_url}/parts/1", content=first_part).status_code == 200
+    presigned = client.post(f"{session_url}/parts/2/presign").json()
+    assert httpx.put(presigned["url"], content=last_part).status_code == 200
+
+    # A new service, as after a restart, finds the session in SQLite and the parts in S3
+    restarted = UploadSessionService(
+        app.state.upload_session_service.s3_repository,
+        UploadSessionRepository(UPLOAD_SESSION_DB_PATH),
+        app.state.s3_service,
+    )
+    parts = restarted.get_session(session["session_id"])["parts"]
+    assert [(part["part_number"], part["size"]) for part in parts] == [(1, 5 * MB), (2, 4)]
+
+    completed = client.post(f"{session_url}/complete").json()
+    assert (completed["parts"], completed["size"]) == (2, 5 * MB + 4)
+    body = s3_client.get_object(Bucket=bucket, Key="backups/backup.tar")["Body"].read()
+    assert body == first_part + last_part
+    assert client.get(session_url).status_code == 404